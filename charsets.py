@@ -0,0 +1,74 @@
+'''
+    Copyright 2010, Andrew Thigpen
+
+    This file is part of PyTTY.
+
+    PyTTY is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    PyTTY is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with PyTTY.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import log
+
+def create_table(start, characters):
+    '''Returns a unicode.translate() table mapping the characters from
+       start on to characters.'''
+    table = {}
+    for (idx, ch) in enumerate(characters):
+        table[ord(start) + idx] = ch
+    return table
+
+# ESC ( 0, line drawing used by curses for boxes
+DEC_SPECIAL_GRAPHICS = create_table(u'_',
+        u' \u25c6\u2592\u2409\u240c\u240d\u240a\u00b0' \
+        u'\u00b1\u2424\u240b\u2518\u2510\u250c\u2514\u253c' \
+        u'\u23ba\u23bb\u2500\u23bc\u23bd\u251c\u2524\u2534' \
+        u'\u252c\u2502\u2264\u2265\u03c0\u2260\u00a3\u00b7')
+
+# ESC ( A
+UNITED_KINGDOM = create_table(u'#', u'\u00a3')
+
+# the final character of a designation, None is US ASCII (no translation)
+CHARSETS = {
+    '0' : DEC_SPECIAL_GRAPHICS,
+    'A' : UNITED_KINGDOM,
+    'B' : None,
+}
+
+
+class CharsetState:
+    '''The G0 to G3 character sets and which of them is invoked into GL
+       (SO and SI switch between G0 and G1).  Text is translated with the
+       table of the invoked set in a single unicode.translate() call.'''
+    def __init__(self):
+        self.log = log.get_log(self)
+        self.reset()
+
+    def reset(self):
+        self.tables = [None, None, None, None]
+        self.invoked = 0
+
+    def designate(self, idx, final):
+        if final not in CHARSETS:
+            self.log.warning("Unsupported character set G%s: %s" % \
+                             (idx, final))
+            final = 'B'
+        self.tables[idx] = CHARSETS[final]
+
+    def invoke(self, idx):
+        self.invoked = idx
+
+    def translate(self, text):
+        table = self.tables[self.invoked]
+        if table is None:
+            return text
+        return unicode(text).translate(table)
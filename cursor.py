@@ -17,12 +17,16 @@
     along with PyTTY.  If not, see <http://www.gnu.org/licenses/>.
 '''
 
+import re
 import log
 from PyQt4 import QtGui, QtCore
+from widthtable import get_width
 from sequencer import ScrollScreenException, ScrollDirection
 
 class TerminalCursor:
     CURSOR_COLOR = QtGui.QColor(0, 255, 0)
+    # nothing before the combining diacritical marks is wide or combining
+    NOT_NARROW = re.compile(u'[^\x00-\u02ff]')
 
     def __init__(self, parent, font_name='Consolas', font_size=11):
         self.log = log.get_log(self)
@@ -83,13 +87,19 @@ class TerminalCursor:
         self.wrap = True
 
     def reset_cell(self):
-        cell = self.get_cell()
+        cell = self.parent.get_row(self.row)[self.col]
         cell.reset()
-        self.widget.update(self.position())
+        self.widget.request_update(self.position())
+
+    def get_erase_color(self):
+        '''The background erased cells are filled with.'''
+        if self.inverse:
+            return self.fgcolor
+        return self.bgcolor
 
     def previous_column(self, scroll=True):
         #old_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         self.col -= 1
         (width, height) = self.parent.get_size()
         if self.col < 0:
@@ -99,60 +109,69 @@ class TerminalCursor:
             else:
                 self.col = 0
         #new_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         #self.widget.update(old_pos)
         #self.widget.update(new_pos)
 
     def previous_row(self, scroll=True, reset_col=False):
         #old_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         self.row -= 1
         if reset_col:
             self.col = 0
         scroll_top = self.parent.get_scroll_top()
-        if scroll and self.row < scroll_top:
-            if self.row < 0:
-                self.row = 0
+        if scroll and self.row == scroll_top - 1:
+            # the cursor was on the first row of the scrolling region
+            self.row = scroll_top
             raise ScrollScreenException(direction=ScrollDirection.UP)
-        if self.row < 0:
-            self.row = 0
+        base = self.parent.get_base_row()
+        if self.row < base:
+            self.row = base
         #new_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         #self.parent.get_widget().update(old_pos)
         #self.parent.get_widget().update(new_pos)
 
     def advance_column(self, scroll=True):
         #old_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         self.col += 1
         (width, height) = self.parent.get_size()
         if self.col >= width:
             if self.wrap:
+                self.parent.set_row_wrapped(self.row)
                 self.col = 0
                 self.advance_row(scroll=scroll)
             else:
                 self.col = width - 1
         #new_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         #self.widget.update(old_pos)
         #self.widget.update(new_pos)
 
     def advance_row(self, scroll=True, reset_col=True):
         #old_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         self.row += 1
         if reset_col:
             self.col = 0
         scroll_bottom = self.parent.get_scroll_bottom()
         self.log.debug("Advance row: scroll_bottom=%s, row=%s, scroll=%s" % \
                 (scroll_bottom, self.row, scroll))
-        if scroll and self.row >= scroll_bottom: #(base + height):
-            buffer_size = self.parent.get_buffer_size()
-            if self.row >= buffer_size:
-                self.row = buffer_size - 1
+        if scroll and self.row == scroll_bottom:
+            # the cursor was on the last row of the scrolling region
+            self.row = scroll_bottom - 1
+            if scroll_bottom == self.parent.get_buffer_size() and \
+               not self.parent.is_alternate_buffer():
+                # the view may lag behind the cursor within a chunk, 
+                # it has to be at the end for the buffer to roll over
+                self.parent.follow_cursor()
             raise ScrollScreenException()
+        last_row = self.parent.get_last_row()
+        if self.row > last_row:
+            self.row = last_row
         #new_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         #self.widget.update(old_pos)
         #self.widget.update(new_pos)
 
@@ -161,10 +180,10 @@ class TerminalCursor:
         if self.row == 0:
             return
         #old_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         self.row -= num
         #new_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         #self.widget.update(old_pos)
         #self.widget.update(new_pos)
 
@@ -176,10 +195,10 @@ class TerminalCursor:
             self.row = (base + height) - 1
             return
         #old_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         self.row += num
         #new_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         #self.widget.update(old_pos)
         #self.widget.update(new_pos)
 
@@ -188,10 +207,10 @@ class TerminalCursor:
         if self.col == 0:
             return
         #old_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         self.col -= num
         #new_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         #self.widget.update(old_pos)
         #self.widget.update(new_pos)
 
@@ -202,20 +221,38 @@ class TerminalCursor:
             self.col = width - 1 
             return
         #old_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         self.col += num
         #new_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         #self.widget.update(old_pos)
         #self.widget.update(new_pos)
 
+    def tab(self, times=1):
+        '''Moves to the next tab stop, times over, without wrapping.'''
+        self.parent.reset_blink_timer()
+        stops = self.parent.get_tab_stops()
+        col = self.col
+        for x in xrange(0, times):
+            col = stops.get_next(col)
+        (width, height) = self.parent.get_size()
+        self.set_row_col(self.row, min(col, width - 1))
+
+    def back_tab(self, times=1):
+        self.parent.reset_blink_timer()
+        stops = self.parent.get_tab_stops()
+        col = self.col
+        for x in xrange(0, times):
+            col = stops.get_previous(col)
+        self.set_row_col(self.row, col)
+
     def set_row_col(self, row, col):
         #old_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         self.col = col
         self.row = row
         #new_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         #self.widget.update(old_pos)
         #self.widget.update(new_pos)
 
@@ -223,34 +260,36 @@ class TerminalCursor:
         return (self.row, self.col)
 
     def reset_position(self):
-        if self.parent.is_alternate_buffer():
-            #old_pos = self.position()
-            self.get_cell().dirty = True
-            self.row = 0
-            self.col = 0
-            #new_pos = self.position()
-            self.get_cell().dirty = True
-            #self.widget.update(old_pos)
-            #self.widget.update(new_pos)
-        else:
-            times = self.row - self.parent.get_base_row()
-            self.parent.scroll(times=times)
+        '''Homes the cursor to the top left of the screen, in either
+           buffer, without scrolling anything.'''
+        self.set_position(0, 0)
+
+    def set_position(self, row, col):
+        '''Moves the cursor to row and col counted from the top left of the
+           screen, kept on the screen.'''
+        if not self.parent.is_alternate_buffer():
+            # the view may lag behind the cursor within a chunk
+            self.parent.follow_cursor()
+        (width, height) = self.parent.get_size()
+        row = max(min(row, height - 1), 0)
+        col = max(min(col, width - 1), 0)
+        self.set_row_col(self.parent.get_base_row() + row, col)
 
     def reset_col(self):
         #old_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         self.col = 0
         #new_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         #self.widget.update(old_pos)
         #self.widget.update(new_pos)
 
     def reset_row(self):
         #old_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         self.row = 0
         #new_pos = self.position()
-        self.get_cell().dirty = True
+        self.set_dirty()
         #self.widget.update(old_pos)
         #self.widget.update(new_pos)
 
@@ -261,33 +300,172 @@ class TerminalCursor:
                             self.col_size, self.row_size)
 
     def write(self, ch, advance=True):
+        width = get_width(ch)
+        if not width:
+            self.combine(ch)
+            return
         if not self.replace_mode:
             self.log.warning("Inserting cell")
-            self.parent.insert_cell(self.row, self.col)
-        cell = self.get_cell() 
+            for x in xrange(0, width):
+                self.parent.insert_cell(self.row, self.col)
+        if width == 2:
+            self.write_wide(ch)
+            return
+        cells = self.parent.get_row(self.row)
+        cells.split_wide(self.col, self.col + 1)
+        cell = cells[self.col]
         cell.set_fgcolor(self.fgcolor)
         cell.set_bgcolor(self.bgcolor)
         cell.set_character(ch)
+        cell.width = 1
         cell.set_font(self.font)
         if self.inverse:
             cell.set_inverse()
         cell.dirty = True
         #self.widget.update(self.position())
-        if cell.selected:
+        if self.parent.is_selected(self.row, self.col):
             self.parent.clear_selection()
-            cell.toggle_selection()
         self.log.debug("Writing '%s' to (%s, %s)" % \
                         (ch, self.row, self.col))
         if advance:
             self.log.none("Advancing column after write.")
             self.advance_column()
 
+    def write_text(self, text):
+        '''Writes a run of printable characters, a row at a time, wrapping
+           and scrolling like write() does for each of them.  Wide
+           characters take two cells and combining ones are added to the
+           character before them.'''
+        if not self.replace_mode:
+            for ch in text:
+                try:
+                    self.write(ch)
+                except ScrollScreenException as e:
+                    self.parent.scroll(e.direction)
+            return
+        if not self.NOT_NARROW.search(text):
+            self.write_cells(text)
+            return
+        start = idx = 0
+        while idx < len(text):
+            end = idx + 1
+            if u'\ud800' <= text[idx] < u'\udc00' and end < len(text) and \
+               u'\udc00' <= text[end] < u'\ue000':
+                # a surrogate pair, on a narrow unicode build
+                end += 1
+            ch = text[idx:end]
+            width = get_width(ch)
+            if width != 1 or len(ch) > 1:
+                self.write_cells(text[start:idx])
+                if not width:
+                    self.combine(ch)
+                elif width == 2:
+                    self.write_wide(ch)
+                else:
+                    self.write_cells([ch])
+                start = end
+            idx = end
+        self.write_cells(text[start:])
+
+    def get_colors(self):
+        if self.inverse:
+            return (self.bgcolor, self.fgcolor)
+        return (self.fgcolor, self.bgcolor)
+
+    def clear_selection_span(self, first, last):
+        '''Clears the selection if it is in the cells of the cursor row
+           from first up to last, which are about to be written.'''
+        span = self.parent.get_selection_span(self.row)
+        if span is not None and span[0] < last and span[1] >= first:
+            self.parent.clear_selection()
+
+    def write_cells(self, chars):
+        '''Writes a character to each cell from the cursor on.'''
+        (fgcolor, bgcolor) = self.get_colors()
+        idx = 0
+        while idx < len(chars):
+            (width, height) = self.parent.get_size()
+            cells = self.parent.get_row(self.row)
+            count = min(len(chars) - idx, width - self.col)
+            self.clear_selection_span(self.col, self.col + count)
+            cells.split_wide(self.col, self.col + count)
+            for col in xrange(self.col, self.col + count):
+                cell = cells[col]
+                cell.fgcolor = fgcolor
+                cell.bgcolor = bgcolor
+                cell.set_character(chars[idx])
+                cell.width = 1
+                cell.set_font(self.font)
+                cell.dirty = True
+                idx += 1
+            # the last one advances like write() does, wrapping at the end
+            self.col += count - 1
+            try:
+                self.advance_column()
+            except ScrollScreenException as e:
+                self.parent.scroll(e.direction)
+
+    def write_wide(self, ch):
+        '''Writes ch to the cursor cell and the one after it, a wide
+           character does not fit in the last column so it wraps first.'''
+        (width, height) = self.parent.get_size()
+        if width < 2:
+            return
+        if self.col >= width - 1:
+            if self.wrap:
+                self.col = width - 1
+                try:
+                    self.advance_column()
+                except ScrollScreenException as e:
+                    self.parent.scroll(e.direction)
+            else:
+                self.col = width - 2
+        (fgcolor, bgcolor) = self.get_colors()
+        cells = self.parent.get_row(self.row)
+        self.clear_selection_span(self.col, self.col + 2)
+        cells.split_wide(self.col, self.col + 2)
+        for (cell, cell_ch, cell_width) in ((cells[self.col], ch, 2),
+                                            (cells[self.col + 1], u'', 0)):
+            cell.fgcolor = fgcolor
+            cell.bgcolor = bgcolor
+            cell.set_character(cell_ch)
+            cell.width = cell_width
+            cell.set_font(self.font)
+            cell.dirty = True
+        self.col += 1
+        try:
+            self.advance_column()
+        except ScrollScreenException as e:
+            self.parent.scroll(e.direction)
+
+    def combine(self, ch):
+        '''Adds the combining character ch to the character before the
+           cursor, which may be at the end of the row above if it wrapped.'''
+        (row, col) = (self.row, self.col - 1)
+        if col < 0:
+            if row <= 0 or not self.parent.peek_row(row - 1).wrapped:
+                return
+            (width, height) = self.parent.get_size()
+            (row, col) = (row - 1, width - 1)
+        cells = self.parent.get_row(row)
+        if not cells[col].width and col > 0:
+            col -= 1
+        cell = cells[col]
+        cell.set_character(cell.ch + ch)
+        cell.dirty = True
+
     def get_cell(self):
+        '''The cell under the cursor, to read from.'''
         return self.parent.get_cell(self.row, self.col)
 
+    def set_dirty(self):
+        self.parent.set_cell_dirty(self.row, self.col)
+
     def draw(self, painter):
         position = self.position()
         cell = self.get_cell()
+        if cell.width == 2:
+            position.setWidth(2 * self.col_size)
         cell.draw(painter, position, inverse=True)
 
     def save_row_col(self):
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+'''
+    Copyright 2010, Andrew Thigpen
+
+    This file is part of PyTTY.
+
+    PyTTY is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    PyTTY is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with PyTTY.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+'''Generates widthtable.py, the number of cells each code point takes,
+   from the unicode database of the python running it:
+
+       python genwidthtable.py > widthtable.py
+
+   Run it with a wide unicode build or python 3, a narrow build cannot
+   look up the code points past U+FFFF.'''
+
+import sys
+import unicodedata
+
+try:
+    unichr
+except NameError:
+    unichr = chr
+
+BLOCK_SIZE = 256
+MAX_CODE_POINT = 0x110000
+
+# East Asian Width assigns W to these even where nothing is assigned yet
+WIDE_RANGES = [
+    (0x3400, 0x4dbf),
+    (0x4e00, 0x9fff),
+    (0xf900, 0xfaff),
+    (0x20000, 0x2fffd),
+    (0x30000, 0x3fffd),
+]
+
+# Hangul vowels and final consonants combine with the leading consonant
+ZERO_WIDTH_RANGES = [
+    (0x1160, 0x11ff),
+    (0xd7b0, 0xd7ff),
+]
+
+def get_width(cp):
+    for (first, last) in ZERO_WIDTH_RANGES:
+        if first <= cp <= last:
+            return 0
+    ch = unichr(cp)
+    category = unicodedata.category(ch)
+    if category in ('Mn', 'Me') or (category == 'Cf' and cp != 0xad):
+        return 0
+    if unicodedata.east_asian_width(ch) in ('W', 'F'):
+        return 2
+    for (first, last) in WIDE_RANGES:
+        if first <= cp <= last:
+            return 2
+    return 1
+
+def create_tables():
+    '''Splits the widths into blocks of BLOCK_SIZE code points, blocks that
+       are the same are only stored once.'''
+    blocks = []
+    index = []
+    for start in range(0, MAX_CODE_POINT, BLOCK_SIZE):
+        block = ''.join([str(get_width(cp))
+                         for cp in range(start, start + BLOCK_SIZE)])
+        if block not in blocks:
+            blocks.append(block)
+        index.append(blocks.index(block))
+    return (index, blocks)
+
+def write_module(out):
+    (index, blocks) = create_tables()
+    out.write("# Generated by genwidthtable.py from the Unicode %s data, "
+              "do not edit.\n\n" % unicodedata.unidata_version)
+    out.write("BLOCK_SHIFT = %s\n" % (BLOCK_SIZE.bit_length() - 1))
+    out.write("BLOCK_MASK = 0x%x\n\n" % (BLOCK_SIZE - 1))
+    out.write("WIDTH_INDEX = (\n")
+    for start in range(0, len(index), 16):
+        out.write("    %s,\n" % ", ".join([str(x)
+                                           for x in index[start:start + 16]]))
+    out.write(")\n\n")
+    out.write("WIDTH_BLOCKS = (\n")
+    for block in blocks:
+        for start in range(0, len(block), 64):
+            out.write("    '%s'\n" % block[start:start + 64])
+        out.write("    ,\n")
+    out.write(")\n")
+    out.write(FOOTER)
+
+FOOTER = '''
+# the digits become tuples once at import, a lookup is two indexings
+WIDTH_BLOCKS = tuple([tuple([int(x) for x in block])
+                      for block in WIDTH_BLOCKS])
+
+def get_width(ch):
+    \'\'\'Returns the number of cells ch takes, 2 for wide characters and 0
+       for combining ones.  ch is a single code point, or a surrogate pair
+       on a narrow unicode build.\'\'\'
+    if len(ch) == 1:
+        cp = ord(ch)
+    else:
+        cp = 0x10000 + ((ord(ch[0]) - 0xd800) << 10) + (ord(ch[1]) - 0xdc00)
+    return WIDTH_BLOCKS[WIDTH_INDEX[cp >> BLOCK_SHIFT]][cp & BLOCK_MASK]
+'''
+
+if __name__ == '__main__':
+    write_module(sys.stdout)
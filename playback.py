@@ -230,7 +230,7 @@ class XTermPlayback(QtGui.QWidget):
         for row in range(0, bottom):
             debug += u"%03d: " % row
             for col in range(0, self.term.screen.width):
-                debug += unicode(buf[row][col]) or u' '
+                debug += unicode(self.term.screen.peek_row(row)[col]) or u' '
             debug += u"\n"
         self.trace.info("Screen buffer contents:\n%s" % debug)
 
@@ -0,0 +1,164 @@
+'''
+    Copyright 2010, Andrew Thigpen
+
+    This file is part of PyTTY.
+
+    PyTTY is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    PyTTY is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with PyTTY.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import log
+import time
+from PyQt4 import QtGui, QtCore
+from config import TerminalConfig
+from cursor import TerminalCursor
+
+class Prediction:
+    def __init__(self, row, col, ch):
+        self.row = row
+        self.col = col
+        self.ch = ch
+        self.time = time.time()
+
+
+class EchoPredictor:
+    '''Shows printable keys underlined at the cursor before the server
+       echoes them, so typing does not feel the round trip of a slow link.
+
+       The predictions are only drawn over the screen, the buffer is never
+       changed.  Each time output arrives they are compared to the cells
+       they were made for: a matching cell confirms a prediction, and one
+       that does not show up in time (e.g. a password prompt) or output
+       that moves the cursor elsewhere rolls all of them back.  After a
+       timeout no more predictions are made until the next line, and on a
+       new line they are not drawn until one of them has been confirmed, so
+       what is typed at a prompt that turned the echo off is never shown.
+
+       Predictions are only drawn once the echo has been seen to take
+       longer than [Prediction] thresholdms.  The caller holds the screen
+       lock for all of these methods.'''
+    def __init__(self, screen):
+        self.log = log.get_log(self)
+        self.screen = screen
+        self.config = TerminalConfig()
+        self.enabled = self.config.getboolean("Prediction", "localecho", True)
+        self.threshold = self.config.getint("Prediction",
+                                            "thresholdms", 30) / 1000.0
+        self.timeout_ms = self.config.getint("Prediction", "timeoutms", 1000)
+        self.predictions = []
+        self.round_trip = None      # smoothed, in seconds
+        self.suspended = False
+        self.tentative = True       # nothing confirmed since the last line
+        font = screen.get_cursor().get_font()
+        self.font = QtGui.QFont(font)
+        self.font.setUnderline(True)
+
+    def is_active(self):
+        return self.enabled and not self.suspended and \
+               not self.screen.is_alternate_buffer()
+
+    def is_visible(self):
+        if self.tentative:
+            return False
+        return self.round_trip is None or self.round_trip >= self.threshold
+
+    def get_next_position(self):
+        if self.predictions:
+            last = self.predictions[-1]
+            return (last.row, last.col + 1)
+        return self.screen.get_cursor().get_row_col()
+
+    def key_pressed(self, text):
+        '''Returns True if a prediction was made.'''
+        if not self.enabled:
+            return False
+        if len(text) != 1 or ord(text) < 0x20 or ord(text) == 0x7f:
+            if text in (u'\r', u'\n'):
+                self.suspended = False
+                self.tentative = True
+            # the application decides what these do
+            self.rollback()
+            return False
+        if not self.is_active():
+            return False
+        (row, col) = self.get_next_position()
+        if col >= self.screen.width - 1:
+            return False
+        self.predictions.append(Prediction(row, col, text))
+        self.update(row, col)
+        return True
+
+    def output_received(self):
+        '''Confirms the predictions that were echoed, rolls back all of them
+           if the oldest one will not be.'''
+        if not self.predictions:
+            return
+        if self.screen.is_alternate_buffer():
+            self.rollback()
+            return
+        now = time.time()
+        (cursor_row, cursor_col) = self.screen.get_cursor().get_row_col()
+        while self.predictions:
+            prediction = self.predictions[0]
+            cell = self.screen.get_cell(prediction.row, prediction.col)
+            if cell.get_character() == prediction.ch:
+                self.confirmed(now - prediction.time)
+                self.predictions.pop(0)
+                self.update(prediction.row, prediction.col)
+                if self.tentative:
+                    # the echo is on, show the rest
+                    self.tentative = False
+                    for other in self.predictions:
+                        self.update(other.row, other.col)
+                continue
+            if now - prediction.time >= self.timeout_ms / 1000.0:
+                self.log.debug("Prediction was not echoed, suspending.")
+                self.suspended = True
+                self.rollback()
+            elif cursor_row != prediction.row:
+                self.rollback()
+            break
+
+    def confirmed(self, round_trip):
+        if self.round_trip is None:
+            self.round_trip = round_trip
+        else:
+            self.round_trip = 0.875 * self.round_trip + 0.125 * round_trip
+
+    def rollback(self):
+        for prediction in self.predictions:
+            self.update(prediction.row, prediction.col)
+        self.predictions = []
+
+    def update(self, row, col):
+        # the cursor is drawn after the predictions, so repaint it as well
+        rect = self.screen.create_rect_from_cell(row, col)
+        rect = rect.unite(self.screen.create_rect_from_cell(row, col + 1))
+        self.screen.parent.request_update(rect)
+
+    def draw(self, painter):
+        if not self.predictions or not self.is_visible():
+            return
+        cursor = self.screen.get_cursor()
+        painter.setFont(self.font)
+        for prediction in self.predictions:
+            rect = self.screen.create_rect_from_cell(prediction.row,
+                                                     prediction.col)
+            cell = self.screen.get_cell(prediction.row, prediction.col)
+            painter.fillRect(rect, cell.get_bgcolor())
+            painter.setPen(cursor.fgcolor)
+            painter.drawText(rect, QtCore.Qt.AlignLeft, prediction.ch)
+        (row, col) = self.get_next_position()
+        if self.screen.draw_cursor:
+            rect = self.screen.create_rect_from_cell(row, col)
+            painter.fillRect(rect, TerminalCursor.CURSOR_COLOR)
@@ -22,6 +22,8 @@ import os
 import sys
 import log
 import terminal
+import session
+from reactor import WorkerPool
 from PyQt4 import QtGui, QtCore
 from config import SafeConfig
 
@@ -122,10 +124,12 @@ class PyttySavedList(QtGui.QListWidget):
 
 
 class PyttyPage(QtGui.QWidget):
+    connectionFinished = QtCore.pyqtSignal(object, int)
+
     def __init__(self, tabs, show_controls=True):
         QtGui.QWidget.__init__(self)
         self.tabs = tabs
-        self.connection_threads = []
+        self.connectionFinished.connect(self.connection_finished)
         if show_controls:
             self.show_connection_page()
         self.connecting = False
@@ -307,47 +311,39 @@ class PyttyPage(QtGui.QWidget):
         idx = self.tabs.currentIndex()
         fname = os.path.join(sys.path[0], "icons", "loading.gif")
         self.tabs.setTabIcon(idx, QtGui.QIcon(fname))
-        term = terminal.SSHTerminalWidget(username, password, host, port)
+        config = terminal.TerminalConfig()
+        if config.getboolean("Session", "hostprocess", False):
+            term = session.HostedSSHTerminalWidget(username, password, host,
+                                                   port)
+        else:
+            term = terminal.SSHTerminalWidget(username, password, host, port)
 
         # for debugging
         if hasattr(self, 'record_check') and self.record_check.isChecked():
             term.recorder = open('recorder', 'w')
 
-        class ConnectionThread(QtCore.QThread):
-            def __init__(self, terminal, index):
-                QtCore.QThread.__init__(self)
-                self.terminal = terminal
-                self.idx = index
-                
-            def run(self):
-                self.terminal.connect()
-
-        th = ConnectionThread(term, idx)
-
+        # connecting blocks, so it is done by one of the shared workers;
+        # the signal brings the result back to the gui thread
         def connection_finished():
-            self.connecting = False
-            term = th.terminal
-            idx = th.idx
-            if term.channel.is_connected():
-                self.tabs.removeTab(idx)
-                self.tabs.add_new_tab(term, index=idx)
-            else:
-                if term.channel.authentication_error:
-                    self.status_label.setText("Authentication Error.")
-                else:
-                    self.status_label.setText("Unable to connect.")
-                self.login_button.setDisabled(False)
-                del term
-                self.tabs.setTabIcon(idx, QtGui.QIcon())
-            self.connection_threads.remove(th)
-
-        th.finished.connect(connection_finished)
-        th.start()
-        self.connection_threads.append(th)
+            self.connectionFinished.emit(term, idx)
+        WorkerPool.get_pool().submit(term.connect, connection_finished)
 
         term.titleChanged.connect(self.change_tab_title)
         term.closing.connect(self.close_tab)
 
+    def connection_finished(self, term, idx):
+        self.connecting = False
+        if term.channel.is_connected():
+            self.tabs.removeTab(idx)
+            self.tabs.add_new_tab(term, index=idx)
+        else:
+            if term.channel.authentication_error:
+                self.status_label.setText("Authentication Error.")
+            else:
+                self.status_label.setText("Unable to connect.")
+            self.login_button.setDisabled(False)
+            self.tabs.setTabIcon(idx, QtGui.QIcon())
+
     def change_tab_title(self, title):
         sender = self.sender()
         if hasattr(sender, 'custom_title') and sender.custom_title:
@@ -418,7 +414,10 @@ class PyttyTabWidget(QtGui.QTabWidget):
             index = self.currentIndex()
         if self.count() == 1:
             return QtCore.QCoreApplication.exit(0)
+        widget = self.widget(index)
         self.removeTab(index)
+        # a terminal lets go of its channel when it is closed
+        widget.close()
 
     def add_tab_button_clicked(self, clicked):
         self.add_new_tab()
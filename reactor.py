@@ -0,0 +1,291 @@
+'''
+    Copyright 2010, Andrew Thigpen
+
+    This file is part of PyTTY.
+
+    PyTTY is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    PyTTY is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with PyTTY.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import os
+import log
+import time
+import errno
+import select
+import threading
+from Queue import Queue
+from collections import deque
+from config import TerminalConfig
+
+class ChannelReactor(threading.Thread):
+    '''A single thread that waits on every open channel with select() and
+       hands whatever arrives to the channel, instead of one thread per
+       channel blocking in recv().
+
+       Readers are objects with a fileno() method and a handle_read()
+       method, which is called from the reactor thread when the file is
+       readable.  handle_read() must not block, and returns False once the
+       reader is done (end of file), which unregisters it.
+
+       Timers registered with add_timer() are run from the same thread,
+       roughly every interval seconds.'''
+    __reactor = None
+    __reactor_lock = threading.Lock()
+
+    def __init__(self):
+        threading.Thread.__init__(self)
+        self.setDaemon(True)
+        self.log = log.get_log(self)
+        self.readers = {}
+        self.timers = []
+        self.lock = threading.Lock()
+        # written to so select() returns when the readers change
+        (self.wakeup_read, self.wakeup_write) = os.pipe()
+        self.running = False
+
+    def get_reactor():
+        with ChannelReactor.__reactor_lock:
+            if ChannelReactor.__reactor is None:
+                ChannelReactor.__reactor = ChannelReactor()
+                ChannelReactor.__reactor.start()
+        return ChannelReactor.__reactor
+    get_reactor = staticmethod(get_reactor)
+
+    def wakeup(self):
+        os.write(self.wakeup_write, 'x')
+
+    def add_reader(self, reader):
+        with self.lock:
+            self.readers[reader.fileno()] = reader
+        self.wakeup()
+
+    def remove_reader(self, reader):
+        with self.lock:
+            for (fd, registered) in self.readers.items():
+                if registered is reader:
+                    del self.readers[fd]
+        self.wakeup()
+
+    def add_timer(self, interval, callback):
+        with self.lock:
+            self.timers.append([interval, time.time() + interval, callback])
+        self.wakeup()
+
+    def get_timeout(self, timers, now):
+        timeout = None
+        for (interval, deadline, callback) in timers:
+            if timeout is None or deadline - now < timeout:
+                timeout = max(deadline - now, 0)
+        return timeout
+
+    def run_timers(self, timers, now):
+        for timer in timers:
+            (interval, deadline, callback) = timer
+            if deadline > now:
+                continue
+            timer[1] = now + interval
+            try:
+                callback()
+            except Exception:
+                self.log.exception()
+
+    def run(self):
+        self.running = True
+        while self.running:
+            with self.lock:
+                readers = dict(self.readers)
+                timers = list(self.timers)
+            timeout = self.get_timeout(timers, time.time())
+            try:
+                (readable, writable, errors) = select.select(
+                        readers.keys() + [self.wakeup_read], [], [], timeout)
+            except select.error as e:
+                if e.args[0] == errno.EINTR:
+                    continue
+                raise
+            if self.wakeup_read in readable:
+                os.read(self.wakeup_read, 4096)
+                readable.remove(self.wakeup_read)
+            for fd in readable:
+                reader = readers[fd]
+                try:
+                    keep = reader.handle_read()
+                except Exception:
+                    self.log.exception()
+                    keep = False
+                if not keep:
+                    self.remove_reader(reader)
+            self.run_timers(timers, time.time())
+
+    def stop(self):
+        self.running = False
+        self.wakeup()
+
+
+class ChannelWriter(threading.Thread):
+    '''Sends what is typed or pasted from one thread, so a slow link never
+       blocks the gui.  Keystrokes queued within a few milliseconds of each
+       other go out in one packet, and large pastes are sent a chunk at a
+       time and only while the channel's window is open, taking turns with
+       the other channels.
+
+       Channels need the send_ready() and send() methods of a paramiko
+       Channel.'''
+    __writer = None
+    __writer_lock = threading.Lock()
+
+    def __init__(self):
+        threading.Thread.__init__(self)
+        self.setDaemon(True)
+        self.log = log.get_log(self)
+        self.config = TerminalConfig()
+        self.coalesce = self.config.getint("SSH", "coalescems", 5) / 1000.0
+        self.chunk_size = self.config.getint("SSH", "sendchunk", 4096)
+        # channel -> [deque of strings no longer than a chunk, queued
+        #             bytes, time of the first]
+        self.pending = {}
+        self.condition = threading.Condition()
+
+    def get_writer():
+        with ChannelWriter.__writer_lock:
+            if ChannelWriter.__writer is None:
+                ChannelWriter.__writer = ChannelWriter()
+                ChannelWriter.__writer.start()
+        return ChannelWriter.__writer
+    get_writer = staticmethod(get_writer)
+
+    def write(self, channel, data):
+        with self.condition:
+            entry = self.pending.get(channel)
+            if entry is None:
+                entry = [deque(), 0, time.time()]
+                self.pending[channel] = entry
+            # split up front, so a large paste is never copied per chunk
+            for start in xrange(0, len(data), self.chunk_size):
+                entry[0].append(data[start:start + self.chunk_size])
+            entry[1] += len(data)
+            self.condition.notify()
+
+    def take_chunks(self, now):
+        '''Returns a chunk for each channel that can be sent to now, and
+           how long to wait before looking again.  Called with the
+           condition held.'''
+        chunks = []
+        timeout = None
+        for (channel, entry) in self.pending.items():
+            (data, size, since) = entry
+            if size < self.chunk_size and now - since < self.coalesce:
+                wait = since + self.coalesce - now
+            elif getattr(channel, 'closed', False):
+                del self.pending[channel]
+                continue
+            elif not channel.send_ready():
+                # window closed, the server has not caught up yet
+                wait = 0.01
+            else:
+                chunk = []
+                length = 0
+                while data and length < self.chunk_size:
+                    piece = data.popleft()
+                    if length + len(piece) > self.chunk_size:
+                        data.appendleft(piece[self.chunk_size - length:])
+                        piece = piece[:self.chunk_size - length]
+                    chunk.append(piece)
+                    length += len(piece)
+                chunks.append((channel, ''.join(chunk)))
+                entry[1] -= length
+                if not data:
+                    del self.pending[channel]
+                continue
+            if timeout is None or wait < timeout:
+                timeout = wait
+        return (chunks, timeout)
+
+    def requeue(self, channel, data):
+        '''Puts back the part of a chunk the channel did not take.'''
+        with self.condition:
+            entry = self.pending.get(channel)
+            if entry is None:
+                self.pending[channel] = [deque([data]), len(data), 0]
+            else:
+                entry[0].appendleft(data)
+                entry[1] += len(data)
+
+    def drop(self, channel):
+        '''Forgets whatever is still queued for the channel.'''
+        with self.condition:
+            self.pending.pop(channel, None)
+
+    def run(self):
+        while True:
+            with self.condition:
+                (chunks, timeout) = self.take_chunks(time.time())
+                if not chunks:
+                    self.condition.wait(timeout)
+                    continue
+            for (channel, data) in chunks:
+                try:
+                    sent = channel.send(data)
+                except Exception:
+                    # the channel is gone, nothing more can be sent to it
+                    self.log.exception()
+                    self.drop(channel)
+                    continue
+                if sent < len(data):
+                    self.requeue(channel, data[sent:])
+
+
+class WorkerPool:
+    '''A fixed number of threads for the jobs that can only be done by
+       blocking, like connecting and authenticating, so opening many tabs
+       does not start a thread for each.'''
+    __pool = None
+    __pool_lock = threading.Lock()
+
+    def __init__(self, size):
+        self.log = log.get_log(self)
+        self.jobs = Queue()
+        self.threads = []
+        for x in xrange(0, size):
+            thread = threading.Thread(target=self.run)
+            thread.setDaemon(True)
+            thread.start()
+            self.threads.append(thread)
+
+    def get_pool():
+        with WorkerPool.__pool_lock:
+            if WorkerPool.__pool is None:
+                config = TerminalConfig()
+                size = config.getint("SSH", "connectthreads", 2)
+                WorkerPool.__pool = WorkerPool(max(size, 1))
+        return WorkerPool.__pool
+    get_pool = staticmethod(get_pool)
+
+    def submit(self, function, callback=None):
+        '''Runs function in one of the threads, and then callback (with
+           no arguments) in the same thread.'''
+        self.jobs.put((function, callback))
+
+    def run(self):
+        while True:
+            (function, callback) = self.jobs.get()
+            try:
+                function()
+            except Exception:
+                self.log.exception()
+            if callback is not None:
+                try:
+                    callback()
+                except Exception:
+                    self.log.exception()
+            self.jobs.task_done()
@@ -0,0 +1,107 @@
+'''
+    Copyright 2010, Andrew Thigpen
+
+    This file is part of PyTTY.
+
+    PyTTY is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    PyTTY is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with PyTTY.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import zlib
+import marshal
+from collections import OrderedDict
+
+def encode_row(states):
+    '''Encodes the TerminalCell.get_state() tuples of a row as its text,
+       one character per cell, the cells that do not hold exactly one
+       character and the runs of cells with the same attributes.'''
+    text = []
+    others = []
+    runs = []
+    for (col, state) in enumerate(states):
+        ch = state[0]
+        if len(ch) == 1:
+            text.append(ch)
+        else:
+            text.append(u'\x00')
+            if ch:
+                others.append((col, ch))
+        attributes = state[1:]
+        if runs and runs[-1][1] == attributes:
+            runs[-1][0] += 1
+        else:
+            runs.append([1, attributes])
+    return (u''.join(text), others, [tuple(run) for run in runs])
+
+def decode_row(encoded):
+    '''Returns the states encode_row() was given.'''
+    (text, others, runs) = encoded
+    chars = [ch if ch != u'\x00' else u'' for ch in text]
+    for (col, ch) in others:
+        chars[col] = ch
+    states = []
+    for (count, attributes) in runs:
+        for ch in chars[len(states):len(states) + count]:
+            states.append((ch,) + attributes)
+    return states
+
+
+class ScrollbackBlock:
+    '''Rows of the scrollback frozen together, compressed.  A frozen row
+       keeps its place in the buffer but has no cells, they are decoded
+       from the block again by a ScrollbackCache when it is read.'''
+    def __init__(self, rows):
+        self.rows = rows
+        encoded = [encode_row(row.get_state()) for row in rows]
+        self.data = zlib.compress(marshal.dumps(encoded))
+        for (idx, row) in enumerate(rows):
+            row.frozen = (self, idx)
+        self.freeze()
+
+    def decode(self):
+        return marshal.loads(zlib.decompress(self.data))
+
+    def freeze(self):
+        '''Drops the cells of the rows that are still frozen in the block,
+           the rest were written to and have their own now.'''
+        for row in self.rows:
+            if row.frozen is not None and row.frozen[0] is self:
+                del row[:]
+                row.states = None
+                row.spans = None
+
+
+class ScrollbackCache:
+    '''The blocks rows were last thawed from, decoded.  When a block drops
+       out of the cache its rows are frozen again.'''
+    def __init__(self, size=4):
+        self.size = max(size, 1)
+        self.blocks = OrderedDict()
+
+    def get_rows(self, block):
+        rows = self.blocks.pop(block, None)
+        if rows is None:
+            rows = block.decode()
+        self.blocks[block] = rows
+        while len(self.blocks) > self.size:
+            (old_block, old_rows) = self.blocks.popitem(last=False)
+            old_block.freeze()
+        return rows
+
+    def thaw(self, row):
+        '''Gives a frozen row its cells again.'''
+        (block, idx) = row.frozen
+        row.set_state(decode_row(self.get_rows(block)[idx]))
+
+    def clear(self):
+        self.blocks.clear()
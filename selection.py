@@ -0,0 +1,142 @@
+'''
+    Copyright 2010, Andrew Thigpen
+
+    This file is part of PyTTY.
+
+    PyTTY is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    PyTTY is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with PyTTY.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import re
+import string
+from config import TerminalConfig
+
+class CharacterClass:
+    BLANK       = 0
+    WORD        = 1
+    PUNCTUATION = 2
+
+class SelectionHelper:
+    '''Finds word and line boundaries for double/triple-click selection.
+
+       Characters are classified through a table compiled once from the
+       configured word characters.  A word is found by matching a regular
+       expression for the run of its class against the text of its row,
+       which is built once, so finding a word does not look at the cells
+       one at a time.'''
+    DEFAULT_WORD_CHARS = '"#$%&\'*+-/;=?@\\^_{|}~'
+
+    def __init__(self):
+        self.config = TerminalConfig()
+        word_chars = self.config.get("Selection", "wordchars",
+                                     self.DEFAULT_WORD_CHARS)
+        self.table = self.__compile_table(word_chars)
+        self.runs = {
+            CharacterClass.BLANK : self.__compile_run(CharacterClass.BLANK,
+                                                      r'\s'),
+            CharacterClass.WORD : self.__compile_run(CharacterClass.WORD,
+                                                     r'\S'),
+        }
+
+    def __compile_table(self, word_chars):
+        table = [CharacterClass.PUNCTUATION] * 128
+        for ch in string.whitespace:
+            table[ord(ch)] = CharacterClass.BLANK
+        for ch in string.ascii_letters + string.digits + word_chars:
+            if ord(ch) < 128:
+                table[ord(ch)] = CharacterClass.WORD
+        return table
+
+    def __compile_run(self, cls, other):
+        '''A run of characters of class cls, the ascii ones from the table
+           and the others by whether they are white space, see get_class().'''
+        chars = u"".join([re.escape(unichr(code)) for code in xrange(0, 128)
+                          if self.table[code] == cls])
+        return re.compile(u"(?:[%s]|(?![\\x00-\\x7f])%s)*" % (chars, other),
+                          re.UNICODE)
+
+    def get_class(self, ch):
+        if not ch:
+            return CharacterClass.BLANK
+        code = ord(ch[0])
+        if code < 128:
+            return self.table[code]
+        if ch.isspace():
+            return CharacterClass.BLANK
+        return CharacterClass.WORD
+
+    def get_text(self, screen, row):
+        '''The text of a row read through peek_row(), a character for each
+           cell, so frozen rows stay frozen.  A cell is classified by its
+           first character and an empty one is blank, except for the right
+           half of a wide character, which is classified as its left half
+           so a run of them is not broken up.'''
+        text = []
+        for cell in screen.peek_row(row)[:screen.width]:
+            if not cell.width and text:
+                text.append(text[-1])
+            else:
+                text.append(cell.ch[:1] or u' ')
+        return u"".join(text)
+
+    def find_word(self, screen, top, left):
+        '''Returns the first and last (row, col) of the run of cells that
+           share the class of the cell at (top, left).  Runs continue
+           across soft-wrapped rows.'''
+        width = screen.width
+        size = screen.get_buffer_size()
+        # past the end of the row there are only blank cells
+        text = self.get_text(screen, top).ljust(left + 1)
+        cls = self.get_class(text[left])
+        if cls == CharacterClass.PUNCTUATION:
+            return ((top, left), (top, left))
+        run = self.runs[cls]
+
+        (row, col, line) = (top, left, text)
+        while True:
+            # matched backwards from col
+            start = len(line) - 1 - col
+            col -= run.match(line[::-1], start).end() - start - 1
+            if col > 0 or row <= 0 or not screen.peek_row(row - 1).wrapped:
+                break
+            line = self.get_text(screen, row - 1)
+            if not line or self.get_class(line[-1]) != cls:
+                break
+            (row, col) = (row - 1, len(line) - 1)
+        first = (row, col)
+
+        (row, col, line) = (top, left, text)
+        while True:
+            col = run.match(line, col).end() - 1
+            if col < width - 1 or row >= size - 1 or \
+               not screen.peek_row(row).wrapped:
+                break
+            line = self.get_text(screen, row + 1)
+            if not line or self.get_class(line[0]) != cls:
+                break
+            (row, col) = (row + 1, 0)
+        last = (row, col)
+        return (first, last)
+
+    def find_line(self, screen, top):
+        '''Returns the first and last (row, col) of the logical line that
+           contains row top, following soft-wrapped rows.  A frozen row
+           keeps its wrapped flag, so only the row objects are looked at.'''
+        rows = screen.get_buffer()
+        first = top
+        while first > 0 and rows[first - 1].wrapped:
+            first -= 1
+        last = top
+        while last < len(rows) - 1 and rows[last].wrapped:
+            last += 1
+        return ((first, 0), (last, screen.width - 1))
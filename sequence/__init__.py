@@ -25,5 +25,6 @@ from dcs import *
 from decprivate import *
 from device import *
 from erase import *
+from osc import *
 from scroll import *
 
@@ -21,66 +21,175 @@ import re
 from sequencer import EscapeSequence, IncompleteEscapeException, UnsupportedEscapeException, TraceEndSequence, ScrollScreenException
 
 class CSIEscapeSequence(EscapeSequence):
+    '''Control Sequence Introducer.  Subclasses handle one control
+       sequence, identified by its FINAL byte and optionally a PRIVATE
+       parameter marker (one of <=>?) and INTERMEDIATE bytes, e.g. 
+       \x1b[?25h is PRIVATE = '?', FINAL = 'h'.  Their process() is called
+       with the parameters as a tuple of ints, None where a parameter was
+       left out.  A parameter with colon separated sub-parameters is a
+       tuple itself, e.g. 38:2:255:0:0 is (38, 2, 255, 0, 0).'''
     MATCH = r'\x1b\['
+    FINAL = None
+    PRIVATE = ''
+    INTERMEDIATE = ''
+
+    # everything up to and including the final byte
+    SEQUENCE = re.compile(r'[^@-~]*[@-~]')
+    SYNTAX = re.compile(r'(?P<private>[<=>?]?)(?P<params>[0-9:;]*)' + \
+                        r'(?P<intermediate>[ -/]*)(?P<final>[@-~])$')
+    MAX_PARSED = 1024
 
     def __init__(self, screen, channel):
         EscapeSequence.__init__(self, screen, channel)
         self.__sequences = {}
+        self.__parsed = {}
         for subclass in self.__class__.__subclasses__():
             inst = subclass(screen, channel)
-            last_ch = inst.MATCH[-1]
-            if not last_ch in self.__sequences:
-                self.__sequences[last_ch] = []
-            self.__sequences[last_ch].append(inst)
+            if inst.FINAL is None:
+                raise AttributeError("Escape sequence %s missing FINAL " \
+                                     "attribute" % inst)
+            key = (inst.PRIVATE, inst.INTERMEDIATE, inst.FINAL)
+            if key in self.__sequences:
+                raise AttributeError("Escape sequences %s and %s handle the" \
+                                     " same control sequence" % \
+                                     (self.__sequences[key], inst))
+            self.__sequences[key] = inst
+
+    def parse(self, sequence):
+        '''Returns ((private, intermediate, final), params) for the text
+           between CSI and the final byte inclusive, or None if it is not a
+           valid control sequence.'''
+        m = self.SYNTAX.match(sequence)
+        if not m:
+            return None
+        params = ()
+        if m.group('params'):
+            params = tuple([self.parse_param(param)
+                            for param in m.group('params').split(';')])
+        key = (m.group('private'), m.group('intermediate'), m.group('final'))
+        return (key, params)
+
+    def parse_param(self, param):
+        if ':' in param:
+            return tuple([self.parse_param(sub) for sub in param.split(':')])
+        if not param:
+            return None
+        return int(param)
 
     def process(self, data, match=None):
-        m = re.match("(?P<value>[^@-~]*)(?P<postfix>[@-~]{1})", data)
+        start = match.end()
+        m = self.SEQUENCE.match(data, start)
         if not m:
             raise IncompleteEscapeException()
-        postfix = m.group('postfix')
-        self.log.debug("CSI postfix: %s" % postfix)
-        if postfix in self.__sequences:
-            for seq in self.__sequences[postfix]:
-                seq_m = re.match(seq.MATCH, m.group(0))
-                if seq_m:
-                    self.log.debug("Processing CSI escape with: %s" % \
-                                   seq.__class__.__name__)
-                    try:
-                        seq.process(m.group('value'), match=seq_m)
-                    except TraceEndSequence:
-                        pass
-                    return len(m.group(0))
-        self.log.error("Did not find matching sequence for %s" % m.group(0))
-        raise UnsupportedEscapeException(m.end(), data[:m.end()])
+        sequence = m.group(0)
+        # the same few sequences are sent over and over again
+        parsed = self.__parsed.get(sequence)
+        if parsed is None:
+            parsed = self.parse(sequence)
+            if parsed is None:
+                self.log.error("Malformed control sequence %s" % sequence)
+                raise UnsupportedEscapeException(len(sequence), sequence)
+            if len(self.__parsed) >= self.MAX_PARSED:
+                self.__parsed.clear()
+            self.__parsed[sequence] = parsed
+        (key, params) = parsed
+        seq = self.__sequences.get(key)
+        if seq is None:
+            self.log.error("Did not find matching sequence for %s" % sequence)
+            raise UnsupportedEscapeException(len(sequence), sequence)
+        self.log.debug("Processing CSI escape with: %s" % \
+                       seq.__class__.__name__)
+        try:
+            seq.process(params)
+        except TraceEndSequence:
+            pass
+        return len(sequence)
+
+    def get_param(self, params, idx=0, default=1):
+        '''Returns the parameter at idx, or default if it was left out.'''
+        if idx >= len(params):
+            return default
+        param = params[idx]
+        if isinstance(param, tuple):
+            param = param[0]
+        if param is None:
+            return default
+        return param
 
 
 class OSCEscapeSequence(EscapeSequence):
+    '''Operating System Command.  Subclasses handle the commands listed in
+       COMMANDS, the number before the first ';' of the payload.  The rest
+       of the payload is passed on to their start_string(), feed_string()
+       and end_string() as it arrives, so it is never held in full unless
+       the subclass does so.'''
     MATCH = r'\x1b\]'
+    STRING = True
+    COMMANDS = ()
+    MAX_COMMAND = 16
 
-    def process(self, data, match=None):
+    def __init__(self, screen, channel):
+        EscapeSequence.__init__(self, screen, channel)
+        self.__sequences = {}
+        for subclass in self.__class__.__subclasses__():
+            inst = subclass(screen, channel)
+            for command in inst.COMMANDS:
+                self.__sequences[command] = inst
+        self.__match = None
+        self.__command = None
+        self.__handler = None
+
+    def start_string(self, match):
         self.log.debug("OSC")
-        m = re.match(r"(?P<value>.*?)(\x07|\x1b\\)", data)
-        if not m:
-            raise IncompleteEscapeException()
-        value = m.group('value')
-        length = len(m.group(0))
-        if not value:
+        self.__match = match
+        self.__command = u''
+        self.__handler = None
+
+    def feed_string(self, text):
+        if self.__command is not None:
+            end = text.find(';')
+            if end < 0:
+                self.__command += text
+                if len(self.__command) > self.MAX_COMMAND:
+                    self.log.error("Unknown OSC sequence: %s..." % \
+                                   self.__command[:self.MAX_COMMAND])
+                    self.__command = None
+                return
+            self.__start_command(self.__command + text[:end])
+            text = text[end + 1:]
+        if self.__handler is not None and text:
+            self.__handler.feed_string(text)
+
+    def end_string(self, terminator):
+        if self.__command is not None:
             self.log.warning("Missing value for OSC escape: %s" % \
-                             value.replace('\x1b', '\\x1b'))
-            return length
-        options = value.split(';')
-        if len(options) != 2:
-            self.log.error("Unknown OSC sequence: ", 
-                           value.replace('\x1b', '\\x1b'))
-            return length
-        if options[0] == '0' or options[0] == '2':
-            self.log.debug("Setting window title to: %s" % options[1])
-            self.screen.set_window_title(options[1])
-        return length
+                             self.__command)
+            self.__command = None
+            return
+        if self.__handler is not None:
+            handler = self.__handler
+            self.__handler = None
+            handler.end_string(terminator)
+
+    def cancel_string(self):
+        self.__command = None
+        if self.__handler is not None:
+            handler = self.__handler
+            self.__handler = None
+            handler.cancel_string()
+
+    def __start_command(self, command):
+        self.__command = None
+        self.__handler = self.__sequences.get(command)
+        if self.__handler is None:
+            self.log.error("Unknown OSC sequence: %s" % command)
+            return
+        self.__handler.start_string(self.__match)
 
 
 class DCSEscapeSequence(EscapeSequence):
     MATCH = r'\x1bP'
+    STRING = True
 
     def __init__(self, screen, channel):
         EscapeSequence.__init__(self, screen, channel)
@@ -90,26 +199,70 @@ class DCSEscapeSequence(EscapeSequence):
             self.__sequences.append(inst)
 
     def process(self, data, match=None):
+        '''data is the whole payload followed by its terminator, if any, as
+           passed on by end_string().'''
         self.log.debug("DCS")
-        m = re.match(r"(?P<value>.*?)(\x07|\x1b\\)", data)
-        if not m:
-            raise IncompleteEscapeException()
-        value = m.group('value')
-        length = len(m.group(0))
+        if data.endswith(u'\x1b\\'):
+            value = data[:-2]
+        elif data.endswith(u'\x07'):
+            value = data[:-1]
+        else:
+            value = data
         if not value:
-            self.log.warning("Missing value for OSC escape: %s" % \
-                             value.replace('\x1b', '\\x1b'))
-            return length
+            self.log.warning("Missing value for DCS escape.")
+            return len(data)
         for seq in self.__sequences:
-            seq_m = re.match(seq.MATCH, m.group('value'))
+            seq_m = re.match(seq.MATCH, value)
             if seq_m:
-                seq.process(m.group('value'), seq_m)
-                return length
+                seq.process(value, seq_m)
+                return len(data)
         self.log.warning("DCS escape codes not implemented yet: %s" % \
-                         data[:m.end()].replace('\x1b', '\\x1b'))
+                         value.replace('\x1b', '\\x1b'))
+        return len(data)
+
+
+class DesignateCharsetEscapeSequence(EscapeSequence):
+    '''ESC ( designates G0, ESC ) G1, ESC * G2 and ESC + G3, followed by
+       the final character of the set, which may have an intermediate
+       character before it.'''
+    MATCH = r'\x1b(?P<set>[()*+])'
+    SETS = '()*+'
+
+    def process(self, data, match=None):
+        start = match.end()
+        length = 1
+        if data[start:start + 1] and ' ' <= data[start] <= '/':
+            length = 2
+        if len(data) < start + length:
+            raise IncompleteEscapeException()
+        final = data[start:start + length]
+        idx = self.SETS.index(match.group('set'))
+        self.trace.end("Designate G%s character set: %s" % (idx, final))
+        self.screen.get_charsets().designate(idx, final)
         return length
 
 
+class LockingShiftEscapeSequence(EscapeSequence):
+    '''LS2 and LS3, invoke G2 or G3 like SO and SI do G1 and G0.'''
+    MATCH = r'\x1b(?P<shift>[no])'
+
+    def process(self, data, match=None):
+        idx = 2 if match.group('shift') == 'n' else 3
+        self.trace.end("Locking shift G%s" % idx)
+        self.screen.get_charsets().invoke(idx)
+        return 0
+
+
+class HorizontalTabSetEscapeSequence(EscapeSequence):
+    MATCH = r'\x1bH'
+
+    def process(self, data, match=None):
+        self.trace.end("Horizontal Tab Set (HTS)")
+        (row, col) = self.screen.get_cursor().get_row_col()
+        self.screen.get_tab_stops().set(col)
+        return 0
+
+
 class ReverseIndexEscapeSequence(EscapeSequence):
     MATCH = r'\x1bM'
 
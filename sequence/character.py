@@ -20,107 +20,199 @@
 from PyQt4 import QtGui
 from c1control import CSIEscapeSequence
 
+def generate_palette():
+    '''Returns the 256 color palette as packed 0xRRGGBB values.'''
+    palette = [
+        0x000000, 0xcd0000, 0x00cd00, 0xcdcd00,     # 30 - 37
+        0x0000ee, 0xcd00cd, 0x00cdcd, 0xe5e5e5,
+        0x7f7f7f, 0xff0000, 0x00ff00, 0xffff00,     # 90 - 97
+        0x5c5cff, 0xff00ff, 0x00ffff, 0xffffff,
+    ]
+    levels = [0] + [95 + (40 * (x - 1)) for x in range(1, 6)]
+    for red in levels:
+        for green in levels:
+            for blue in levels:
+                palette.append((red << 16) | (green << 8) | blue)
+    for idx in range(0, 24):
+        grey = (idx * 10) + 8
+        palette.append((grey << 16) | (grey << 8) | grey)
+    return palette
+
+
 class CharacterAttributeEscapeSequence(CSIEscapeSequence):
-    MATCH = r'(?P<value>([0-9]+;*)+)*m'
-
-    COLORS_256 = {}
-    COLORS = {
-        30: QtGui.QColor(0, 0, 0),
-        31: QtGui.QColor(205, 0, 0),
-        32: QtGui.QColor(0, 205, 0),
-        33: QtGui.QColor(205, 205, 0),
-        34: QtGui.QColor(0, 0, 238),
-        35: QtGui.QColor(205, 0, 205),
-        36: QtGui.QColor(0, 205, 205),
-        37: QtGui.QColor(229, 229, 229),
-        90: QtGui.QColor(127, 127, 127),
-        91: QtGui.QColor(255, 0, 0),
-        92: QtGui.QColor(0, 255, 0),
-        93: QtGui.QColor(255, 255, 0),
-        94: QtGui.QColor(92, 92, 255),
-        95: QtGui.QColor(255, 0, 255),
-        96: QtGui.QColor(0, 255, 255),
-        97: QtGui.QColor(255, 255, 255),
-    }
+    '''Select Graphic Rendition.  Each parameter value is looked up in a
+       table of handlers, and colors come from a palette of packed RGB
+       values whose QColors are created once and then shared.'''
+    FINAL = 'm'
+
+    PALETTE = generate_palette()
+    DEFAULT_FOREGROUND = 0xffffff
+    DEFAULT_BACKGROUND = 0x000000
+
+    # parameters taken by 38/48 and the color mode that follows them
+    EXTENDED_COLOR_ARGS = {5: 2, 2: 4}
+
+    # packed RGB -> QColor, also holds the truecolor colors seen so far
+    COLOR_CACHE = {}
+    MAX_CACHED_COLORS = 4096
 
     def __init__(self, *args, **kwargs):
         CSIEscapeSequence.__init__(self, *args, **kwargs)
-        self.__generate_256_colors()
+        self.__handlers = [None] * 256
+        self.__set_handler([0], self.reset)
+        self.__set_handler([1], self.bold)
+        self.__set_handler([4], self.underline)
+        self.__set_handler([7], self.inverse)
+        self.__set_handler([22], self.normal)
+        self.__set_handler([24], self.not_underlined)
+        self.__set_handler([27], self.positive)
+        self.__set_handler(range(30, 38), self.foreground)
+        self.__set_handler([38], self.extended_foreground)
+        self.__set_handler([39], self.default_foreground)
+        self.__set_handler(range(40, 48), self.background)
+        self.__set_handler([48], self.extended_background)
+        self.__set_handler([49], self.default_background)
+        self.__set_handler(range(90, 98), self.bright_foreground)
+        self.__set_handler(range(100, 108), self.bright_background)
+
+    def __set_handler(self, values, handler):
+        for value in values:
+            self.__handlers[value] = handler
+
+    def get_color(self, rgb):
+        color = self.COLOR_CACHE.get(rgb)
+        if color is None:
+            if len(self.COLOR_CACHE) >= self.MAX_CACHED_COLORS:
+                self.COLOR_CACHE.clear()
+            color = QtGui.QColor.fromRgb(rgb)
+            self.COLOR_CACHE[rgb] = color
+        return color
 
-    def process(self, data, match):
-        values = match.group('value')
-        self.trace.end("Character Attributes (SGR) [%s]" % values)
+    def process(self, params):
+        self.trace.end("Character Attributes (SGR) %s" % (params,))
         cursor = self.screen.get_cursor()
-        if not data: 
+        if not params: 
             self.log.debug("Resetting character attributes.")
             cursor.reset_attributes()
             return
-        options = values.split(';')
         idx = 0
-        while idx < len(options):
-            option = options[idx]
-            if int(option) == 0:
-                self.log.debug("Resetting character attributes.")
-                cursor.reset_attributes()
-            elif int(option) == 1:
-                self.log.debug("Set bold on")
-                cursor.set_bold()
-            elif int(option) == 4:
-                self.log.debug("Set underline on")
-                cursor.set_underline()
-            elif int(option) == 7:
-                self.log.debug("Set inverse on")
-                cursor.set_inverse()
-            elif int(option) == 27:
-                self.log.debug("Set inverse off")
-                cursor.set_inverse(False)
-            elif int(option) >= 30 and int(option) <= 37:
-                self.log.debug("Set foreground to %s" % option)
-                cursor.set_cell_foreground(self.COLORS[int(option)])
-            elif int(option) >= 40 and int(option) <= 47:
-                self.log.debug("Set background to %s" % option)
-                cursor.set_cell_background(self.COLORS[int(option) - 10])
-            elif int(option) == 38 or int(option) == 48:
+        while idx < len(params):
+            param = params[idx]
+            if isinstance(param, tuple):
+                # sub-parameters, only used by extended colors
+                value = param[0] or 0
+            else:
+                value = param or 0
+            handler = None
+            if value < 256:
+                handler = self.__handlers[value]
+            if handler is None:
+                self.log.warning("Unknown character attribute: %s" % value)
                 idx += 1
-                if not int(options[idx]) == 5:
-                    self.log.warning("Unknown extended color: ", option)
-                    idx += 1 
-                    continue
-                idx += 1
-                if int(option) == 38:
-                    self.log.debug("Set foreground to %s" % options[idx])
-                    cursor.set_cell_foreground(
-                            self.COLORS_256[int(options[idx])])
-                else:
-                    self.log.debug("Set background to %s" % options[idx])
-                    cursor.set_cell_background(
-                            self.COLORS_256[int(options[idx])])
-            elif int(option) >= 90 and int(option) <= 97:
-                self.log.debug("Set foreground to %s" % option)
-                cursor.set_cell_foreground(self.COLORS[int(option)])
-            elif int(option) >= 100 and int(option) <= 107:
-                self.log.debug("Set background to %s" % option)
-                cursor.set_cell_background(self.COLORS[int(option) - 10])
-            idx += 1
+            else:
+                idx = handler(cursor, value, params, idx)
 
-    def __generate_256_colors(self):
-        if self.COLORS_256.has_key(16):
-            # we already generated it, no need to do it again
-            return
-        for jdx in range(0, 8):
-            self.COLORS_256[jdx] = self.COLORS[jdx + 30]
-        for jdx in range(0, 8):
-            self.COLORS_256[8 + jdx] = self.COLORS[jdx + 90]
-        idx = 16
-        for r in range(0, 6):
-            for g in range(0, 6):
-                for b in range(0, 6):
-                    red = 95 + (40 * (r - 1)) if r > 0 else 0
-                    green = 95 + (40 * (g - 1)) if g > 0 else 0
-                    blue = 95 + (40 * (b - 1)) if b > 0 else 0
-                    self.COLORS_256[idx] = QtGui.QColor(red, green, blue)
-                    idx += 1
-        for idx in range(232, 256):
-            grey = ((idx - 232) * 10) + 8
-            self.COLORS_256[idx] = QtGui.QColor(grey, grey, grey)
+    # handlers are called with the value and index of their parameter, and
+    # return the index of the next one
+
+    def reset(self, cursor, value, params, idx):
+        cursor.reset_attributes()
+        return idx + 1
+
+    def bold(self, cursor, value, params, idx):
+        cursor.set_bold()
+        return idx + 1
+
+    def normal(self, cursor, value, params, idx):
+        cursor.set_bold(False)
+        return idx + 1
 
+    def underline(self, cursor, value, params, idx):
+        cursor.set_underline()
+        return idx + 1
+
+    def not_underlined(self, cursor, value, params, idx):
+        cursor.set_underline(False)
+        return idx + 1
+
+    def inverse(self, cursor, value, params, idx):
+        cursor.set_inverse()
+        return idx + 1
+
+    def positive(self, cursor, value, params, idx):
+        cursor.set_inverse(False)
+        return idx + 1
+
+    def foreground(self, cursor, value, params, idx):
+        color = self.PALETTE[value - 30]
+        cursor.set_cell_foreground(self.get_color(color))
+        return idx + 1
+
+    def background(self, cursor, value, params, idx):
+        color = self.PALETTE[value - 40]
+        cursor.set_cell_background(self.get_color(color))
+        return idx + 1
+
+    def bright_foreground(self, cursor, value, params, idx):
+        color = self.PALETTE[value - 90 + 8]
+        cursor.set_cell_foreground(self.get_color(color))
+        return idx + 1
+
+    def bright_background(self, cursor, value, params, idx):
+        color = self.PALETTE[value - 100 + 8]
+        cursor.set_cell_background(self.get_color(color))
+        return idx + 1
+
+    def default_foreground(self, cursor, value, params, idx):
+        cursor.set_cell_foreground(self.get_color(self.DEFAULT_FOREGROUND))
+        return idx + 1
+
+    def default_background(self, cursor, value, params, idx):
+        cursor.set_cell_background(self.get_color(self.DEFAULT_BACKGROUND))
+        return idx + 1
+
+    def extended_foreground(self, cursor, value, params, idx):
+        (color, idx) = self.parse_extended_color(params, idx)
+        if color is not None:
+            cursor.set_cell_foreground(self.get_color(color))
+        return idx
+
+    def extended_background(self, cursor, value, params, idx):
+        (color, idx) = self.parse_extended_color(params, idx)
+        if color is not None:
+            cursor.set_cell_background(self.get_color(color))
+        return idx
+
+    def parse_extended_color(self, params, idx):
+        '''Parses 38/48 followed by 5;n (256 colors) or 2;r;g;b (truecolor)
+           either as separate parameters or as colon sub-parameters, where
+           2 may be followed by a color space id.  Returns the packed RGB
+           color, or None if it is invalid, and the index of the next
+           parameter.  Separate parameters are always taken as 2 or 4 of
+           them, even if one has sub-parameters, so the attributes after
+           the color are read from where they are.'''
+        start = idx
+        param = params[idx]
+        if isinstance(param, tuple):
+            args = [arg or 0 for arg in param[1:]]
+            if args and args[0] == 2 and len(args) >= 5:
+                args = [2] + args[-3:]
+            idx += 1
+        else:
+            mode = None
+            if idx + 1 < len(params):
+                mode = params[idx + 1]
+            count = self.EXTENDED_COLOR_ARGS.get(mode, 1)
+            args = params[idx + 1:idx + 1 + count]
+            idx += 1 + count
+            if [arg for arg in args if isinstance(arg, tuple)]:
+                args = []
+            else:
+                args = [arg or 0 for arg in args]
+        if len(args) == 2 and args[0] == 5 and args[1] < 256:
+            return (self.PALETTE[args[1]], idx)
+        if len(args) == 4 and args[0] == 2:
+            (red, green, blue) = [min(arg, 255) for arg in args[1:]]
+            return ((red << 16) | (green << 8) | blue, idx)
+        self.log.warning("Unknown extended color: %s" % (params[start:idx],))
+        return (None, idx)
@@ -19,75 +19,99 @@
 
 from c1control import CSIEscapeSequence
 
+class CursorForwardTabulationEscapeSequence(CSIEscapeSequence):
+    FINAL = 'I'
+
+    def process(self, params):
+        times = self.get_param(params, 0, 1)
+        self.trace.end("Cursor Forward Tabulation (CHT) [%s]" % times)
+        cursor = self.screen.get_cursor()
+        cursor.tab(times)
+
+
+class CursorBackwardTabulationEscapeSequence(CSIEscapeSequence):
+    FINAL = 'Z'
+
+    def process(self, params):
+        times = self.get_param(params, 0, 1)
+        self.trace.end("Cursor Backward Tabulation (CBT) [%s]" % times)
+        cursor = self.screen.get_cursor()
+        cursor.back_tab(times)
+
+
+class TabClearEscapeSequence(CSIEscapeSequence):
+    FINAL = 'g'
+
+    CLEAR_CURRENT = 0   # default
+    CLEAR_ALL     = 3
+
+    def process(self, params):
+        value = self.get_param(params, 0, self.CLEAR_CURRENT)
+        self.trace.end("Tab Clear (TBC) [%s]" % value)
+        stops = self.screen.get_tab_stops()
+        if value == self.CLEAR_CURRENT:
+            (row, col) = self.screen.get_cursor().get_row_col()
+            stops.clear(col)
+        elif value == self.CLEAR_ALL:
+            stops.clear_all()
+
+
 class CursorUpEscapeSequence(CSIEscapeSequence):
-    MATCH = r'[0-9]*A'
+    FINAL = 'A'
 
-    def process(self, data, match=None):
-        times = 1
-        if data:
-            times = int(data)
+    def process(self, params):
+        times = self.get_param(params, 0, 1)
         self.trace.end("Cursor Up (CUU) [%s]" % times)
         cursor = self.screen.get_cursor()
         cursor.up(times)
 
 
 class CursorDownEscapeSequence(CSIEscapeSequence):
-    MATCH = r'[0-9]*B'
+    FINAL = 'B'
 
-    def process(self, data, match=None):
-        times = 1
-        if data:
-            times = int(data)
+    def process(self, params):
+        times = self.get_param(params, 0, 1)
         self.trace.end("Cursor Down (CUD) [%s]" % times)
         cursor = self.screen.get_cursor()
         cursor.down(times)
 
 
 class CursorRightEscapeSequence(CSIEscapeSequence):
-    MATCH = r'[0-9]*C'
+    FINAL = 'C'
 
-    def process(self, data, match=None):
-        times = 1
-        if data:
-            times = int(data)
+    def process(self, params):
+        times = self.get_param(params, 0, 1)
         self.trace.end("Cursor Right (CUF) [%s]" % times)
         cursor = self.screen.get_cursor()
         cursor.right(times)
 
 
 class CursorLeftEscapeSequence(CSIEscapeSequence):
-    MATCH = r'[0-9]*D'
+    FINAL = 'D'
 
-    def process(self, data, match=None):
-        times = 1
-        if data:
-            times = int(data)
+    def process(self, params):
+        times = self.get_param(params, 0, 1)
         self.trace.end("Cursor Left (CUB) [%s]" % times)
         cursor = self.screen.get_cursor()
         cursor.left(times)
 
 
 class CursorPositionEscapeSequence(CSIEscapeSequence):
-    MATCH = r'((?P<row>[0-9]+);(?P<col>[0-9]+))*H'
+    FINAL = 'H'
 
-    def process(self, data, match=None):
-        row = match.group('row') or 1
-        col = match.group('col') or 1
+    def process(self, params):
+        row = self.get_param(params, 0, 1)
+        col = self.get_param(params, 1, 1)
         self.trace.end("Cursor Position (CUP) (%s, %s)" % (row, col))
         cursor = self.screen.get_cursor()
-        if row == 1 and col == 1:
-            cursor.reset_position()
-        else:
-            cursor.set_row_col(int(row) - 1, int(col) - 1)
+        cursor.set_position(row - 1, col - 1)
 
 
 class CursorCharacterAbsoluteEscapeSequence(CSIEscapeSequence):
-    MATCH = r'[0-9]*G'
+    FINAL = 'G'
 
-    def process(self, data, match=None):
-        col = 1
-        if data:
-            col = int(data)
+    def process(self, params):
+        col = self.get_param(params, 0, 1)
         self.trace.end("Cursor Character Absolute (CHA) (%s)" % col)
         cursor = self.screen.get_cursor()
         (row, old_col) = cursor.get_row_col()
@@ -95,13 +119,13 @@ class CursorCharacterAbsoluteEscapeSequence(CSIEscapeSequence):
 
 
 class LinePositionAbsoluteEscapeSequence(CSIEscapeSequence):
-    MATCH = r'(?P<row>[0-9]+)*(;(?P<col>[0-9]+))*d'
+    FINAL = 'd'
 
-    def process(self, data, match):
+    def process(self, params):
         cursor = self.screen.get_cursor()
-        row = match.group('row') or 1
-        col = match.group('col') or cursor.col + 1
-        (row, col) = (int(row) - 1, int(col) - 1)
+        row = self.get_param(params, 0, 1)
+        col = self.get_param(params, 1, cursor.col + 1)
+        (row, col) = (row - 1, col - 1)
         self.trace.end("Line Position Absolute (VPA) (%s, %s)" % (row, col))
-        cursor.set_row_col(row, col)
+        cursor.set_position(row, col)
 
@@ -20,71 +20,74 @@
 from c1control import CSIEscapeSequence
 
 class DECPrivateModeSetEscapeSequence(CSIEscapeSequence):
-    MATCH = r'\?(?P<value>([0-9]+;*)+)h'
+    PRIVATE = '?'
+    FINAL = 'h'
 
-    def process(self, data, match):
-        values = match.group('value')
-        self.trace.end("DEC Private Mode Set (DECSET) [%s]" % values)
-        for val in values.split(';'):
-            if int(val) == 1:
+    def process(self, params):
+        self.trace.end("DEC Private Mode Set (DECSET) %s" % (params,))
+        for val in params:
+            if val == 1:
                 self.screen.set_cursor_keys(application=True)
-            elif int(val) == 7:
+            elif val == 7:
                 cursor = self.screen.get_cursor()
                 cursor.set_wraparound(wrap=True)
-            elif int(val) == 12:
+            elif val == 12:
                 self.screen.blink_cursor(True)
-            elif int(val) == 25:
+            elif val == 25:
                 self.screen.show_cursor(True)
-            elif int(val) == 1047:
+            elif val == 1047:
                 self.screen.set_alternate_buffer(True)
-            elif int(val) == 1048:
+            elif val == 1048:
                 self.screen.save_cursor()
-            elif int(val) == 1049:
+            elif val == 1049:
                 self.screen.save_cursor()
                 self.screen.set_alternate_buffer(True)
                 self.screen.clear_screen()
+            elif val == 2004:
+                self.screen.set_bracketed_paste(True)
             else:
                 self.log.warning("Unknown DEC Private Mode Set value: %s" % \
-                                 value)
+                                 val)
 
 
 class DECPrivateModeResetEscapeSequence(CSIEscapeSequence):
-    MATCH = r'\?(?P<value>([0-9]+;*)+)l'
+    PRIVATE = '?'
+    FINAL = 'l'
 
-    def process(self, data, match):
-        values = match.group('value')
-        self.trace.end("DEC Private Mode Set (DECRST) [%s]" % values)
-        for val in values.split(';'):
-            if int(val) == 1:
+    def process(self, params):
+        self.trace.end("DEC Private Mode Set (DECRST) %s" % (params,))
+        for val in params:
+            if val == 1:
                 self.screen.set_cursor_keys(application=False)
-            elif int(val) == 7:
+            elif val == 7:
                 cursor = self.screen.get_cursor()
                 cursor.set_wraparound(wrap=False)
-            elif int(val) == 12:
+            elif val == 12:
                 self.screen.blink_cursor(False)
-            elif int(val) == 25:
+            elif val == 25:
                 self.screen.show_cursor(False)
-            elif int(val) == 1047:
+            elif val == 1047:
                 self.screen.set_alternate_buffer(False)
-            elif int(val) == 1048:
+            elif val == 1048:
                 self.screen.restore_cursor()
-            elif int(val) == 1049:
+            elif val == 1049:
                 self.screen.set_alternate_buffer(False)
                 self.screen.restore_cursor()
+            elif val == 2004:
+                self.screen.set_bracketed_paste(False)
             else:
                 self.log.warning("Unknown DEC Private Mode Reset value: %s" % \
                                  val)
 
 
 class ResetModeEscapeSequence(CSIEscapeSequence):
-    MATCH = r'(?P<value>([0-9]+;*)+)l'
+    FINAL = 'l'
 
-    def process(self, data, match):
-        values = match.group('value')
-        self.trace.end("Reset Mode (RM) [%s]" % values)
+    def process(self, params):
+        self.trace.end("Reset Mode (RM) %s" % (params,))
         cursor = self.screen.get_cursor()
-        for val in values.split(';'):
-            if int(val) == 4:
+        for val in params:
+            if val == 4:
                 self.log.debug("Replace mode")
                 cursor.set_replace_mode(replace=True)
             else:
@@ -92,14 +95,13 @@ class ResetModeEscapeSequence(CSIEscapeSequence):
 
 
 class SetModeEscapeSequence(CSIEscapeSequence):
-    MATCH = r'(?P<value>([0-9]+;*)+)h'
+    FINAL = 'h'
 
-    def process(self, data, match):
-        values = match.group('value')
-        self.trace.end("Set Mode (SM) [%s]" % values)
+    def process(self, params):
+        self.trace.end("Set Mode (SM) %s" % (params,))
         cursor = self.screen.get_cursor()
-        for val in values.split(';'):
-            if int(val) == 4:
+        for val in params:
+            if val == 4:
                 self.log.debug("Insert mode")
                 cursor.set_replace_mode(replace=False)
             else:
@@ -20,15 +20,16 @@
 from c1control import CSIEscapeSequence
 
 class SendPrimaryDeviceAttributesEscapeSequence(CSIEscapeSequence):
-    MATCH = r'>(?P<value>[0-1]*)c'
+    PRIVATE = '>'
+    FINAL = 'c'
 
     VT100 = 0
     VT220 = 1
 
-    def process(self, data, match):
-        value = match.group('value') or 0
+    def process(self, params):
+        value = self.get_param(params, 0, 0)
         self.trace.end("Send Primary Device Attributes (Secondary DA): %s" % \
                        value)
-        if int(value) == 0:
+        if value == 0:
             self.channel.send_keypress("\x1b[>1;2600;0c")
 
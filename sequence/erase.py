@@ -17,21 +17,18 @@
     along with PyTTY.  If not, see <http://www.gnu.org/licenses/>.
 '''
 
-import terminal
 from c1control import CSIEscapeSequence
 
 class EraseInDisplayEscapeSequence(CSIEscapeSequence):
-    MATCH = r'[0-3]*J'
+    FINAL = 'J'
 
     ERASE_BELOW = 0     # default
     ERASE_ABOVE = 1
     ERASE_ALL   = 2
     ERASE_SAVED = 3
 
-    def process(self, data, match=None):
-        value = self.ERASE_BELOW
-        if data:
-            value = int(data)
+    def process(self, params):
+        value = self.get_param(params, 0, self.ERASE_BELOW)
         self.trace.end("Erase in display (ED) [%s]" % value)
         if value == self.ERASE_BELOW:
             self.erase_below()
@@ -44,131 +41,107 @@ class EraseInDisplayEscapeSequence(CSIEscapeSequence):
             
 
     def erase_below(self):
-        self.log.warning("Erase below not yet implemented!")
+        cursor = self.screen.get_cursor()
+        (row, col) = cursor.get_row_col()
+        (width, height) = self.screen.get_size()
+        color = cursor.get_erase_color()
+        self.screen.erase_span(row, col, width, color)
+        bottom = self.screen.get_base_row() + height
+        self.screen.erase_rows(row + 1, bottom, color)
 
     def erase_above(self):
-        self.log.warning("Erase above not yet implemented!")
+        cursor = self.screen.get_cursor()
+        (row, col) = cursor.get_row_col()
+        color = cursor.get_erase_color()
+        self.screen.erase_rows(self.screen.get_base_row(), row, color)
+        self.screen.erase_span(row, 0, col + 1, color)
 
     def erase_all(self):
-        self.screen.clear_screen()
+        cursor = self.screen.get_cursor()
+        self.screen.clear_screen(cursor.get_erase_color())
 
     def erase_saved_lines(self):
-        self.log.warning("Erase saved lines not yet implemented!")
+        self.screen.erase_scrollback()
         
 
 class EraseInLineEscapeSequence(CSIEscapeSequence):
-    MATCH = r'[0-2]*K'
+    FINAL = 'K'
 
     ERASE_RIGHT = 0     # default
     ERASE_LEFT  = 1
     ERASE_ALL   = 2
 
-    def process(self, data, match=None):
-        value = self.ERASE_RIGHT
-        if data:
-            value = int(data)
+    def process(self, params):
+        value = self.get_param(params, 0, self.ERASE_RIGHT)
         self.trace.end("Erase in Line (EL) [%s]" % value)
-        if value == self.ERASE_RIGHT:
-            self.erase_right()
-        elif value == self.ERASE_LEFT:
-            self.erase_left()
-        elif value == self.ERASE_ALL:
-            self.erase_all()
-
-    def erase_right(self):
-        self.log.debug("Erase to right of cursor.")
         cursor = self.screen.get_cursor()
         (row, col) = cursor.get_row_col()
         (width, height) = self.screen.get_size()
-        for idx in range(col, width):
-            cell = self.screen.get_cell(row, idx)
-            cell.reset()
-            cell.set_dirty()
-
-    def erase_left(self):
-        self.log.warning("Erase left not yet implemented.")
-
-    def erase_all(self):
-        self.log.warning("Erase left not yet implemented.")
+        if value == self.ERASE_RIGHT:
+            self.log.debug("Erase to right of cursor.")
+            (first, last) = (col, width)
+        elif value == self.ERASE_LEFT:
+            self.log.debug("Erase to left of cursor.")
+            (first, last) = (0, col + 1)
+        elif value == self.ERASE_ALL:
+            self.log.debug("Erase line.")
+            (first, last) = (0, width)
+        else:
+            return
+        self.screen.erase_span(row, first, last, cursor.get_erase_color())
 
 
 class DeleteCharactersEscapeSequence(CSIEscapeSequence):
-    MATCH = r'[0-9]*P'
+    FINAL = 'P'
 
-    def process(self, data, match):
-        times = 1
-        if data:
-            times = int(data)
+    def process(self, params):
+        times = self.get_param(params, 0, 1)
         self.trace.end("Delete characters (DCH) [%s]" % times)
         cursor = self.screen.get_cursor()
         (row, col) = cursor.get_row_col()
-        buf = self.screen.get_buffer()
-        cells = buf[row][col:col + times]
-        del buf[row][col:col + times]
-        for cell in cells:
-            cell.reset()
-        buf[row].extend(cells)
-        (width, height) = self.screen.get_size()
-        for idx in range(col, width):
-            buf[row][idx].set_dirty()
+        self.screen.get_row(row).delete_cells(col, times,
+                                              cursor.get_erase_color())
 
 
 class InsertCharacterEscapeSequence(CSIEscapeSequence):
-    MATCH = r'[0-9]*@'
+    FINAL = '@'
 
-    def process(self, data, match):
-        characters = 1
-        if data:
-            characters = int(data)
+    def process(self, params):
+        characters = self.get_param(params, 0, 1)
+        self.trace.end("Insert characters (ICH) [%s]" % characters)
         cursor = self.screen.get_cursor()
         (row, col) = cursor.get_row_col()
-        buf = self.screen.get_buffer()
         self.log.debug("Inserting cells at %s" % col)
-        cells = [buf[row].insert(col, terminal.TerminalCell()) \
-                 for x in range(0, characters)]
-        (width, height) = self.screen.get_size()
-        cols = len(buf[row])
-        if cols >= width:
-            del buf[row][width:cols + 1]
-        for idx in range(col, width):
-            buf[row][idx].set_dirty()
+        self.screen.get_row(row).insert_cells(col, characters,
+                                              cursor.get_erase_color())
 
 
 class InsertLinesEscapeSequence(CSIEscapeSequence):
-    MATCH = r'[0-9]*L'
+    FINAL = 'L'
 
-    def process(self, data, match):
-        lines = 1
-        if data:
-            lines = int(data)
+    def process(self, params):
+        lines = self.get_param(params, 0, 1)
         self.trace.end("Insert lines (IL) [%s]" % lines)
         self.screen.insert_row(lines)
 
 
 class DeleteLinesEscapeSequence(CSIEscapeSequence):
-    MATCH = r'[0-9]*M'
+    FINAL = 'M'
 
-    def process(self, data, match):
-        lines = 1
-        if data:
-            lines = int(data)
+    def process(self, params):
+        lines = self.get_param(params, 0, 1)
         self.trace.end("Delete lines (DL) [%s]" % lines)
         self.screen.delete_row(lines)
 
 
 class EraseCharacterEscapeSequence(CSIEscapeSequence):
-    MATCH = r'[0-9]*X'
+    FINAL = 'X'
 
-    def process(self, data, match):
-        characters = 1
-        if data:
-            characters = int(data)
+    def process(self, params):
+        characters = self.get_param(params, 0, 1)
         self.trace.end("Erase Character (ECH) [%s]" % characters)
         cursor = self.screen.get_cursor()
         (row, col) = cursor.get_row_col()
-        for cnt in xrange(0, characters):
-            cursor.reset_cell()
-            cursor.advance_column()
-        cursor.set_row_col(row, col)
-
-
+        (width, height) = self.screen.get_size()
+        self.screen.erase_span(row, col, min(col + characters, width),
+                               cursor.get_erase_color())
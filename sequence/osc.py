@@ -0,0 +1,120 @@
+'''
+    Copyright 2010, Andrew Thigpen
+
+    This file is part of PyTTY.
+
+    PyTTY is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    PyTTY is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with PyTTY.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import re
+import binascii
+from c1control import OSCEscapeSequence
+
+class WindowTitleEscapeSequence(OSCEscapeSequence):
+    COMMANDS = ('0', '2')
+    MAX_TITLE = 1024
+
+    def start_string(self, match):
+        self.title = u''
+
+    def feed_string(self, text):
+        if len(self.title) < self.MAX_TITLE:
+            self.title = (self.title + text)[:self.MAX_TITLE]
+
+    def end_string(self, terminator):
+        self.log.debug("Setting window title to: %s" % self.title)
+        self.screen.set_window_title(self.title)
+
+
+class ClipboardEscapeSequence(OSCEscapeSequence):
+    '''OSC 52, sets the clipboard to base64 encoded text, as used by tmux
+       and vim to copy over ssh.  The payload is decoded as it arrives, and
+       text longer than [Selection] remoteclipboardsize bytes is dropped.
+       Reading the clipboard with '?' is not supported, a remote program
+       should not be able to see what was copied elsewhere.'''
+    COMMANDS = ('52',)
+    NOT_BASE64 = re.compile(r'[^A-Za-z0-9+/=]')
+
+    def __init__(self, screen, channel):
+        OSCEscapeSequence.__init__(self, screen, channel)
+        self.enabled = self.config.getboolean("Selection", "remoteclipboard",
+                                              True)
+        self.max_size = self.config.getint("Selection",
+                                           "remoteclipboardsize", 1048576)
+        self.decoded = None
+
+    def start_string(self, match):
+        # the selection parameter comes before the data
+        self.selection = u''
+        self.encoded = ''
+        self.decoded = []
+        self.size = 0
+        if not self.enabled:
+            self.log.debug("Remote clipboard is disabled.")
+            self.decoded = None
+
+    def feed_string(self, text):
+        if self.decoded is None:
+            return
+        if self.selection is not None:
+            end = text.find(';')
+            if end < 0:
+                self.selection += text
+                return
+            self.selection = self.selection + text[:end]
+            self.target_selection = 'c' not in self.selection and \
+                                    'p' in self.selection
+            self.selection = None
+            text = text[end + 1:]
+        if text.startswith('?') and not self.encoded and not self.size:
+            self.log.warning("Clipboard query is not supported.")
+            self.decoded = None
+            return
+        # decode whole groups of four, the rest waits for the next piece
+        encoded = self.encoded + str(self.NOT_BASE64.sub('', text))
+        end = len(encoded) - (len(encoded) % 4)
+        self.encoded = encoded[end:]
+        self.decode(encoded[:end])
+
+    def decode(self, encoded):
+        if not encoded:
+            return
+        try:
+            data = binascii.a2b_base64(encoded)
+        except binascii.Error:
+            self.log.warning("Clipboard data is not valid base64.")
+            self.decoded = None
+            return
+        self.size += len(data)
+        if self.size > self.max_size:
+            self.log.warning("Dropping clipboard data longer than %s " \
+                             "bytes." % self.max_size)
+            self.decoded = None
+            return
+        self.decoded.append(data)
+
+    def end_string(self, terminator):
+        if self.decoded is None or self.selection is not None:
+            return
+        if self.encoded:
+            self.decode(self.encoded + '=' * (4 - len(self.encoded)))
+            if self.decoded is None:
+                return
+        text = unicode(''.join(self.decoded), 'utf-8', 'replace')
+        self.decoded = None
+        self.log.debug("Setting clipboard to %s characters" % len(text))
+        self.screen.set_clipboard_text(text, self.target_selection)
+
+    def cancel_string(self):
+        self.decoded = None
@@ -20,17 +20,38 @@
 from c1control import CSIEscapeSequence
 
 class ScrollingRegionEscapeSequence(CSIEscapeSequence):
-    MATCH = r'((?P<top>[0-9]+);(?P<bottom>[0-9]+))*r'
+    FINAL = 'r'
 
-    def process(self, data, match):
-        top = match.group('top') 
-        bottom = match.group('bottom')
+    def process(self, params):
+        top = self.get_param(params, 0, None)
+        bottom = self.get_param(params, 1, None)
         self.trace.end("Set scrolling region (%s, %s)" % (top, bottom))
         (width, height) = self.screen.get_size()
-        if top is None and bottom is None:
-            self.screen.set_buffer_scroll_range(0, height)
-        else:
-            self.screen.set_buffer_scroll_range(int(top), int(bottom))
+        top = min(top or 1, height)
+        bottom = min(bottom or height, height)
+        if top >= bottom:
+            self.log.warning("Invalid scrolling region (%s, %s)" % \
+                             (top, bottom))
+            return
+        self.screen.set_buffer_scroll_range(top - 1, bottom)
         cursor = self.screen.get_cursor()
         cursor.reset_position()
 
+
+class ScrollUpEscapeSequence(CSIEscapeSequence):
+    FINAL = 'S'
+
+    def process(self, params):
+        lines = self.get_param(params, 0, 1)
+        self.trace.end("Scroll up (SU) [%s]" % lines)
+        self.screen.scroll_lines(lines)
+
+
+class ScrollDownEscapeSequence(CSIEscapeSequence):
+    FINAL = 'T'
+
+    def process(self, params):
+        lines = self.get_param(params, 0, 1)
+        self.trace.end("Scroll down (SD) [%s]" % lines)
+        self.screen.scroll_lines(-lines)
+
@@ -19,6 +19,7 @@
 
 import re
 import log
+import codecs
 from config import TerminalConfig
 from PyQt4 import QtGui, QtCore
 
@@ -67,7 +68,21 @@ class TraceSequence:
 
 
 class EscapeSequence(object):
+    '''Subclasses match their introducer with MATCH.  process() is called
+       with all of the input and the match, so what follows the introducer
+       starts at match.end(), and returns how many characters of that it
+       used.  Those with STRING set
+       are followed by a payload ended by BEL or ST (e.g. OSC and DCS),
+       which the sequencer passes on as it arrives: start_string() is
+       called with the match of the introducer, feed_string() with each
+       piece of the payload and end_string() with the terminator, which
+       is empty if the string was ended by the start of another escape
+       sequence.  If it is cancelled by CAN or SUB cancel_string() is
+       called instead of end_string().  By default the payload is
+       collected, up to [Sequencer] maxpayload characters, and process()
+       is called with it and the terminator instead of the input.'''
     REQUIRED_ATTRS = ["MATCH"]
+    STRING = False
     def __init__(self, screen, channel):
         self.log = log.get_log(self)
         self.trace = TraceSequence(fall_through=True) #TODO change fall_through 
@@ -78,11 +93,41 @@ class EscapeSequence(object):
             if not hasattr(self, attr):
                 raise AttributeError("Escape sequence %s missing %s" + \
                                      "attribute" % (self, attr))
+        if self.STRING:
+            self.max_payload = self.config.getint("Sequencer", "maxpayload",
+                                                  65536)
+            self.payload = None
 
     def process(self, data, match=None):
         '''Subclasses should implement this.'''
         self.log.warning("Process not implemented.")
 
+    def start_string(self, match):
+        self.payload_match = match
+        self.payload = []
+        self.payload_size = 0
+
+    def feed_string(self, text):
+        self.payload_size += len(text)
+        if self.payload is None:
+            return
+        if self.payload_size > self.max_payload:
+            self.log.warning("Dropping payload longer than %s characters" % \
+                             self.max_payload)
+            self.payload = None
+            return
+        self.payload.append(text)
+
+    def end_string(self, terminator):
+        if self.payload is None:
+            return
+        data = u''.join(self.payload) + terminator
+        self.payload = None
+        self.process(data, match=self.payload_match)
+
+    def cancel_string(self):
+        self.payload = None
+
 
 import sequence
 
@@ -109,69 +154,127 @@ class ApplicationKeypadEscapeSequence(EscapeSequence):
 
 
 class TerminalEscapeSequencer:
+    '''Keeps its state between reads, so a sequence split across them is
+       not scanned again from its start: the payload of an OSC or DCS
+       string is passed on to its escape sequence a read at a time, and
+       the start of any other sequence is kept until it is complete, up to
+       MAX_SEQUENCE characters.'''
+    MAX_SEQUENCE = 256
+    STRING_END = re.compile(u'[\x07\x18\x1a\x1b]')
+    CONTROL = re.compile(u'[\x00-\x1f\x7f]')
+
     def __init__(self, screen, channel):
         self.log = log.get_log(self)
         self.trace = TraceSequence(fall_through=True) #TODO change fall_through 
         self.screen = screen
         self.channel = channel
-        self.__previous_sequence = ""
+        # held while the screen is being modified by the sequencer
+        self.lock = screen.lock
+        # start of a sequence that did not fit in the last read
+        self.__incomplete = ""
+        # escape sequence of the OSC or DCS string being received, and
+        # whether the last read ended with an ESC that may start its ST
+        self.__string = None
+        self.__string_escaped = False
         self.config = TerminalConfig()
         self.encoding = self.config.get("Sequencer", "encoding", "utf-8")
+        # characters split across reads are kept by the decoder
+        self.decoder = codecs.getincrementaldecoder(self.encoding)('replace')
+        self.skip_offscreen = self.config.getboolean("Sequencer", 
+                                                     "skipoffscreen", True)
+        # C0 controls by code, the ones left out are ignored
+        self.__controls = [None] * 32
+        self.__controls[0x07] = self.bell
+        self.__controls[0x08] = self.backspace
+        self.__controls[0x09] = self.horizontal_tab
+        self.__controls[0x0a] = self.line_feed
+        self.__controls[0x0b] = self.line_feed     # VT
+        self.__controls[0x0c] = self.line_feed     # FF
+        self.__controls[0x0d] = self.carriage_return
+        self.__controls[0x0e] = self.shift_out
+        self.__controls[0x0f] = self.shift_in
+        # the escape sequences, with their MATCH compiled
         self.__sequences = []
         sequences = EscapeSequence.__subclasses__()
         for seq in sequences:
             inst = seq(screen, channel)
-            self.__sequences.append(inst)
+            self.__sequences.append((re.compile(inst.MATCH), inst))
 
     def process(self, data):
-        data = unicode(data, encoding=self.encoding)
-        if self.__previous_sequence:
-            data = self.__previous_sequence + data
-            self.__previous_sequence = ""
+        data = self.decoder.decode(data)
         idx = 0
+        if self.__string is not None:
+            if self.__string_escaped:
+                self.__string_escaped = False
+                data = u'\x1b' + data
+            idx = self._collect_string(data, idx)
+        elif self.__incomplete:
+            data = self.__incomplete + data
+            self.__incomplete = ""
         self.log.debug("Processing input len = %s" % len(data))
         while idx < len(data):
+            if self.skip_offscreen:
+                idx = self._skip_offscreen_text(data, idx)
             try:
-                idx += self._process_text(data[idx:])
+                idx = self._process_text(data, idx)
             except EncounteredEscapeException as e:
-                idx += e.index
+                idx = e.index
                 self.log.debug("Found escape at %s" % idx)
                 try:
-                    idx += self._process_escape(data[idx:])
+                    idx = self._process_escape(data, idx)
                 except UnsupportedEscapeException as ee:
                     self.log.error(str(ee))
-                    idx += ee.index
+                    idx = ee.index
 
     def process_until_escape(self, data):
         #data = unicode(data, encoding=self.encoding)
-        prev_len = len(self.__previous_sequence)
-        if self.__previous_sequence:
-            data = self.__previous_sequence + data
+        if self.__string is not None:
+            prev_len = 0
+            if self.__string_escaped:
+                self.__string_escaped = False
+                data = u'\x1b' + data
+                prev_len = 1
+            idx = self._collect_string(data, 0)
+            if self.__string is None:
+                if idx < prev_len:
+                    # the ESC from the last read starts the next sequence
+                    self.__incomplete = data[:prev_len]
+                    idx = prev_len
+                raise EncounteredEscapeException(idx - prev_len)
+            return idx - prev_len
+        prev_len = len(self.__incomplete)
+        if self.__incomplete:
+            data = self.__incomplete + data
             self.log.debug("Prepending incomplete sequence: %s" % \
                            data.replace('\x1b', '\\x1b'))
-            self.__previous_sequence = ""
+            self.__incomplete = ""
         idx = 0
         try:
             start = idx
-            idx += self._process_text(data[idx:])
+            idx = self._process_text(data, idx)
             self.trace.end("Wrote '%s'" % data[start:idx])
         except EncounteredEscapeException as e:
-            idx += e.index
+            idx = e.index
             self.trace.end("Wrote '%s'" % data[start:idx])
             try:
-                idx += self._process_escape(data[idx:])
+                idx = self._process_escape(data, idx)
             except UnsupportedEscapeException as ee:
                 self.log.error(str(ee))
-                idx += ee.index
+                idx = ee.index
             e.index = idx - prev_len
             raise e
         return idx
 
-    def _process_escape(self, data):
-        self.log.debug("ESC ", data.replace('\x1b', '\\x1b'))
+    def _process_escape(self, data, idx):
+        '''Processes the escape sequence starting at idx, and returns where
+           it ends.  The escape sequences match data from idx on, it is
+           never copied.'''
+        start = idx
+        self.log.debug("ESC ", data[start:start + self.MAX_SEQUENCE].replace(
+                                                        '\x1b', '\\x1b'))
         processed = False
-        for escape in self.__sequences:
-            m = re.match(escape.MATCH, data)
+        for (pattern, escape) in self.__sequences:
+            m = pattern.match(data, start)
             if not m:
                 self.log.debug("no match %s" % escape.MATCH)
                 continue
@@ -180,59 +283,181 @@ class TerminalEscapeSequencer:
             processed = True
             self.log.debug("Processing escape with: %s" % \
                            escape.__class__.__name__)
+            if escape.STRING:
+                self.__string = escape
+                escape.start_string(m)
+                idx = self._collect_string(data, idx)
+                break
             try:
-                idx += escape.process(data[idx:], match=m)
+                idx += escape.process(data, match=m)
             except UnsupportedEscapeException as e:
                 self.log.exception()
                 idx += e.index       # end of unsupported sequence
             except IncompleteEscapeException:
+                if len(data) - start > self.MAX_SEQUENCE:
+                    self.log.warning("Dropping unterminated sequence: %s" % \
+                                     data[start:idx].replace('\x1b', '\\x1b'))
+                    break
+                self.__incomplete = data[start:]
                 self.log.debug("incomplete sequence: %s" % \
-                               data.replace('\x1b', '\\x1b'))
-                self.__previous_sequence = data
-                idx += len(data)     # end of input
+                               self.__incomplete.replace('\x1b', '\\x1b'))
+                idx = len(data)      # end of input
             break
-        if data == "\x1b":
-            self.log.debug("Escape at end of data buffer: %s" % \
-                           data.replace('\x1b', '\\x1b'))
-            self.__previous_sequence = data
+        if start == len(data) - 1:
+            self.log.debug("Escape at end of data buffer")
+            self.__incomplete = data[start:]
             idx = len(data)
         elif not processed:
-            next_escape = data[1:].find('\x1b')
+            next_escape = data.find('\x1b', start + 1)
             if next_escape < 0:
                 next_escape = len(data)
-            else:
-                next_escape += 1
-            raise UnsupportedEscapeException(next_escape, data[:next_escape])
+            raise UnsupportedEscapeException(next_escape,
+                                             data[start:next_escape])
         return idx
 
-    def _process_text(self, data):
+    def _collect_string(self, data, idx):
+        '''Passes data from idx on to the OSC or DCS string being received,
+           and returns where the string ends, or the end of data if it has
+           not ended yet.  As in xterm, BEL and ST end the string, CAN and
+           SUB cancel it, and an ESC that does not start ST ends it and is
+           left to be processed as the start of the next sequence.'''
+        m = self.STRING_END.search(data, idx)
+        if m is None:
+            self._feed_string(data[idx:])
+            return len(data)
+        end = m.start()
+        self._feed_string(data[idx:end])
+        ch = data[end]
+        if ch == '\x07':
+            self._end_string(ch)
+        elif ch != '\x1b':
+            self._cancel_string()
+        elif end + 1 == len(data):
+            # the rest of ST may be in the next read
+            self.__string_escaped = True
+        elif data[end + 1] == '\\':
+            self._end_string(u'\x1b\\')
+            return end + 2
+        else:
+            self._end_string(u'')
+            return end
+        return end + 1
+
+    def _feed_string(self, text):
+        if not text:
+            return
+        try:
+            self.__string.feed_string(text)
+        except Exception:
+            # keep receiving the string, so its payload is not written
+            self.log.exception()
+
+    def _end_string(self, terminator):
+        escape = self.__string
+        self.__string = None
+        try:
+            escape.end_string(terminator)
+        except Exception:
+            self.log.exception()
+
+    def _cancel_string(self):
+        escape = self.__string
+        self.__string = None
+        self.log.debug("Cancelled string of %s" % escape.__class__.__name__)
+        try:
+            escape.cancel_string()
+        except Exception:
+            self.log.exception()
+
+    def _skip_offscreen_text(self, data, idx):
+        '''Returns where to continue processing the plain text starting at
+           idx.  Every line feed starts a new row, and once the cursor
+           reaches the end of the buffer every line feed rolls over one
+           row.  So if there are more than twice as many line feeds before
+           the next escape as there are rows in the buffer, whatever was
+           written before the last of those has scrolled out of the
+           scrollback anyway, and is skipped instead of being written.
+
+           Of the state text can change only the character set invoked by
+           SO and SI outlasts the skipped rows, so the last of those in the
+           skipped text is applied.  The cursor keeps the column it had
+           before the skipped text, which only differs from writing it when
+           its rows do not end in a carriage return.'''
+        if self.screen.is_alternate_buffer():
+            return idx
+        end = data.find('\x1b', idx)
+        if end < 0:
+            end = len(data)
+        rows = max(self.screen.get_buffer_size(), 
+                   len(self.screen.get_buffer()))
+        if data.count('\n', idx, end) <= 2 * rows:
+            return idx
+        line_feed = end
+        for x in xrange(0, 2 * rows + 1):
+            line_feed = data.rfind('\n', idx, line_feed)
+        # the line feed itself is processed, so the cursor still leaves the
+        # row it was on before the skipped text
+        self.log.debug("Skipping %s offscreen characters" % (line_feed - idx))
+        shift = max(data.rfind('\x0e', idx, line_feed),
+                    data.rfind('\x0f', idx, line_feed))
+        if shift >= 0:
+            self.__controls[ord(data[shift])](self.screen.get_cursor())
+        self.screen.clear_selection()
+        return line_feed
+
+    def _process_text(self, data, idx):
+        '''Writes the runs of printable characters in data from idx on a run
+           at a time, translated to the invoked character set, and looks up
+           the control characters between them in a table.  Returns where
+           the text ends, or raises EncounteredEscapeException with where
+           the escape that ends it is.'''
         self.log.debug("TXT")
         cursor = self.screen.get_cursor()
-        idx = 0
-        for ch in data:
-            idx += 1
-            if ch == '\x1b':
-                raise EncounteredEscapeException(idx - 1)
-            if ch == '\n':
-                self.log.debug("LF")
-                try:
-                    cursor.advance_row()
-                except ScrollScreenException as e:
-                    self.screen.scroll(e.direction)
+        charsets = self.screen.get_charsets()
+        end = len(data)
+        while idx < end:
+            m = self.CONTROL.search(data, idx)
+            stop = m.start() if m else end
+            if stop > idx:
+                cursor.write_text(charsets.translate(data[idx:stop]))
+                idx = stop
                 continue
-            elif ch == '\r':
-                self.log.debug("CR")
-                cursor.reset_col()
-                continue
-            elif ch == '\x07':
-                self.log.debug("BEL")
+            ch = data[idx]
+            if ch == '\x1b':
+                raise EncounteredEscapeException(idx)
+            idx += 1
+            if ch == '\x7f':
                 continue
-            elif ch == '\x08':
-                cursor.left()
+            control = self.__controls[ord(ch)]
+            if control is None:
                 continue
             try:
-                cursor.write(ch)
+                control(cursor)
             except ScrollScreenException as e:
                 self.screen.scroll(e.direction)
         return idx
 
+    def bell(self, cursor):
+        self.log.debug("BEL")
+
+    def backspace(self, cursor):
+        cursor.left()
+
+    def horizontal_tab(self, cursor):
+        self.log.debug("HT")
+        cursor.tab()
+
+    def line_feed(self, cursor):
+        self.log.debug("LF")
+        cursor.advance_row()
+
+    def carriage_return(self, cursor):
+        self.log.debug("CR")
+        cursor.reset_col()
+
+    def shift_out(self, cursor):
+        self.screen.get_charsets().invoke(1)
+
+    def shift_in(self, cursor):
+        self.screen.get_charsets().invoke(0)
+
@@ -0,0 +1,444 @@
+#!/usr/bin/env python
+'''
+    Copyright 2010, Andrew Thigpen
+
+    This file is part of PyTTY.
+
+    PyTTY is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    PyTTY is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with PyTTY.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import os
+import sys
+import log
+import select
+import subprocess
+import terminal
+from multiprocessing.connection import Listener, Client
+from PyQt4 import QtGui, QtCore
+from config import TerminalConfig
+from reactor import ChannelReactor
+from snapshot import ScreenSnapshot, SnapshotError
+from sequencer import TerminalEscapeSequencer
+
+# Messages between the gui and a session host are tuples whose first item
+# is the command:
+#
+#   gui -> host:  ('connect', addr, port, name, passwd, width, height)
+#                 ('key', data)
+#                 ('resize', width, height)
+#                 ('close',)
+#
+#   host -> gui:  ('connected', connected, authentication_error)
+#                 ('snapshot', path)
+#                 ('screen', size, alternate, base, scroll_values, cursor,
+#                  modes, top_line, rows, others)
+#                 ('title', title)
+#                 ('clipboard', text, selection)
+#                 ('eof',)
+#
+# The cells themselves are written to a ScreenSnapshot, whose file is
+# announced by the snapshot message.  rows is the list of indexes into the
+# active buffer that changed, and top_line the line number of the first row
+# of the main buffer, which goes up as rows roll over into the scrollback.
+# others maps the index of a row to the (col, ch) of its cells whose
+# characters do not fit in the snapshot, see ScreenSnapshot.write_row().
+
+class SessionHostView:
+    '''Stands in for the TerminalWidget of the screen buffer in a session
+       host.  Nothing is drawn in the host, so repaints are dropped and the
+       window title and clipboard are forwarded to the gui.'''
+    def __init__(self, host):
+        self.host = host
+        self.scroll_values = (0, 0)
+
+    def get_widget(self):
+        return self
+
+    def request_update(self, rect=None):
+        pass
+
+    def request_window_title(self, title):
+        self.host.send(('title', unicode(title)))
+
+    def request_clipboard_text(self, text, selection=False):
+        self.host.send(('clipboard', text, selection))
+
+    def set_scroll_value(self, maximum, value=None):
+        if value is None:
+            value = maximum
+        self.scroll_values = (maximum, value)
+
+    def get_scroll_value(self):
+        return self.scroll_values
+
+
+class SessionHost:
+    '''Runs an SSH connection, its sequencer and screen buffer in a child
+       process, so parsing the output of one tab does not hold the GIL of
+       the gui or of the other tabs.  After each chunk the rows that changed
+       are sent to the gui process, the screen buffer keeps track of them
+       as they are written.'''
+    def __init__(self, conn):
+        self.log = log.get_log(self)
+        self.conn = conn
+        self.config = TerminalConfig()
+        self.focus_on_output = self.config.getboolean("Cursor",
+                                                      "focusonoutput", True)
+        self.view = SessionHostView(self)
+        self.screen = terminal.ScreenBuffer(parent=self.view)
+        self.screen.track_damage()
+        self.sent_alternate = False
+        self.snapshot = None
+        self.top_line = 0
+        self.rolled_over = 0
+        self.running = False
+
+    def send(self, message):
+        self.conn.send(message)
+
+    def run(self):
+        (command, addr, port, name, passwd, width, height) = self.conn.recv()
+        self.ssh = terminal.SSHConnection(addr, port, name, passwd)
+        self.ssh.resize(width, height)
+        with self.screen.lock:
+            self.screen.resize(width, height)
+        self.ssh.connect()
+        self.send(('connected', self.ssh.is_connected(),
+                   self.ssh.authentication_error))
+        if not self.ssh.is_connected():
+            return
+        channel = self.ssh.open_shell()
+        self.sequencer = TerminalEscapeSequencer(self.screen, self.ssh)
+        self.running = True
+        while self.running:
+            (readable, writable, errors) = select.select([channel, self.conn],
+                                                         [], [])
+            if self.conn in readable:
+                try:
+                    self.process_command(self.conn.recv())
+                except EOFError:
+                    self.log.info("Gui went away, closing session.")
+                    break
+            if channel in readable:
+                data = channel.recv(4096)
+                if not data:
+                    self.log.info("*** EOF ***")
+                    self.send(('eof',))
+                    break
+                with self.screen.lock:
+                    self.sequencer.process(data)
+                    if self.focus_on_output:
+                        self.screen.follow_cursor()
+                    self.send_damage()
+        channel.close()
+        if self.snapshot is not None:
+            self.snapshot.unlink()
+            self.snapshot.close()
+
+    def process_command(self, message):
+        command = message[0]
+        if command == 'key':
+            self.ssh.send_keypress(message[1])
+        elif command == 'resize':
+            (width, height) = message[1:]
+            with self.screen.lock:
+                self.screen.resize(width, height)
+                self.send_damage()
+            self.ssh.resize(width, height)
+        elif command == 'close':
+            self.running = False
+        else:
+            self.log.error("Unknown session command: %s" % command)
+
+    def create_snapshot(self):
+        '''A new snapshot is made whenever the layout of the buffers
+           changes; the gui unlinks the file once it has mapped it.'''
+        screen = self.screen
+        if self.snapshot is not None:
+            self.snapshot.unlink()
+            self.snapshot.close()
+        self.snapshot = ScreenSnapshot(width=screen.width,
+                                       main_rows=len(screen.buffer),
+                                       alternate_rows=max(len(screen.alternate),
+                                                          screen.height))
+        self.top_line = 0
+        self.send(('snapshot', self.snapshot.get_path()))
+
+    def send_damage(self):
+        '''Writes the rows that changed since the last call to the snapshot
+           and tells the gui which ones they were.  Rows that only moved as
+           the main buffer rolled over keep their slots, see get_slot().'''
+        screen = self.screen
+        self.top_line += screen.rolled_over - self.rolled_over
+        self.rolled_over = screen.rolled_over
+        damaged = screen.take_damage()
+        buf = screen.get_buffer()
+        alternate = screen.is_alternate_buffer()
+        snapshot = self.snapshot
+        if snapshot is None or snapshot.get_width() != screen.width or \
+           snapshot.get_main_rows() != len(screen.buffer) or \
+           snapshot.alternate_rows < len(screen.alternate):
+            self.create_snapshot()
+            snapshot = self.snapshot
+            rows = range(0, len(buf))
+        elif alternate != self.sent_alternate:
+            rows = range(0, len(buf))
+        else:
+            rows = sorted([idx for idx in damaged if idx < len(buf)])
+        self.sent_alternate = alternate
+        others = {}
+        for idx in rows:
+            row = screen.peek_row(idx)
+            slot = snapshot.get_slot(idx, alternate, self.top_line)
+            row_others = snapshot.write_row(slot, row.wrapped,
+                                            row.get_state())
+            if row_others:
+                others[idx] = row_others
+        modes = {
+            'application_cursor_keys' : getattr(screen,
+                                             'application_cursor_keys', False),
+            'blink_cursor_active' : screen.blink_cursor_active,
+            'draw_cursor' : screen.draw_cursor,
+            'bracketed_paste' : screen.bracketed_paste,
+        }
+        self.send(('screen', screen.get_size(), alternate, screen.base,
+                   self.view.get_scroll_value(),
+                   screen.get_cursor().get_row_col(), modes, self.top_line,
+                   rows, others))
+
+
+class SessionHostChannel(terminal.TerminalChannel):
+    '''A channel whose SSH connection and sequencer run in a session host
+       process.  It has the same interface as SSHConnection, but instead of
+       dataReceived it emits hostMessage with the screen updates.'''
+    hostMessage = QtCore.pyqtSignal(object)
+
+    def __init__(self, addr, port, name, passwd):
+        terminal.TerminalChannel.__init__(self)
+        self.addr = addr
+        self.port = port
+        self.name = name
+        self.passwd = passwd
+        self.connected = False
+        self.authentication_error = False
+        self.size = (80, 24)
+        self.conn = None
+
+    def connect(self):
+        authkey = os.urandom(20)
+        listener = Listener(family='AF_UNIX', authkey=authkey)
+        script = os.path.abspath(__file__)
+        if script.endswith('.pyc') or script.endswith('.pyo'):
+            script = script[:-1]
+        try:
+            # the key is passed on stdin so it does not show up in ps
+            self.process = subprocess.Popen([sys.executable, script,
+                                             listener.address],
+                                            stdin=subprocess.PIPE)
+            self.process.stdin.write(authkey)
+            self.process.stdin.close()
+            self.conn = listener.accept()
+            (width, height) = self.size
+            self.conn.send(('connect', self.addr, self.port, self.name,
+                            self.passwd, width, height))
+            (command, self.connected, self.authentication_error) = \
+                    self.conn.recv()
+        except Exception:
+            self.log.exception()
+            self.connected = False
+        listener.close()
+
+    def is_connected(self):
+        return self.connected
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        '''Tells the session host to close its channel, and stops reading
+           from it.'''
+        if self.conn is None:
+            return
+        ChannelReactor.get_reactor().remove_reader(self)
+        try:
+            self.conn.send(('close',))
+        except (EOFError, IOError):
+            pass
+        self.conn.close()
+        self.conn = None
+        self.connected = False
+
+    def resize(self, width, height):
+        self.size = (width, height)
+        if self.conn is None:
+            return
+        self.conn.send(('resize', width, height))
+
+    def send_keypress(self, key):
+        if not self.connected:
+            self.log.error("Trying to send keypress, but not yet connected.")
+            return
+        if not isinstance(key, str):
+            key = unicode(key).encode('utf-8')
+        self.conn.send(('key', key))
+
+    def fileno(self):
+        return self.conn.fileno()
+
+    def handle_read(self):
+        '''Called by the ChannelReactor when the host sent a message.'''
+        try:
+            message = self.conn.recv()
+        except (EOFError, IOError):
+            message = ('eof',)
+        if message[0] == 'eof':
+            self.log.info("*** EOF ***")
+            self.endOfFile.emit()
+            return False
+        self.hostMessage.emit(message)
+        return True
+
+    def start_shell(self, term):
+        if not self.connected:
+            self.log.error("Trying to start shell, but not yet connected.")
+            return
+        ChannelReactor.get_reactor().add_reader(self)
+
+
+class HostedSSHTerminalWidget(terminal.TerminalWidget):
+    '''An SSH terminal that only renders, see SessionHost.'''
+    def __init__(self, username, password, host, port=22, parent=None):
+        channel = SessionHostChannel(host, port, username, password)
+        terminal.TerminalWidget.__init__(self, channel, parent)
+        self.host_base = None
+        self.snapshot = None
+        self.top_line = 0
+        self.channel.hostMessage.connect(self.host_message)
+
+    def start_sequencer(self):
+        '''The sequencer runs in the session host.'''
+        pass
+
+    def connect(self):
+        self.log.debug("Connection attempt initiated.")
+        self.channel.connect()
+        if not self.channel.is_connected():
+            self.log.warning("Unable to connect.")
+            return
+        self.log.debug("Starting shell.")
+        self.channel.start_shell(self)
+
+    def host_message(self, message):
+        command = message[0]
+        if command == 'screen':
+            self.apply_screen(*message[1:])
+        elif command == 'snapshot':
+            self.open_snapshot(message[1])
+        elif command == 'title':
+            self.setWindowTitle(message[1])
+        elif command == 'clipboard':
+            self.set_clipboard_text(*message[1:])
+
+    def open_snapshot(self, path):
+        if self.snapshot is not None:
+            self.snapshot.close()
+        try:
+            self.snapshot = ScreenSnapshot(path)
+        except (OSError, SnapshotError):
+            self.log.exception()
+            self.snapshot = None
+            return
+        # mapped on both ends now, so the name is no longer needed
+        self.snapshot.unlink()
+        self.top_line = 0
+
+    def rollover(self, top_line):
+        '''Rolls the main buffer over by as many rows as the host did.'''
+        screen = self.screen
+        shift = min(top_line - self.top_line, len(screen.buffer))
+        self.top_line = top_line
+        if shift <= 0:
+            return
+        screen.drop_rows(shift)
+        screen.freeze_scrollback()
+
+    def apply_screen(self, size, alternate, base, scroll_values, cursor,
+                     modes, top_line, rows, others):
+        '''The rows are not given cells, they are drawn from what was read
+           from the snapshot until something reads them.'''
+        screen = self.screen
+        snapshot = self.snapshot
+        with screen.lock:
+            if size != screen.get_size() or snapshot is None or \
+               snapshot.get_width() != screen.width:
+                # sent before the host saw the last resize, the host sends
+                # the whole screen again once it has resized
+                return
+            if alternate != screen.is_alternate_buffer():
+                screen.clear_selection()
+                screen.alternate_active = alternate
+                self.request_update()
+            self.rollover(top_line)
+            buf_size = len(screen.get_buffer())
+            (first, last) = (None, None)
+            for idx in rows:
+                if idx >= buf_size:
+                    continue
+                state = snapshot.read_row(snapshot.get_slot(idx, alternate,
+                                                            top_line))
+                if state is None:
+                    # torn, the row is listed again once the host is done
+                    continue
+                (wrapped, states) = state
+                for (col, ch) in others.get(idx, ()):
+                    states[col] = (ch,) + states[col][1:]
+                screen.set_row_states(idx, wrapped, states)
+                if first is None:
+                    first = idx
+                last = idx
+            screen.freeze_scrollback()
+            if base != self.host_base:
+                # otherwise the user may have scrolled the view
+                self.host_base = base
+                screen.base = base
+                self.set_scroll_value(*scroll_values)
+            screen.get_cursor().set_row_col(*cursor)
+            screen.application_cursor_keys = modes['application_cursor_keys']
+            screen.blink_cursor_active = modes['blink_cursor_active']
+            screen.bracketed_paste = modes['bracketed_paste']
+            if not screen.blink_cursor_active:
+                screen.draw_cursor = modes['draw_cursor']
+            self.predictor.output_received()
+            if first is not None:
+                top = max(first, screen.base)
+                bottom = min(last, screen.base + screen.height - 1)
+                if top <= bottom:
+                    screen.update_rows(top, bottom)
+            screen.repaint_dirty_cells()
+
+
+if __name__ == "__main__":
+    # fonts and colors are used by the screen buffer, but there is no window
+    app = QtGui.QApplication(sys.argv, False)
+    config = TerminalConfig()
+    log_level = config.get("Log", "level", "none")
+    log.Log.DEFAULT_LOG_LEVEL = log.Log.LEVELS[log_level]
+
+    authkey = sys.stdin.read()
+    conn = Client(sys.argv[1], authkey=authkey)
+    host = SessionHost(conn)
+    try:
+        host.run()
+    finally:
+        conn.close()
@@ -0,0 +1,189 @@
+'''
+    Copyright 2010, Andrew Thigpen
+
+    This file is part of PyTTY.
+
+    PyTTY is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    PyTTY is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with PyTTY.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import os
+import mmap
+import struct
+import tempfile
+
+class SnapshotError(Exception):
+    pass
+
+
+class ScreenSnapshot:
+    '''The rows of a screen buffer in a memory mapped file, shared between
+       the session host that writes them and the gui that reads them.
+
+       The file starts with a header giving the width and the number of
+       row slots for the main and the alternate buffer.  Each slot is a
+       generation counter, the wrapped flag and width fixed size cells.
+       The writer makes the generation odd while a row is written (a
+       seqlock), so a reader that sees an odd or changed generation knows
+       the copy it took is torn and drops it; the row will be listed as
+       changed again once the writer is done with it.
+
+       A cell holds a single code point, the characters of cells with more
+       (combining marks, or a surrogate pair) are returned by write_row()
+       for the writer to pass on some other way.'''
+    MAGIC = 'PTSS'
+    HEADER = struct.Struct('<4sIII')        # magic, width, main, alternate
+    ROW_HEADER = struct.Struct('<II')       # generation, wrapped
+    CELL = struct.Struct('<IIIB3x')         # ch, fgcolor, bgcolor, flags
+
+    BOLD = 0x01
+    UNDERLINE = 0x02
+    HAS_DATA = 0x04
+    WIDE = 0x08
+    WIDE_RIGHT = 0x10
+
+    def __init__(self, path=None, width=80, main_rows=0, alternate_rows=0):
+        '''Without a path a new snapshot file is created, otherwise the
+           existing one is opened and its layout read from the header.'''
+        if path is None:
+            directory = '/dev/shm'
+            if not os.path.isdir(directory):
+                directory = tempfile.gettempdir()
+            (fd, path) = tempfile.mkstemp(prefix='pytty-', dir=directory)
+            self.set_layout(width, main_rows, alternate_rows)
+            os.ftruncate(fd, self.size)
+            self.mm = mmap.mmap(fd, self.size)
+            os.close(fd)
+            self.mm[0:self.HEADER.size] = self.HEADER.pack(self.MAGIC, width,
+                                                           main_rows,
+                                                           alternate_rows)
+        else:
+            fd = os.open(path, os.O_RDWR)
+            try:
+                size = os.fstat(fd).st_size
+                if size < self.HEADER.size:
+                    raise SnapshotError("Snapshot %s is truncated." % path)
+                self.mm = mmap.mmap(fd, size)
+            finally:
+                os.close(fd)
+            (magic, width, main_rows, alternate_rows) = \
+                    self.HEADER.unpack_from(self.mm, 0)
+            if magic != self.MAGIC:
+                raise SnapshotError("%s is not a screen snapshot." % path)
+            self.set_layout(width, main_rows, alternate_rows)
+        self.path = path
+
+    def set_layout(self, width, main_rows, alternate_rows):
+        self.width = width
+        self.main_rows = main_rows
+        self.alternate_rows = alternate_rows
+        self.row_size = self.ROW_HEADER.size + width * self.CELL.size
+        self.size = self.HEADER.size + \
+                    (main_rows + alternate_rows) * self.row_size
+
+    def get_path(self):
+        return self.path
+
+    def get_width(self):
+        return self.width
+
+    def get_main_rows(self):
+        return self.main_rows
+
+    def get_slot(self, idx, alternate=False, top_line=0):
+        '''The main buffer is a ring indexed by line number, so rows that
+           roll over into the scrollback do not have to be written again.
+           top_line is the line number of the first row of the buffer.'''
+        if alternate:
+            return self.main_rows + idx
+        return (top_line + idx) % self.main_rows
+
+    def __get_offset(self, slot):
+        return self.HEADER.size + slot * self.row_size
+
+    def write_row(self, slot, wrapped, states):
+        '''states is a list of TerminalCell.get_state() tuples.  Returns the
+           (col, ch) of the cells whose character did not fit.'''
+        offset = self.__get_offset(slot)
+        (generation, old_wrapped) = self.ROW_HEADER.unpack_from(self.mm,
+                                                                offset)
+        generation = (generation + 1) & 0xffffffff
+        if generation & 1 == 0:
+            generation = (generation + 1) & 0xffffffff
+        self.ROW_HEADER.pack_into(self.mm, offset, generation, old_wrapped)
+        cells = []
+        others = []
+        pack = self.CELL.pack
+        for (ch, fgcolor, bgcolor, bold, underline, has_data, width) in \
+                states[:self.width]:
+            flags = 0
+            if width == 2:
+                flags |= self.WIDE
+            elif width == 0:
+                flags |= self.WIDE_RIGHT
+            if bold:
+                flags |= self.BOLD
+            if underline:
+                flags |= self.UNDERLINE
+            if has_data:
+                flags |= self.HAS_DATA
+            code = 0
+            if len(ch) == 1:
+                code = ord(ch)
+            elif ch:
+                others.append((len(cells), ch))
+            cells.append(pack(code, fgcolor & 0xffffffff,
+                              bgcolor & 0xffffffff, flags))
+        data = ''.join(cells)
+        start = offset + self.ROW_HEADER.size
+        self.mm[start:start + len(data)] = data
+        self.ROW_HEADER.pack_into(self.mm, offset,
+                                  (generation + 1) & 0xffffffff,
+                                  int(bool(wrapped)))
+        return others
+
+    def read_row(self, slot):
+        '''Returns (wrapped, states), or None if the row was being written.'''
+        offset = self.__get_offset(slot)
+        (generation, wrapped) = self.ROW_HEADER.unpack_from(self.mm, offset)
+        if generation & 1:
+            return None
+        data = self.mm[offset:offset + self.row_size]
+        if self.ROW_HEADER.unpack_from(self.mm, offset)[0] != generation:
+            return None
+        states = []
+        unpack = self.CELL.unpack_from
+        for col in xrange(0, self.width):
+            (code, fgcolor, bgcolor, flags) = \
+                    unpack(data, self.ROW_HEADER.size + col * self.CELL.size)
+            ch = ''
+            if code:
+                ch = unichr(code)
+            width = 1
+            if flags & self.WIDE:
+                width = 2
+            elif flags & self.WIDE_RIGHT:
+                width = 0
+            states.append((ch, fgcolor, bgcolor, bool(flags & self.BOLD),
+                           bool(flags & self.UNDERLINE),
+                           bool(flags & self.HAS_DATA), width))
+        return (bool(wrapped), states)
+
+    def unlink(self):
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def close(self):
+        self.mm.close()
@@ -0,0 +1,73 @@
+'''
+    Copyright 2010, Andrew Thigpen
+
+    This file is part of PyTTY.
+
+    PyTTY is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    PyTTY is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with PyTTY.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+class TabStops:
+    '''The tab stops of a screen as the bits of a long, bit n set meaning
+       there is a stop at column n, so finding the next or previous stop
+       is a couple of operations on it instead of a walk over columns.'''
+    INTERVAL = 8
+
+    def __init__(self, width):
+        self.width = width
+        self.stops = self.get_default_stops(0, width)
+
+    def get_default_stops(self, first, last):
+        stops = 0
+        start = first + (-first % self.INTERVAL)
+        for col in xrange(start, last, self.INTERVAL):
+            stops |= 1 << col
+        return stops
+
+    def resize(self, width):
+        '''Keeps the stops of the existing columns, new columns get the
+           default ones.'''
+        if width > self.width:
+            self.stops |= self.get_default_stops(self.width, width)
+        else:
+            self.stops &= (1 << width) - 1
+        self.width = width
+
+    def reset(self):
+        self.stops = self.get_default_stops(0, self.width)
+
+    def set(self, col):
+        self.stops |= 1 << col
+
+    def clear(self, col):
+        self.stops &= ~(1 << col)
+
+    def clear_all(self):
+        self.stops = 0
+
+    def is_set(self, col):
+        return bool(self.stops & (1 << col))
+
+    def get_next(self, col):
+        '''Returns the first stop after col, or the last column.'''
+        stops = self.stops >> (col + 1)
+        if not stops:
+            return self.width - 1
+        return min(col + (stops & -stops).bit_length(), self.width - 1)
+
+    def get_previous(self, col):
+        '''Returns the last stop before col, or the first column.'''
+        stops = self.stops & ((1 << max(col, 0)) - 1)
+        if not stops:
+            return 0
+        return stops.bit_length() - 1
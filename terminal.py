@@ -22,14 +22,26 @@ import os
 import sys
 import log
 import select
+import time
+import threading
 import paramiko
 from Queue import Queue, Empty
 from PyQt4 import QtGui, QtCore
 from config import TerminalConfig
 from cursor import TerminalCursor
+from selection import SelectionHelper
+from tabstops import TabStops
+from charsets import CharsetState
+from scrollback import ScrollbackBlock, ScrollbackCache, decode_row
+from prediction import EchoPredictor
+from reactor import ChannelReactor, ChannelWriter
 from sequencer import TerminalEscapeSequencer, ScrollDirection
 
 class TerminalCell:
+    # shared by all blank cells, colors are replaced but never modified
+    DEFAULT_FGCOLOR = QtGui.QColor(255, 255, 255)
+    DEFAULT_BGCOLOR = QtGui.QColor(0, 0, 0)
+
     def __init__(self):
         #self.log = log.get_log(self)
         self.config = TerminalConfig()
@@ -53,12 +65,14 @@ class TerminalCell:
             painter.setPen(fgcolor)
             painter.drawText(position, QtCore.Qt.AlignLeft, self.ch)
 
-    def draw_background(self, painter, position):
-        painter.fillRect(position, self.bgcolor)
+    def draw_background(self, painter, position, inverse=False):
+        bgcolor = self.bgcolor if not inverse else self.fgcolor
+        painter.fillRect(position, bgcolor)
 
-    def draw_text(self, painter, position, text):
+    def draw_text(self, painter, position, text, inverse=False):
+        fgcolor = self.fgcolor if not inverse else self.bgcolor
         painter.setFont(self.font)
-        painter.setPen(self.fgcolor)
+        painter.setPen(fgcolor)
         painter.drawText(position, QtCore.Qt.AlignLeft, text)
 
     def background_matches(self, cell):
@@ -72,13 +86,13 @@ class TerminalCell:
 
     def reset(self):
         #self.font = QtGui.QFont('Consolas', 11)
-        self.fgcolor = QtGui.QColor(255, 255, 255)
-        self.bgcolor = QtGui.QColor(0, 0, 0)
+        self.fgcolor = self.DEFAULT_FGCOLOR
+        self.bgcolor = self.DEFAULT_BGCOLOR
         self.ch = ''
+        self.width = 1          # 2 for a wide character, 0 for its right half
         self.font.setBold(False)
         self.underline = False
         self.dirty = False
-        self.selected = False
         self.has_data = False
 
     def set_font(self, font):
@@ -118,67 +132,181 @@ class TerminalCell:
     def is_dirty(self):
         return self.dirty
 
-    def toggle_selection(self):
-        self.selected = not self.selected
-        self.set_inverse()
+    def get_state(self):
+        '''Returns the contents of the cell as plain values that can be
+           pickled, see set_state().'''
+        return (self.ch, self.fgcolor.rgb(), self.bgcolor.rgb(),
+                self.font.bold(), self.underline, self.has_data, self.width)
+
+    def set_state(self, state):
+        (self.ch, fgcolor, bgcolor, bold, self.underline, 
+         self.has_data, self.width) = state
+        self.fgcolor = QtGui.QColor.fromRgb(fgcolor)
+        self.bgcolor = QtGui.QColor.fromRgb(bgcolor)
+        self.font.setBold(bold)
+        self.dirty = True
 
 
 class TerminalRow(list):
-    def __init__(self, width, screen):
+    blank = False
+    frozen = None           # (block, index) in a ScrollbackBlock
+    states = None           # see __init__()
+
+    def __init__(self, width, screen, cells=None, states=None):
+        '''If cells is given the row takes ownership of them, even if there
+           are fewer than width; the rest are created by expand() when the
+           row is first accessed through ScreenBuffer.get_row().  If states
+           is given instead the row has no cells, it is drawn from the
+           states and gets cells when it is first read through
+           ScreenBuffer.peek_row().'''
         list.__init__(self)
         #self.log = log.get_log(self)
         self.width = width
         self.screen = screen
-        cells = [TerminalCell() for x in xrange(0, self.width)]
+        self.wrapped = False    # continues on the next row (soft wrap)
+        self.spans = None       # see get_spans()
+        if states is not None:
+            self.states = states
+            cells = []
+        if cells is None:
+            cells = [TerminalCell() for x in xrange(0, self.width)]
         self.extend(cells)
 
-    #FIXME optimize this function
     def expand(self, width):
-        if width < len(self):
-            # don't resize the row
-            self.width = width
-            return
-        diff = width - len(self)
-        #self.log.debug("Adding %s cells to row." % diff)
-        for cnt in xrange(0, diff):
-            self.append(TerminalCell())
+        if width > len(self):
+            diff = width - len(self)
+            #self.log.debug("Adding %s cells to row." % diff)
+            self.extend([TerminalCell() for x in xrange(0, diff)])
+        # cells past the width are kept, they are not drawn
         self.width = width
-
-    def draw(self, painter, row):
-        prev = self[0]
-        rect = self.screen.create_rect_from_cell(row, 0)
-        for col in xrange(1, self.width):
-            cell = self[col]
-            if cell.background_matches(prev):
-                # merge the drawing of two cells
-                new_rect = self.screen.create_rect_from_cell(row, col)
-                rect = rect.unite(new_rect)
+        self.spans = None
+
+    def get_spans(self):
+        '''Returns the runs of cells that are drawn alike, as (first, last,
+           cell, text, chars): the cells from first up to last look like
+           cell, text is drawn over them and chars are their characters.
+           They are kept until the row is written to.'''
+        if self.spans is None:
+            self.spans = self.create_spans()
+        return self.spans
+
+    def create_spans(self):
+        # a wide character is a span of its own over both of its cells, the
+        # width its glyph has in the fallback font would shift the others
+        if self.states is not None:
+            return self.create_state_spans()
+        spans = []
+        width = min(self.width, len(self))
+        first = 0
+        for col in xrange(1, width + 1):
+            if col < width:
+                (cell, head) = (self[col], self[first])
+                if head.width == 2:
+                    if col == first + 1 and not cell.width:
+                        continue
+                elif cell.width < 2 and cell.background_matches(head) and \
+                     cell.foreground_matches(head):
+                    continue
+            head = self[first]
+            if head.width == 2:
+                text = unicode(head)
             else:
-                # we encountered a new background color
-                prev.draw_background(painter, rect)
-                rect = self.screen.create_rect_from_cell(row, col)
-            prev = cell
-        prev.draw_background(painter, rect)
-
-        prev = self[0]
-        rect = self.screen.create_rect_from_cell(row, 0)
-        text = unicode(self[0]) or u' '
-        for col in xrange(1, self.width):
-            cell = self[col]
-            if cell.foreground_matches(prev):
-                # merge the drawing of two cells
-                new_rect = self.screen.create_rect_from_cell(row, col)
-                rect = rect.unite(new_rect)
-                text += unicode(self[col]) or u' '
+                text = self.get_text(first, col)
+            chars = u"".join([cell.ch for cell in self[first:col]])
+            spans.append((first, col, head, text, chars))
+            first = col
+        return spans
+
+    def create_state_spans(self):
+        # as create_spans(), but a cell is only made for each span
+        states = self.states[:self.width]
+        blank = TerminalCell().get_state()
+        states = states + [blank] * (self.width - len(states))
+        spans = []
+        first = 0
+        for col in xrange(1, len(states) + 1):
+            if col < len(states):
+                (state, head) = (states[col], states[first])
+                if head[6] == 2:
+                    if col == first + 1 and not state[6]:
+                        continue
+                elif state[6] < 2 and state[1:4] == head[1:4]:
+                    continue
+            cell = TerminalCell()
+            cell.set_state(states[first])
+            if cell.width == 2:
+                text = unicode(cell)
+            else:
+                text = u"".join([state[0] or u' '
+                                 for state in states[first:col]])
+            chars = u"".join([state[0] for state in states[first:col]])
+            spans.append((first, col, cell, text, chars))
+            first = col
+        return spans
+
+    def get_text(self, first, last):
+        if self.states is not None:
+            # the states of a row may stop short of its width
+            states = self.states[first:last]
+            padding = u' ' * (min(last, self.width) - first - len(states))
+            return u"".join([state[0] or u' ' for state in states]) + padding
+        return u"".join([unicode(cell) or u' ' for cell in self[first:last]])
+
+    def get_chars(self, first, last):
+        '''Returns the characters of the cells from first up to last, blank
+           cells have none.'''
+        chars = []
+        for (start, end, cell, text, span_chars) in self.get_spans():
+            if end <= first or start >= last:
+                continue
+            if first <= start and end <= last:
+                chars.append(span_chars)
             else:
-                # we encountered a new foreground color
-                prev.draw_text(painter, rect, text)
-                rect = self.screen.create_rect_from_cell(row, col)
-                text = unicode(self[col]) or u' '
-            prev = cell
-        prev.draw_text(painter, rect, text)
+                cells = self[max(start, first):min(end, last)]
+                chars.append(u"".join([cell.ch for cell in cells]))
+        return u"".join(chars)
+
+    def draw(self, painter, row):
+        # selected cells are drawn inverted, so a selection boundary always
+        # splits a span even if the colors of the cells match
+        span = self.screen.get_selection_span(row)
+        if span is None:
+            span = (self.width, self.width)
+        (first, last) = span
+
+        pieces = []
+        for (start, end, cell, text, chars) in self.get_spans():
+            cuts = [start, end]
+            if cell.width < 2:
+                cuts[1:1] = [col for col in (first, last + 1)
+                             if start < col < end]
+            for (piece_start, piece_end) in zip(cuts, cuts[1:]):
+                if (piece_start, piece_end) != (start, end):
+                    text = self.get_text(piece_start, piece_end)
+                rect = self.screen.create_rect_from_cell(row, piece_start)
+                rect = rect.unite(self.screen.create_rect_from_cell(row,
+                                                              piece_end - 1))
+                pieces.append((rect, cell, text,
+                               first <= piece_start <= last))
+
+        # backgrounds that match are filled at once
+        (rect, prev, prev_selected) = (None, None, False)
+        for (piece_rect, cell, text, selected) in pieces:
+            if rect is not None and not selected and not prev_selected and \
+               cell.background_matches(prev):
+                rect = rect.unite(piece_rect)
+                continue
+            if rect is not None:
+                prev.draw_background(painter, rect, prev_selected)
+            (rect, prev, prev_selected) = (piece_rect, cell, selected)
+        if rect is not None:
+            prev.draw_background(painter, rect, prev_selected)
+
+        for (rect, cell, text, selected) in pieces:
+            cell.draw_text(painter, rect, text, selected)
 
     def reset(self):
+        self.wrapped = False
         for cell in self:
             cell.reset()
             cell.dirty = True
@@ -187,6 +315,93 @@ class TerminalRow(list):
         def inner(x):
             x.dirty = dirty
         map(inner, self)
+
+    def erase(self, first, last, bgcolor=None):
+        '''Blanks the cells from first up to last, filled with bgcolor if
+           given (the current background, like xterm).'''
+        self.split_wide(first, last)
+        for cell in self[first:last]:
+            cell.reset()
+            if bgcolor is not None:
+                cell.bgcolor = bgcolor
+            cell.dirty = True
+
+    def delete_cells(self, col, count, bgcolor=None):
+        '''Deletes count cells at col, the rest of the row shifts left and
+           blank cells come in at the right edge.'''
+        count = min(count, self.width - col)
+        if count <= 0:
+            return
+        deleted = self[col:col + count]
+        del self[col:col + count]
+        self[self.width - count:self.width - count] = deleted
+        self.erase(self.width - count, self.width, bgcolor)
+        self.set_span_dirty(col, self.width - count)
+
+    def insert_cells(self, col, count, bgcolor=None):
+        '''Inserts count blank cells at col, the cells shifted past the
+           right edge are reused for them.'''
+        count = min(count, self.width - col)
+        if count <= 0:
+            return
+        dropped = self[self.width - count:self.width]
+        del self[self.width - count:self.width]
+        self[col:col] = dropped
+        self.erase(col, col + count, bgcolor)
+        self.set_span_dirty(col + count, self.width)
+
+    def split_wide(self, first, last):
+        '''Blanks the halves outside of the span from first up to last of
+           the wide characters it cuts, before the span is overwritten.'''
+        if 0 < first < len(self) and not self[first].width:
+            cell = self[first - 1]
+            (cell.ch, cell.width, cell.dirty) = (u'', 1, True)
+        if 0 < last < len(self) and self[last - 1].width == 2:
+            cell = self[last]
+            (cell.ch, cell.width, cell.dirty) = (u'', 1, True)
+
+    def set_span_dirty(self, first, last):
+        for cell in self[first:last]:
+            cell.dirty = True
+
+    def is_dirty(self):
+        for cell in self:
+            if cell.dirty:
+                return True
+        return False
+
+    def get_state(self):
+        if self.states is not None:
+            return self.states[:self.width]
+        return [cell.get_state() for cell in self[:self.width]]
+
+    def set_state(self, states):
+        '''Replaces the cells of the row with ones made from states, see
+           get_state().'''
+        self[:] = TerminalRow.create_cells(states)
+        self.states = None
+        self.spans = None
+
+    @staticmethod
+    def create_cells(states):
+        cells = []
+        for state in states:
+            cell = TerminalCell()
+            cell.set_state(state)
+            cell.dirty = False
+            cells.append(cell)
+        return cells
+
+
+class BlankRow(TerminalRow):
+    '''Stands in for every blank row of a screen, all of its columns are
+       the same blank cell.  It is never modified: ScreenBuffer.get_row()
+       gives a row its own TerminalRow before it is written to, and rows
+       are blanked by putting this one back in their place.'''
+    blank = True
+
+    def __init__(self, width, screen):
+        TerminalRow.__init__(self, width, screen, [TerminalCell()] * width)
                 
 
 class ScreenBuffer:
@@ -200,8 +415,23 @@ class ScreenBuffer:
         self.font_size = self.config.getint("Display", "fontsize", 11)
         self.cursor = TerminalCursor(self, self.font_name, self.font_size)
         self.scrollback = self.config.getint("Display", "scrollback", 100)
+        self.block_rows = self.config.getint("Display", "scrollbackblock",
+                                             256)
+        self.scrollback_cache = ScrollbackCache(
+                self.config.getint("Display", "scrollbackcache", 4))
+        # held by whichever thread reads or modifies the buffers
+        self.lock = threading.RLock()
         self.base = 0
         self.alternate_active = False
+        self.damaged_rows = None    # see track_damage()
+        self.rolled_over = 0        # rows dropped off the top of the buffer
+        self.selection_start = None
+        self.selection = None
+        self.selection_helper = SelectionHelper()
+        self.bracketed_paste = False
+        self.tab_stops = TabStops(width)
+        self.charsets = CharsetState()
+        self.blank_row = BlankRow(width, self)
         self.create_buffer()
         self.create_alternate_buffer()
         self.setup_timer_events()
@@ -220,6 +450,7 @@ class ScreenBuffer:
         self.blink_cursor_timer = QtCore.QTimer()
         self.blink_cursor_timer.timeout.connect(self.blink_cursor_cb)
         self.blink_cursor_active = True
+        self.blink_reset = False
         self.draw_cursor = True
         self.blink_speed = self.config.getint("Cursor", "blinkms", 600)
         self.blink_cursor_timer.start(self.blink_speed)
@@ -227,99 +458,205 @@ class ScreenBuffer:
     def blink_cursor_cb(self):
         if not self.blink_cursor_active:
             return
-        self.draw_cursor = not self.draw_cursor
-        position = self.cursor.position()
-        self.parent.update(position)
+        with self.lock:
+            if self.blink_reset:
+                # the cursor moved, keep it visible for another period
+                self.blink_reset = False
+                self.draw_cursor = True
+            else:
+                self.draw_cursor = not self.draw_cursor
+            position = self.cursor.position()
+        self.parent.request_update(position)
 
     def blink_cursor(self, blink=True):
         self.blink_cursor_active = blink
         self.draw_cursor = True
         position = self.cursor.position()
-        self.parent.update(position)
+        self.parent.request_update(position)
         self.reset_blink_timer()
 
     def show_cursor(self, show=True):
         self.blink_cursor_active = show
         self.draw_cursor = show
         position = self.cursor.position()
-        self.parent.update(position)
+        self.parent.request_update(position)
         self.reset_blink_timer()
 
     def reset_blink_timer(self):
-        self.blink_cursor_timer.start(self.blink_speed)
+        # the timer belongs to the gui thread, so it is not restarted here
+        self.blink_reset = True
 
     def get_widget(self):
         return self.parent
 
     def create_buffer(self):
-        self.buffer = []
-        for row in xrange(0, self.height + self.scrollback):
-            self.buffer.append(TerminalRow(self.width, self))
+        self.buffer = [self.blank_row] * (self.height + self.scrollback)
+        self.frozen_rows = 0    # rows at the top that were frozen in blocks
+        self.scrollback_cache.clear()
+        self.damage_rows(0, len(self.get_buffer()))
         self.log.debug("Buffer size = %s" % len(self.buffer))
 
     def create_alternate_buffer(self):
-        self.alternate = []
-        for row in xrange(0, self.height):
-            self.alternate.append(TerminalRow(self.width, self))
+        self.alternate = [self.blank_row] * self.height
         self.set_buffer_scroll_range(0, self.height)
+        self.damage_rows(0, len(self.get_buffer()))
+
+    def track_damage(self):
+        '''Has the rows of the active buffer that are written to or replaced
+           recorded from now on, see take_damage().'''
+        self.damaged_rows = set()
+
+    def damage_rows(self, first, last):
+        if self.damaged_rows is not None:
+            self.damaged_rows.update(xrange(first, last))
+
+    def take_damage(self):
+        '''Returns the rows of the active buffer that changed since the last
+           call.  Rows are counted from the top of the buffer as it is now,
+           rolled_over tells how far it moved.'''
+        damaged = self.damaged_rows
+        self.damaged_rows = set()
+        return damaged
 
     def insert_row(self, num=1):
-        buf = self.get_buffer()
+        '''Inserts blank rows at the cursor, the rows below it are pushed
+           down and off the bottom of the scrolling region.'''
+        if not self.alternate_active:
+            self.follow_cursor()
         (row, col) = self.cursor.get_row_col()
-        new_rows = [TerminalRow(self.width, self) for x in xrange(0, num)]
-        buf.insert(row, '')
-        buf[row:row + 1] = new_rows
-        self.log.debug("Inserted %s row(s): %s" % (num, len(buf)))
+        (first, last) = self.get_scroll_region()
+        if row < first or row >= last:
+            return
+        self.log.debug("Inserting %s row(s) at %s" % (num, row))
+        self.rotate_rows(row, last, -num)
 
-        # delete rows that are greater than the scroll_bottom
-        scroll_top = self.get_scroll_top()
-        scroll_bottom = self.get_scroll_bottom()
-        del buf[scroll_bottom:scroll_bottom + num]
-        self.parent.update()
+    def set_row_wrapped(self, row, wrapped=True):
+        self.get_row(row).wrapped = wrapped
 
     def insert_cell(self, row, col):
-        buf = self.get_buffer()
-        buf[row].insert(col, TerminalCell())
-        if len(buf[row]) > self.width:
-            del buf[row][self.width - 1:]
+        self.get_row(row).insert_cells(col, 1)
 
     def delete_row(self, num=1):
-        buf = self.get_buffer()
+        '''Deletes rows at the cursor, the rows below it move up and blank
+           rows come in at the bottom of the scrolling region.'''
+        if not self.alternate_active:
+            self.follow_cursor()
         (row, col) = self.cursor.get_row_col()
-        del buf[row:row + num]
-        self.log.debug("Deleted %s row(s): %s" % (num, len(buf)))
+        (first, last) = self.get_scroll_region()
+        if row < first or row >= last:
+            return
+        self.log.debug("Deleting %s row(s) at %s" % (num, row))
+        self.rotate_rows(row, last, num)
 
-        # insert new blank rows
-        scroll_bottom = self.get_scroll_bottom() - num
-        new_rows = [TerminalRow(self.width, self) for x in xrange(0, num)]
-        buf.insert(scroll_bottom, '')
-        buf[scroll_bottom:scroll_bottom + 1] = new_rows
-        self.parent.update()
+    def rotate_rows(self, first, last, times):
+        '''Moves the rows from first up to last of the active buffer up by
+           times rows, or down if times is negative.  The rows moved out at
+           one end are dropped and blank rows come in at the other.'''
+        buf = self.get_buffer()
+        count = last - first
+        if count <= 0 or times == 0:
+            return
+        if abs(times) >= count:
+            buf[first:last] = [self.blank_row] * count
+        elif times > 0:
+            buf[first:last] = buf[first + times:last] + \
+                              [self.blank_row] * times
+        else:
+            buf[first:last] = [self.blank_row] * -times + \
+                              buf[first:last + times]
+        self.damage_rows(first, last)
+        self.update_rows(first, last - 1)
 
     def get_buffer(self):
         if self.alternate_active:
             return self.alternate
         return self.buffer
 
+    def get_row(self, row):
+        '''Retrieves a TerminalRow with at least width cells to write to, a
+           blank row gets a TerminalRow of its own first and a frozen one
+           keeps the cells it is thawed with.  The spans of the row are
+           found again the next time they are needed.'''
+        buf = self.get_buffer()
+        self.damage_rows(row, row + 1)
+        if buf[row].blank:
+            cells = TerminalRow(self.width, self)
+            buf[row] = cells
+            return cells
+        cells = self.peek_row(row)
+        cells.frozen = None
+        cells.spans = None
+        return cells
+
+    def peek_row(self, row):
+        '''Retrieves a row to read from, a blank row is the shared one.'''
+        cells = self.get_buffer()[row]
+        if cells.blank:
+            return cells
+        if cells.states is not None:
+            cells.set_state(cells.states)
+        if cells.frozen is not None and not len(cells):
+            self.scrollback_cache.thaw(cells)
+        if cells.width != self.width or len(cells) < self.width:
+            cells.expand(self.width)
+        return cells
+
+    def freeze_scrollback(self):
+        '''Compresses the rows of the main buffer that are more than a
+           screen above the top of the screen, block_rows at a time.'''
+        if self.alternate_active or self.block_rows <= 0:
+            return
+        limit = self.base - self.height
+        while self.frozen_rows + self.block_rows <= limit:
+            rows = self.buffer[self.frozen_rows:
+                               self.frozen_rows + self.block_rows]
+            rows = [row for row in rows
+                    if not row.blank and row.frozen is None]
+            if rows:
+                ScrollbackBlock(rows)
+            self.frozen_rows += self.block_rows
+
+    def drop_rows(self, times):
+        '''Drops rows off the top of the main buffer, blank rows come in at
+           the bottom.'''
+        del self.buffer[0:times]
+        self.buffer.extend([self.blank_row] * times)
+        self.frozen_rows = max(self.frozen_rows - times, 0)
+        self.rolled_over += times
+        if self.damaged_rows is not None and not self.alternate_active:
+            self.damaged_rows = set([row - times for row in self.damaged_rows
+                                     if row >= times])
+            self.damage_rows(max(len(self.buffer) - times, 0),
+                             len(self.buffer))
+        self.shift_selection(-times)
+
+    def set_row_states(self, row, wrapped, states):
+        '''Replaces a row of the active buffer with one that is drawn from
+           states, see TerminalRow.  A row in the frozen part of the
+           scrollback is frozen again by the next freeze_scrollback().'''
+        blank = self.blank_row[0].get_state()
+        if not wrapped and all([state == blank for state in states]):
+            cells = self.blank_row
+        else:
+            cells = TerminalRow(self.width, self, states=states)
+            cells.wrapped = wrapped
+        self.get_buffer()[row] = cells
+        if not self.alternate_active:
+            self.frozen_rows = min(self.frozen_rows, row)
+
     def is_alternate_buffer(self):
         return self.alternate_active
 
     def resize(self, width, height):
         '''Width and height in cells, not pixels. May change this...'''
-        #FIXME creating new rows/cells when the height/width changes is
-        # very expensive...investigate other methods of resizing the buffers
-        # without having to create new objects each time...
         self.log.debug("Resizing screen to %s, %s" % (width, height))
-        if height > self.height:
-            diff = height - self.height
-            for cnt in xrange(0, diff):
-                self.buffer.append(TerminalRow(width, self))
-            self.log.debug("Resized buffer size = %s" % len(self.buffer))
-
-        if width > self.width:
-            self.log.debug("Increasing width of screen buffer to %s." % width)
-            for row in xrange(0, height + self.scrollback):
-                self.buffer[row].expand(width)
+        self.clear_selection()
+        (old_width, old_height) = (self.width, self.height)
+        self.height = height
+        if width != old_width:
+            self.blank_row = BlankRow(width, self)
+        if width != old_width or height != old_height:
+            self.reflow(old_width, width)
 
         if height < len(self.alternate):
             diff = len(self.alternate) - height 
@@ -328,29 +665,188 @@ class ScreenBuffer:
                               (diff, len(self.alternate)))
         elif height > len(self.alternate):
             diff = height - len(self.alternate)
-            for cnt in xrange(0, diff):
-                self.alternate.append(TerminalRow(width, self))
+            self.alternate.extend([self.blank_row] * diff)
             self.log.debug("Added %s rows to alt buffer, len = %s" % \
                              (diff, len(self.alternate)))
 
-        if width < len(self.alternate[0]):
-            diff = len(self.alternate[0]) - width
-            for row in xrange(0, len(self.alternate)):
-                del self.alternate[row][-diff:]
-                self.alternate[row].width = width
-            self.log.debug("Deleted %s cols from alt buffer, len = %s" % \
-                              (diff, len(self.alternate[0])))
-        elif width > len(self.alternate[0]):
-            diff = width - len(self.alternate[0])
-            for row in xrange(0, len(self.alternate)):
-                self.alternate[row].expand(width)
-            self.log.debug("Added %s cols to alt buffer, len = %s" % \
-                             (diff, len(self.alternate[0])))
+        # the alternate buffer is not reflowed, like xterm
+        for (idx, row) in enumerate(self.alternate):
+            if row.blank:
+                self.alternate[idx] = self.blank_row
+                continue
+            if width < len(row):
+                del row[width:]
+            row.expand(width)
 
         self.width = width
-        self.height = height
+        self.tab_stops.resize(width)
         self.buffer_scroll_top = 0
         self.buffer_scroll_bottom = height
+        self.damage_rows(0, len(self.get_buffer()))
+        if self.alternate_active:
+            (row, col) = self.cursor.get_row_col()
+            self.cursor.set_row_col(min(row, height - 1), min(col, width - 1))
+        self.parent.request_update()
+
+    def reflow(self, old_width, width):
+        '''Rewraps the logical lines of the main buffer to a new width.
+
+           The cells are moved into the new rows in a single pass, nothing
+           is copied.  Rows that end up shorter than the width are padded
+           by get_row() the first time they are accessed, so history that
+           is never scrolled into view is never padded.  Lines that are
+           only frozen rows or rows without cells are rewrapped from their
+           states, their new rows have no cells either.'''
+        if self.alternate_active:
+            cursor = getattr(self, 'saved_cursor', None)
+            base = getattr(self, 'saved_base', 0)
+        else:
+            cursor = self.cursor
+            base = self.base
+        (cursor_row, cursor_col) = (-1, 0)
+        if cursor is not None:
+            (cursor_row, cursor_col) = cursor.get_row_col()
+
+        # everything below the bottom of the screen is unused
+        bottom = min(len(self.buffer), base + self.height)
+        bottom = max(bottom, cursor_row + 1)
+        new_rows = []
+        (new_base, new_cursor) = (0, (0, 0))
+        last_used = 0       # rows after this one are blank
+        decoded = {}        # the states of the blocks of frozen rows
+        blank = TerminalCell().get_state()
+        # a line is of cells, or of their states while it is all frozen
+        def has_data(cell):
+            return cell[5] if isinstance(cell, tuple) else cell.has_data
+        def width_of(cell):
+            return cell[6] if isinstance(cell, tuple) else cell.width
+        def locate(bounds, offset):
+            # the row of the line offset is in, and its column there
+            for (cnt, (start, end)) in enumerate(bounds):
+                if offset < end:
+                    return (cnt, offset - start)
+            offset -= bounds[-1][1]
+            return (len(bounds) + offset // width, offset % width)
+        # the logical line, and where each of its rows starts in it
+        line = []
+        line_states = False
+        starts = []
+        padded = False      # the last row ended in a padding cell
+        line_start = 0
+        for idx in xrange(0, bottom):
+            row = self.buffer[idx]
+            row_states = row.states
+            if row.frozen is not None and not len(row):
+                (block, block_idx) = row.frozen
+                if block not in decoded:
+                    decoded[block] = block.decode()
+                row_states = decode_row(decoded[block][block_idx])
+            if not line:
+                line_states = row_states is not None
+            if row_states is not None:
+                row_cells = row_states[:old_width]
+                if not line_states:
+                    row_cells = TerminalRow.create_cells(row_cells)
+            elif not row.blank:
+                row_cells = row[:old_width]
+                if line_states:
+                    line = TerminalRow.create_cells(line)
+                    line_states = False
+            else:
+                row_cells = []
+            # a wide character that did not fit at the end of the last row
+            # left a padding cell there, which is not part of the line
+            if padded and row_cells and width_of(row_cells[0]) == 2:
+                line.pop()
+            starts.append(len(line))
+            line.extend(row_cells)
+            if row.wrapped and idx < bottom - 1:
+                padded = len(row_cells) == old_width and \
+                         not has_data(row_cells[-1])
+                continue
+
+            # end of a logical line, strip the unused cells at the end
+            length = len(line)
+            while length > 0 and not has_data(line[length - 1]):
+                length -= 1
+            # split it into rows, a wide character that would be cut in two
+            # moves to the next row and leaves a padding cell behind
+            bounds = []
+            start = 0
+            while start < length or not bounds:
+                end = start + width
+                if end < length and width > 1 and \
+                   width_of(line[end - 1]) == 2:
+                    end -= 1
+                bounds.append((start, end))
+                start = end
+            first = len(new_rows)
+            if line_start <= cursor_row <= idx:
+                offset = starts[cursor_row - line_start] + cursor_col
+                while offset >= bounds[-1][1]:
+                    start = bounds[-1][1]
+                    bounds.append((start, start + width))
+                new_cursor = locate(bounds, offset)
+                new_cursor = (first + new_cursor[0], new_cursor[1])
+                last_used = first + len(bounds)
+            if line_start <= base <= idx:
+                offset = starts[base - line_start]
+                new_base = first + locate(bounds, offset)[0]
+            if length > 0:
+                last_used = first + len(bounds)
+            for (cnt, (start, end)) in enumerate(bounds):
+                row_cells = line[start:end]
+                wrapped = cnt < len(bounds) - 1
+                if not row_cells and not wrapped:
+                    new_rows.append(self.blank_row)
+                    continue
+                if wrapped and end - start < width:
+                    row_cells.append(blank if line_states else TerminalCell())
+                if line_states:
+                    new_row = TerminalRow(width, self, states=row_cells)
+                else:
+                    new_row = TerminalRow(width, self, cells=row_cells)
+                new_row.wrapped = wrapped
+                new_rows.append(new_row)
+            if not line_states:
+                for cell in line:
+                    cell.dirty = True
+            line = []
+            starts = []
+            padded = False
+            line_start = idx + 1
+        del new_rows[last_used:]
+
+        # keep the cursor on the screen and the base within the scrollback
+        (cursor_row, cursor_col) = new_cursor
+        if cursor is not None:
+            if cursor_row >= new_base + self.height:
+                new_base = cursor_row - self.height + 1
+            if cursor_row < new_base:
+                new_base = cursor_row
+        if new_base > self.scrollback:
+            drop = new_base - self.scrollback
+            del new_rows[0:drop]
+            new_base -= drop
+            cursor_row -= drop
+        size = self.height + self.scrollback
+        del new_rows[size:]
+        new_rows.extend([self.blank_row] * (size - len(new_rows)))
+        self.buffer = new_rows
+        self.frozen_rows = 0
+        self.scrollback_cache.clear()
+        self.log.debug("Reflowed buffer, base = %s, size = %s" % \
+                       (new_base, len(self.buffer)))
+
+        if self.alternate_active:
+            self.saved_base = new_base
+        else:
+            self.base = new_base
+            self.parent.set_scroll_value(new_base)
+        if cursor is not None:
+            cursor.row = cursor_row
+            cursor.col = cursor_col
+        self.freeze_scrollback()
 
     def get_cursor(self):
         return self.cursor
@@ -363,12 +859,10 @@ class ScreenBuffer:
         if not hasattr(self, 'saved_cursor'):
             self.log.warning("Trying to restore unsaved cursor!!!")
             return
-        cell = self.cursor.get_cell()
-        cell.set_dirty()
+        self.cursor.set_dirty()
         self.cursor = self.saved_cursor
         del self.saved_cursor       # DECRC
-        cell = self.cursor.get_cell()
-        cell.set_dirty()
+        self.cursor.set_dirty()
 
     def get_size(self):
         return (self.width, self.height)
@@ -413,7 +907,11 @@ class ScreenBuffer:
         row_range.reverse()
         buf = self.get_buffer()
         for row in row_range:
-            buf[row].draw(painter, row)
+            cells = buf[row]
+            if cells.states is None:
+                # frozen rows are thawed and short rows padded first
+                cells = self.peek_row(row)
+            cells.draw(painter, row)
 
         cursor_pos = self.cursor.position()
         if self.draw_cursor and cursor_pos.intersects(event.rect()):
@@ -440,13 +938,9 @@ class ScreenBuffer:
             bottom = buf_size
         buf = self.get_buffer()
         for row in xrange(top, bottom):
-            for col in xrange(0, self.width):
-                try:
-                    cell = buf[row][col]
-                except:
-                    self.log.exception()
-                    self.log.error("row = %s, col = %s" % (row, col))
-                    return
+            # only cells that exist can be dirty
+            for col in xrange(0, min(self.width, len(buf[row]))):
+                cell = buf[row][col]
                 if not cell.dirty:
                     continue
                 cell.dirty = False
@@ -458,103 +952,170 @@ class ScreenBuffer:
                        ScreenBuffer.is_rect_adjacent(rect, new_rect):
                         rect = rect.unite(new_rect)
                     else:
-                        self.parent.update(rect)
+                        self.parent.request_update(rect)
                         rect = new_rect
         if rect is not None:
-            self.parent.update(rect)
+            self.parent.request_update(rect)
 
     def set_window_title(self, title):
         if self.parent is None:
             return
-        self.parent.setWindowTitle(title)
+        self.parent.request_window_title(title)
+
+    def set_clipboard_text(self, text, selection=False):
+        '''Sets the clipboard (or the X11 selection) on behalf of the
+           remote end, see ClipboardEscapeSequence.'''
+        if self.parent is None:
+            return
+        self.parent.request_clipboard_text(text, selection)
+
+    def get_tab_stops(self):
+        return self.tab_stops
+
+    def get_charsets(self):
+        return self.charsets
 
     def get_cell(self, row, col):
-        '''Retrieves a TerminalCell object from this screen buffer.'''
-        buf = self.get_buffer()
+        '''Retrieves a TerminalCell object from this screen buffer to read
+           from, the cells of a blank row are the shared blank one.  Cells
+           are written to through get_row().'''
         try:
-            return buf[row][col]
+            return self.peek_row(row)[col]
         except IndexError as e:
             self.log.error("IndexError (%s,%s)" % (row, col))
             raise e
 
+    def set_cell_dirty(self, row, col):
+        '''Has a cell repainted without making its row writable, the blank
+           cell is shared so a blank row is repainted right away.'''
+        cells = self.peek_row(row)
+        if cells.blank:
+            self.parent.request_update(self.create_rect_from_cell(row, col))
+        else:
+            cells[col].dirty = True
+
+    def follow_cursor(self):
+        '''Scrolls down until the cursor is on the screen.'''
+        (row, col) = self.cursor.get_row_col()
+        if row >= self.base + self.height:
+            self.scroll_down(row - (self.base + self.height) + 1)
+
     def scroll(self, direction=ScrollDirection.DOWN, times=1):
+        '''Scrolls the scrolling region when the cursor moves past it.'''
         if direction == ScrollDirection.DOWN:
-            self.scroll_down(times)
+            self.scroll_lines(times)
         elif direction == ScrollDirection.UP:
-            self.scroll_up(times)
+            self.scroll_lines(-times)
         else:
             self.log.error("Unknown scroll direction")
 
-    def scroll_up(self, times=1):
-        if self.alternate_active:
-            scroll_top = self.get_scroll_top()
-            scroll_bottom = self.get_scroll_bottom()
-            buf = self.get_buffer()
-            first = scroll_top
-            last = scroll_bottom - 1
-
-            rows = [TerminalRow(self.width, self) for x in range(0, times)]
-            del buf[last:last + times]
-            buf.insert(first, '')
-            buf[first:first + 1] = rows
-
-            self.parent.update()
+    def scroll_lines(self, times=1):
+        '''Scrolls the text in the scrolling region up by times rows, or
+           down if times is negative, without moving the cursor.  Only text
+           scrolled off the top of the whole screen of the main buffer goes
+           into the scrollback, anywhere else the rows of the region are
+           rotated.'''
+        if self.alternate_active or self.has_scroll_region() or times < 0:
+            (first, last) = self.get_scroll_region()
+            self.rotate_rows(first, last, times)
             return
+        self.follow_cursor()
+        for x in xrange(0, min(times, self.height)):
+            # the row that comes into view may be stale
+            bottom = self.base + self.height
+            if bottom < len(self.buffer):
+                self.buffer[bottom] = self.blank_row
+                self.damage_rows(bottom, bottom + 1)
+            base = self.base
+            self.scroll_down()
+            # the buffer may have rolled over instead of the base moving
+            (row, col) = self.cursor.get_row_col()
+            self.cursor.set_row_col(row + self.base - base, col)
 
+    def scroll_up(self, times=1):
+        '''Moves the view of the main buffer up.'''
         self.base -= times
         if self.base < 0:
             self.base = 0
         self.log.debug("Scrolling screen buffer, base = %s, row = %s" % \
                        (self.base, self.cursor.row))
-        self.parent.update()
+        self.parent.request_update()
         self.parent.set_scroll_value(self.base)
 
     def scroll_down(self, times=1):
+        '''Moves the view of the main buffer down, rolling the buffer over
+           once the scrollback is full.'''
         if self.alternate_active:
-            scroll_top = self.get_scroll_top()
-            scroll_bottom = self.get_scroll_bottom()
-            buf = self.get_buffer()
-            first = scroll_top - 1
-            if first < 0:
-                first = 0
-            last = scroll_bottom - 1
-            if last > len(buf):
-                last = len(buf) - 1
-
-            rows = [TerminalRow(self.width, self) for x in xrange(0, times)]
-            del buf[first:first + times]
-            buf.insert(last, '')
-            buf[last:last + 1] = rows
-
-            #repaint_buf = buf[first:last + 1]
-            self.parent.update()
             return
-
         self.base += times
         self.log.debug("Scrolling screen buffer, base = %s, row = %s" % \
                        (self.base, self.cursor.row))
         if (self.base - times) >= self.scrollback:
             self.log.debug("Scrollback exceeded...rolling over buffer.")
             self.base -= times
-            del self.buffer[0:times]
-            rows = [TerminalRow(self.width, self) for x in xrange(0, times)]
-            self.buffer.extend(rows)
+            self.drop_rows(times)
+        self.freeze_scrollback()
         self.parent.set_scroll_value(self.base)
-        self.parent.update()
+        self.parent.request_update()
 
     def set_buffer_scroll_range(self, top, bottom):
         '''Do not use this to set scroll ranges for the widget. 
            This is used by the sequencer to manipulate text in the buffer.
            It does not affect the graphical scroll bar at all.
-           top, bottom should not be zero-offset. 
+           top is the first row of the scrolling region and bottom the row
+           after its last, both counted from the top of the screen from 0.
         '''
         self.buffer_scroll_top = top
         self.buffer_scroll_bottom = bottom
 
-    def clear_screen(self):
+    def has_scroll_region(self):
+        return self.buffer_scroll_top != 0 or \
+               self.buffer_scroll_bottom != self.height
+
+    def get_scroll_region(self):
+        '''Returns the first row of the scrolling region and the row after
+           its last in the active buffer.'''
+        return (self.base + self.buffer_scroll_top,
+                self.base + self.buffer_scroll_bottom)
+
+    def erase_span(self, row, first, last, bgcolor=None):
+        '''Blanks the cells of a row from first up to last.'''
+        self.get_row(row).erase(first, last, bgcolor)
+
+    def erase_rows(self, first, last, bgcolor=None):
+        '''Blanks the rows from first up to last of the active buffer, they
+           become the shared blank row unless they are filled with a
+           background color.'''
+        if bgcolor is None or bgcolor == TerminalCell.DEFAULT_BGCOLOR:
+            buf = self.get_buffer()
+            buf[first:last] = [self.blank_row] * (last - first)
+            if first < last:
+                self.damage_rows(first, last)
+                self.update_rows(first, last - 1)
+            return
+        for row in xrange(first, last):
+            cells = self.get_row(row)
+            cells.wrapped = False
+            cells.erase(0, self.width, bgcolor)
+
+    def erase_scrollback(self):
+        '''Drops the rows above the screen of the main buffer, the screen
+           moves up to the top and blank rows come in below it.'''
+        if self.alternate_active or self.base == 0:
+            return
+        times = self.base
+        self.clear_selection()
+        self.drop_rows(times)
+        self.scrollback_cache.clear()
+        (row, col) = self.cursor.get_row_col()
+        self.cursor.set_row_col(max(row - times, 0), col)
+        self.base = 0
+        self.parent.set_scroll_value(self.base)
+        self.parent.request_update()
+
+    def clear_screen(self, bgcolor=None):
         if self.alternate_active:
-            for row in self.alternate:
-                row.reset()
+            self.erase_rows(0, len(self.alternate), bgcolor)
             return
         self.log.debug("Clear Screen")
         #self.scroll_bar.setRange(0, self.base)
@@ -568,6 +1129,7 @@ class ScreenBuffer:
         else:
             self.scroll_down(times)
         #self.parent.set_scroll_value(self.base)
+        self.erase_rows(self.base, self.base + self.height, bgcolor)
 
     def get_base_row(self):
         return self.base
@@ -579,23 +1141,25 @@ class ScreenBuffer:
         return self.height + self.scrollback
 
     def get_scroll_bottom(self):
-        if self.alternate_active:
-            if hasattr(self, "buffer_scroll_bottom"):
-                return self.buffer_scroll_bottom
-        screen_bottom = self.base + self.height
-        buf_size = self.get_buffer_size()
-        if screen_bottom > buf_size:
-            return buf_size
-        return buf_size
+        '''The cursor scrolls the region when it moves down to this row.
+           Without a scrolling region the main buffer grows into the rest
+           of the buffer instead, the view follows the cursor.'''
+        if self.alternate_active or self.has_scroll_region():
+            return self.base + self.buffer_scroll_bottom
+        return self.get_buffer_size()
 
     def get_scroll_top(self):
-        if self.alternate_active:
-            if hasattr(self, "buffer_scroll_top"):
-                return self.buffer_scroll_top
-        return self.base
+        return self.base + self.buffer_scroll_top
+
+    def get_last_row(self):
+        '''The lowest row the cursor can move down to.'''
+        if self.alternate_active or self.has_scroll_region():
+            return self.base + self.height - 1
+        return self.get_buffer_size() - 1
 
     def set_alternate_buffer(self, alternate=True):
         self.log.debug("Set alternate buffer: %s" % alternate)
+        self.clear_selection()
         self.alternate_active = alternate
         if alternate:
             self.saved_scroll_values = self.parent.get_scroll_value()
@@ -606,7 +1170,7 @@ class ScreenBuffer:
             del self.saved_scroll_values
             self.base = self.saved_base
             del self.saved_base
-        self.parent.update()
+        self.parent.request_update()
 
     def print_debug(self):
         # this is an expensive function, so we skip it if we are not logging 
@@ -618,11 +1182,15 @@ class ScreenBuffer:
         bottom = len(buff)
         for row in xrange(0, bottom):
             debug += u"%03d: " % row
-            for col in xrange(0, self.width):
-                debug += unicode(buff[row][col]) or u' '
+            for cell in self.peek_row(row)[:self.width]:
+                debug += unicode(cell) or u' '
             debug += u"\n"
         self.log.debug("Screen buffer contents:\n%s" % debug)
 
+    def set_bracketed_paste(self, bracketed=True):
+        self.bracketed_paste = bracketed
+        self.log.debug("Set bracketed paste: %s" % bracketed)
+
     def set_cursor_keys(self, application=True):
         self.application_cursor_keys = application
         self.log.debug("Set application cursor keys: %s" % application)
@@ -674,153 +1242,190 @@ class ScreenBuffer:
             return '\x1bOF'
         return False
 
+    def update_rows(self, top, bottom):
+        '''Repaints the rows from top to bottom, inclusive.'''
+        if top > bottom:
+            (top, bottom) = (bottom, top)
+        rect = self.create_rect_from_cell(top, 0)
+        rect = rect.unite(self.create_rect_from_cell(bottom, self.width - 1))
+        self.parent.request_update(rect)
+
     def clear_selection(self):
-        if hasattr(self, 'selection_start'):
-            del self.selection_start
-        buf = self.get_buffer()
-        for row in xrange(0, len(buf)):
-            for col in xrange(0, len(buf[row])):
-                cell = buf[row][col]
-                if cell.selected:
-                    cell.toggle_selection()
-                    rect = self.create_rect_from_cell(row, col)
-                    self.parent.update(rect)
+        self.selection_start = None
+        if self.selection is None:
+            return
+        ((top, left), (bottom, right)) = self.selection
+        self.selection = None
+        self.update_rows(top, bottom)
 
     def set_selection_start(self, top, left):
+        if self.selection_start == (top, left):
+            # same anchor, the selection will be extended from here
+            return
         self.clear_selection()
-        cell = self.get_cell(top, left)
-        cell.toggle_selection()
-        rect = self.create_rect_from_cell(top, left)
-        self.parent.update(rect)
         self.selection_start = (top, left)
+        self.selection = ((top, left), (top, left))
+        self.update_rows(top, top)
 
     def set_selection_to_cell(self, top, left):
-        if not hasattr(self, 'selection_start'):
+        if self.selection_start is None:
             return
-        self.cursor.save_row_col()
-        self.cursor.set_row_col(*self.selection_start)
-        while self.cursor.get_row_col() != (top, left):
-            cell = self.cursor.get_cell()
-            if not cell.selected:
-                cell.toggle_selection()
-                self.parent.update(self.cursor.position())
-            if (top == self.selection_start[0] and \
-               left >= self.selection_start[1]) or \
-               top > self.selection_start[0]:
-                self.cursor.advance_column(scroll=False)
-            else:
-                self.cursor.previous_column(scroll=False)
-        cell = self.cursor.get_cell()
-        if not cell.selected:
-            cell.toggle_selection()
-            self.parent.update(self.cursor.position())
-        self.cursor.restore_row_col()
+        anchor = self.selection_start
+        (start, end) = (min(anchor, (top, left)), max(anchor, (top, left)))
+        if self.selection is not None:
+            # only the rows between the old and new endpoints changed
+            (old_start, old_end) = self.selection
+            if old_start != start:
+                self.update_rows(old_start[0], start[0])
+            if old_end != end:
+                self.update_rows(old_end[0], end[0])
+        else:
+            self.update_rows(start[0], end[0])
+        self.selection = (start, end)
+
+    def shift_selection(self, rows):
+        '''Moves the selection when the rows of the buffer are shifted.'''
+        if self.selection_start is not None:
+            (top, left) = self.selection_start
+            self.selection_start = (top + rows, left)
+        if self.selection is None:
+            return
+        ((top, left), (bottom, right)) = self.selection
+        if bottom + rows < 0:
+            self.selection = None
+            return
+        if top + rows < 0:
+            (top, left) = (-rows, 0)
+        self.selection = ((top + rows, left), (bottom + rows, right))
+
+    def get_selection_span(self, row):
+        '''Returns the (first, last) selected columns of a row, inclusive, or
+           None if the row is not part of the selection.'''
+        if self.selection is None:
+            return None
+        ((top, left), (bottom, right)) = self.selection
+        if row < top or row > bottom:
+            return None
+        first = left if row == top else 0
+        last = right if row == bottom else self.width - 1
+        return (first, last)
+
+    def is_selected(self, row, col):
+        span = self.get_selection_span(row)
+        return span is not None and span[0] <= col <= span[1]
 
     def get_selection_text(self):
-        text = ""
+        if self.selection is None:
+            return ""
+        ((top, left), (bottom, right)) = self.selection
         buf = self.get_buffer()
-        cell = None
-        for row in xrange(0, len(buf)):
-            for col in xrange(0, len(buf[row])):
-                cell = buf[row][col]
-                if cell.selected:
-                    text += cell.ch
-            if cell and cell.selected and not cell.has_data:
-                text += '\n'
+        text = u""
+        for row in xrange(top, min(bottom + 1, len(buf))):
+            (first, last) = self.get_selection_span(row)
+            cells = self.peek_row(row)
+            text += cells.get_chars(first, last + 1)
+            if cells.wrapped or last != self.width - 1:
+                continue
+            if len(cells) < self.width or not cells[last].has_data:
+                text += u"\n"
         return text
 
     def find_word(self, top, left):
-        word_separators = [' ', ':', '.', ',', '[', ']', '(', ')', '<', 
-                           '>', '!', '`']
-        cell = self.get_cell(top, left)
-        first = (top, left)
-        last = (top, left)
-        if cell.ch in word_separators:
-            return (first, last)
-
-        (row, col) = (top, left)
-        is_eol = not self.get_cell(row, col).has_data
-        while first > (self.base, 0):
-            col -= 1
-            if col < 0:
-                col = self.width - 1
-                row -= 1
-            if row < self.base:
-                row = self.base
-                col = 0
-                break
-            cell = self.get_cell(row, col)
-            if not is_eol and not cell.has_data:
-                col = 0
-                row += 1
-                break
-            if cell.ch in word_separators:
-                col += 1
-                break
-            while not cell.has_data and col > 0:
-                is_eol = True
-                col -= 1
-                cell = self.get_cell(row, col)
-                if cell.has_data:
-                    col += 1
-            if is_eol:
-                break
-        first = (row, col)
-
-        (row, col) = (top, left)
-        is_eol = not self.get_cell(row, col).has_data
-        while last < (self.base + self.height - 1, self.width - 1):
-            col += 1
-            cell = self.get_cell(row, col)
-            if cell.ch in word_separators:
-                col -= 1
-                break
-            if not cell.has_data and not is_eol:
-                col -= 1
-                break
-            while not cell.has_data and col < self.width - 1:
-                col += 1
-                cell = self.get_cell(row, col)
-            if not cell.has_data:
-                break
-        last = (row, col)
-        return (first, last)
+        return self.selection_helper.find_word(self, top, left)
+
+    def find_line(self, top, left):
+        return self.selection_helper.find_line(self, top)
 
 
 class SequencerWorker(QtCore.QThread):
-    def __init__(self, sequencer, screen, queue):
+    '''Runs the sequencers of all terminal widgets.  A widget is scheduled
+       when output arrives for it and all of its pending output is then
+       processed at once.'''
+    __worker = None
+
+    def __init__(self):
         QtCore.QThread.__init__(self)
-        #self.log = log.get_log(self)
-        self.sequencer = sequencer
-        self.screen = screen
-        self.queue = queue
-        self.config = TerminalConfig()
-        self.focus_on_output = self.config.getboolean("Cursor",
-                                                      "focusonoutput", True)
+        self.log = log.get_log(self)
+        self.queue = Queue()
         self.running = False
 
+    def get_worker():
+        if SequencerWorker.__worker is None:
+            SequencerWorker.__worker = SequencerWorker()
+            SequencerWorker.__worker.start()
+        return SequencerWorker.__worker
+    get_worker = staticmethod(get_worker)
+
+    def schedule(self, widget):
+        self.queue.put(widget)
+
     def run(self):
         self.running = True
         while self.running:
             try:
-                data = self.queue.get(True, 1)
+                widget = self.queue.get(True, 1)
             except Empty:
                 continue
-            self.sequencer.process(data)
-            self.screen.repaint_dirty_cells()
-            if self.focus_on_output:
-                cursor = self.screen.get_cursor()
-                (row, col) = cursor.get_row_col()
-                (width, height) = self.screen.get_size()
-                base = self.screen.base
-                if row >= base + height:
-                    self.screen.scroll_down(row - (base + height) + 1)
-            self.queue.task_done()
+            (data, size) = widget.take_pending()
+            try:
+                if data and not widget.closed:
+                    widget.process(data)
+            except Exception:
+                # the worker serves every tab, one bad chunk must not stop it
+                self.log.exception()
+            finally:
+                widget.processed(size)
+                self.queue.task_done()
 
     def stop(self):
         self.running = False
 
 
+class ResizeCoordinator(QtCore.QObject):
+    '''Collapses a burst of resize events (e.g. dragging a window edge)
+       into a single resize of the screen buffer and the channel, applied
+       once the geometry has not changed for a short delay.'''
+    def __init__(self, screen, channel, lock, parent=None):
+        QtCore.QObject.__init__(self, parent)
+        self.log = log.get_log(self)
+        self.screen = screen
+        self.channel = channel
+        self.lock = lock
+        self.config = TerminalConfig()
+        self.delay = self.config.getint("Display", "resizedelayms", 100)
+        self.pending = None
+        self.current = self.screen.get_size()
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.apply)
+
+    def request(self, cols, rows):
+        self.pending = (cols, rows)
+        self.timer.start(self.delay)
+
+    def apply(self):
+        if self.pending is None:
+            return
+        (cols, rows) = self.pending
+        self.pending = None
+        if (cols, rows) == self.current:
+            return
+        self.log.debug("Resizing to (%s, %s)" % (cols, rows))
+        with self.lock:
+            self.screen.resize(cols, rows)
+            cursor = self.screen.get_cursor()
+            (row, col) = cursor.get_row_col()
+            bottom = self.screen.base + rows
+            if row >= bottom:
+                self.screen.base += (row - bottom + 1)
+        self.channel.resize(cols, rows)
+        self.current = (cols, rows)
+
+    def stop(self):
+        self.timer.stop()
+        self.pending = None
+
+
 class TerminalWidget(QtGui.QWidget):
     DEBUG_MARK = 1
 
@@ -828,6 +1433,12 @@ class TerminalWidget(QtGui.QWidget):
     titleChanged = QtCore.pyqtSignal(str)
     closing = QtCore.pyqtSignal()
 
+    # emitted by the sequencer thread, delivered on the gui thread
+    updateRequested = QtCore.pyqtSignal(QtCore.QRect)
+    scrollValueRequested = QtCore.pyqtSignal(int, int)
+    windowTitleRequested = QtCore.pyqtSignal(str)
+    clipboardTextRequested = QtCore.pyqtSignal(str, bool)
+
     def __init__(self, channel, parent=None):
         '''channel should be a TerminalChannel object.'''
         QtGui.QWidget.__init__(self, parent)
@@ -835,6 +1446,11 @@ class TerminalWidget(QtGui.QWidget):
         self.config = TerminalConfig()
         self.scroll_bar_width = self.config.getint("Display", 
                                                    "scrollbarsize", 14)
+        self.scroll_values = (0, 0)
+        self.updateRequested.connect(self.update_requested)
+        self.scrollValueRequested.connect(self.scroll_value_requested)
+        self.windowTitleRequested.connect(self.setWindowTitle)
+        self.clipboardTextRequested.connect(self.set_clipboard_text)
         self.screen = ScreenBuffer(parent=self)
         self.scroll_bar = QtGui.QScrollBar(self)
         self.scroll_bar.setCursor(QtCore.Qt.ArrowCursor)
@@ -842,9 +1458,28 @@ class TerminalWidget(QtGui.QWidget):
         (width, height) = self.screen.get_pixel_size()
         self.resize(width + self.scroll_bar_width, height)
         self.channel = channel 
-        self.channel.dataReceived.connect(self.write)
+        # write() only queues the data, so it is called directly from the
+        # thread the channel reads in instead of going through the gui
+        self.channel.dataReceived.connect(self.write, 
+                                          QtCore.Qt.DirectConnection)
         self.channel.endOfFile.connect(self.close)
-        self.sequencer = TerminalEscapeSequencer(self.screen, self.channel)
+        self.closed = False
+        self.focus_on_output = self.config.getboolean("Cursor",
+                                                      "focusonoutput", True)
+        # output waiting for the sequencer; reading from the channel is
+        # paused above the high water mark until it drops below the low one
+        self.pending = []
+        self.pending_size = 0
+        self.pending_lock = threading.Lock()
+        self.reading_paused = False
+        self.high_water_mark = self.config.getint("Sequencer", 
+                                                  "highwatermark", 262144)
+        self.low_water_mark = self.config.getint("Sequencer", 
+                                                 "lowwatermark", 65536)
+        self.skip_to_latest = self.config.getboolean("Sequencer", 
+                                                     "skiptolatest", False)
+        self.process_slice = max(self.config.getint("Sequencer",
+                                                    "processslice", 16384), 1)
         self.dirty = False
         cursor = self.screen.get_cursor()
         (self.col_size, self.row_size) = cursor.get_font_metrics()
@@ -852,10 +1487,12 @@ class TerminalWidget(QtGui.QWidget):
         self.clipboard = QtGui.QApplication.clipboard()
         self.clipboard.dataChanged.connect(self.clipboard_changed)
         self.word_select_mode = False
-        self.queue = Queue()
-        self.worker_thread = SequencerWorker(self.sequencer, self.screen, 
-                                             self.queue)
-        self.worker_thread.start()
+        self.line_select_mode = False
+        self.double_click_time = QtCore.QTime()
+        self.resizer = ResizeCoordinator(self.screen, self.channel,
+                                         self.screen.lock, self)
+        self.predictor = EchoPredictor(self.screen)
+        self.start_sequencer()
 
     @staticmethod
     def get_default_size():
@@ -865,16 +1502,113 @@ class TerminalWidget(QtGui.QWidget):
         width += scroll_bar_width
         return (width, height)
 
+    def start_sequencer(self):
+        self.sequencer = TerminalEscapeSequencer(self.screen, self.channel)
+        self.worker_thread = SequencerWorker.get_worker()
+
     def close(self):
-        self.log.debug("End of file received")
+        if self.closed:
+            return
+        self.log.debug("Closing terminal")
+        # before closing is emitted, the tab may close the widget again
+        self.closed = True
+        self.channel.close()
         self.closing.emit()
-        if hasattr(self, 'worker_thread') and self.worker_thread.isRunning():
-            self.worker_thread.stop()
-            self.worker_thread.wait(1500)
+        if hasattr(self, 'resizer'):
+            self.resizer.stop()
         QtGui.QWidget.close(self)
 
     def write(self, data):
-        self.queue.put(data)
+        with self.pending_lock:
+            schedule = len(self.pending) == 0
+            self.pending.append(data)
+            self.pending_size += len(data)
+            if self.pending_size > self.high_water_mark and \
+               not self.reading_paused:
+                self.log.debug("Sequencer is behind, pausing reads.")
+                self.reading_paused = True
+                self.channel.pause_reading()
+        if schedule:
+            self.worker_thread.schedule(self)
+
+    def take_pending(self):
+        '''Returns the pending output as one string and the number of
+           bytes taken, to be passed to processed() once it is done.'''
+        with self.pending_lock:
+            data = ''.join(self.pending)
+            self.pending = []
+        size = len(data)
+        if self.skip_to_latest and size > self.high_water_mark:
+            data = self.skip_output(data)
+        return (data, size)
+
+    def processed(self, size):
+        with self.pending_lock:
+            self.pending_size -= size
+            if self.reading_paused and \
+               self.pending_size < self.low_water_mark:
+                self.log.debug("Sequencer caught up, resuming reads.")
+                self.reading_paused = False
+                self.channel.resume_reading()
+
+    def set_skip_to_latest(self, skip=True):
+        self.skip_to_latest = skip
+
+    def skip_output(self, data):
+        '''Drops all but the last few screens worth of output, starting on
+           a line boundary.  Anything set by escape sequences in the
+           dropped part, like colors, is lost.'''
+        (width, height) = self.screen.get_size()
+        keep = width * height * 4
+        if len(data) <= keep:
+            return data
+        start = data.find('\n', len(data) - keep)
+        if start < 0:
+            return data
+        self.log.debug("Skipped %s bytes of output." % (start + 1))
+        return data[start + 1:]
+
+    def process(self, data):
+        '''Called from the SequencerWorker.  The screen lock is held while
+           a slice of [Sequencer] processslice bytes is processed and let go
+           between them, so painting and input wait for one slice at most;
+           the widget only sees the result through queued update requests.'''
+        for start in xrange(0, len(data), self.process_slice):
+            if start:
+                # give the gui thread a chance to take the lock
+                time.sleep(0)
+            with self.screen.lock:
+                self.sequencer.process(data[start:start + self.process_slice])
+                self.predictor.output_received()
+                self.screen.repaint_dirty_cells()
+                if self.focus_on_output:
+                    self.screen.follow_cursor()
+
+    def request_update(self, rect=None):
+        '''Thread safe version of update().'''
+        if rect is None:
+            rect = QtCore.QRect()
+        self.updateRequested.emit(rect)
+
+    def update_requested(self, rect):
+        if rect.isNull():
+            self.update()
+        else:
+            self.update(rect)
+
+    def request_window_title(self, title):
+        '''Thread safe version of setWindowTitle().'''
+        self.windowTitleRequested.emit(title)
+
+    def request_clipboard_text(self, text, selection=False):
+        '''Thread safe version of set_clipboard_text().'''
+        self.clipboardTextRequested.emit(text, selection)
+
+    def set_clipboard_text(self, text, selection=False):
+        mode = QtGui.QClipboard.Clipboard
+        if selection and self.clipboard.supportsSelection():
+            mode = QtGui.QClipboard.Selection
+        self.clipboard.setText(text, mode)
 
     def set_dirty(self):
         '''Means that the display needs to be completely repainted.'''
@@ -900,6 +1634,7 @@ class TerminalWidget(QtGui.QWidget):
         if processed:
             self.log.debug("screen processed keypress: %s" % \
                            processed.replace('\x1b', '\\x1b'))
+            self.predict(processed)
             self.channel.send_keypress(processed)
         elif event.key() == QtCore.Qt.Key_F5:
             self.repaint()
@@ -914,32 +1649,89 @@ class TerminalWidget(QtGui.QWidget):
         elif event.key() == QtCore.Qt.Key_V and \
              event.modifiers() == (QtCore.Qt.ShiftModifier | \
                                    QtCore.Qt.ControlModifier):
-            self.channel.send_keypress(str(self.clipboard.text()))
+            self.paste(self.clipboard.text())
         else:
             self.log.debug("Keypress: %s" % event.text())
+            self.predict(event.text())
             self.channel.send_keypress(event.text())
         self.screen.blink_cursor(False)     # stop blinking while keypress
         #self.scroll_to(-1)
 
+    def predict(self, text):
+        with self.screen.lock:
+            predicted = self.predictor.key_pressed(unicode(text))
+        if predicted:
+            QtCore.QTimer.singleShot(self.predictor.timeout_ms, 
+                                     self.check_predictions)
+
+    def check_predictions(self):
+        with self.screen.lock:
+            self.predictor.output_received()
+
+    def paste(self, text):
+        text = unicode(text)
+        if self.screen.bracketed_paste:
+            # the end marker must not be pasted, it would end the paste early
+            text = u"\x1b[200~%s\x1b[201~" % text.replace(u"\x1b[201~", u"")
+        self.channel.send_keypress(text)
+
     def mousePressEvent(self, event):
         self.mouse_selection_start = event.pos()
-        self.screen.clear_selection()
+        with self.screen.lock:
+            self.screen.clear_selection()
+        interval = QtGui.QApplication.doubleClickInterval()
+        if self.double_click_time.isValid() and \
+           self.double_click_time.elapsed() < interval:
+            self.mouseTripleClickEvent(event)
 
     def mouseReleaseEvent(self, event):
         if self.mouse_selection_start != event.pos():
-            self.clipboard.setText(self.screen.get_selection_text())
+            with self.screen.lock:
+                text = self.screen.get_selection_text()
+            self.clipboard.setText(text)
         self.word_select_mode = False
+        self.line_select_mode = False
 
     def mouseDoubleClickEvent(self, event):
         self.mouse_select_start = event.pos()
-        (top, left) = self.screen.get_cell_from_point(event.pos())
-        (first, last) = self.screen.find_word(top, left)
-        self.screen.set_selection_start(*first)
-        self.screen.set_selection_to_cell(*last)
-        self.clipboard.setText(self.screen.get_selection_text())
+        with self.screen.lock:
+            (top, left) = self.screen.get_cell_from_point(event.pos())
+            (first, last) = self.screen.find_word(top, left)
+            self.screen.set_selection_start(*first)
+            self.screen.set_selection_to_cell(*last)
+            text = self.screen.get_selection_text()
+        self.clipboard.setText(text)
         self.word_select_mode = True
+        self.double_click_time.start()
+
+    def mouseTripleClickEvent(self, event):
+        self.double_click_time = QtCore.QTime()
+        with self.screen.lock:
+            (top, left) = self.screen.get_cell_from_point(event.pos())
+            (first, last) = self.screen.find_line(top, left)
+            self.screen.set_selection_start(*first)
+            self.screen.set_selection_to_cell(*last)
+            text = self.screen.get_selection_text()
+        self.clipboard.setText(text)
+        self.line_select_mode = True
 
     def mouseMoveEvent(self, event):
+        with self.screen.lock:
+            self.select_to_point(event)
+
+    def select_to_point(self, event):
+        if self.line_select_mode:
+            # extend the selection by whole logical lines
+            start = self.mouse_selection_start
+            (top, left) = self.screen.get_cell_from_point(start)
+            (first, last) = self.screen.find_line(top, left)
+            (top, left) = self.screen.get_cell_from_point(event.pos())
+            (line_first, line_last) = self.screen.find_line(top, left)
+            if line_first < first:
+                (first, line_last) = (last, line_first)
+            self.screen.set_selection_start(*first)
+            self.screen.set_selection_to_cell(*line_last)
+            return
         start = self.mouse_selection_start
         diff = start - event.pos()
         if abs(diff.x()) >= (self.col_size / 2) or \
@@ -960,7 +1752,8 @@ class TerminalWidget(QtGui.QWidget):
     def clipboard_changed(self):
         if self.clipboard.ownsClipboard():
             return
-        self.screen.clear_selection()
+        with self.screen.lock:
+            self.screen.clear_selection()
 
     def paintEvent(self, event):
         painter = QtGui.QPainter()
@@ -968,9 +1761,11 @@ class TerminalWidget(QtGui.QWidget):
             self.log.warning("paintEvent...Unable to paint widget!!!")
             return
         try:
-            cursor = self.screen.get_cursor()
-            painter.fillRect(event.rect(), cursor.bgcolor)
-            self.screen.draw(painter, event)
+            with self.screen.lock:
+                cursor = self.screen.get_cursor()
+                painter.fillRect(event.rect(), cursor.bgcolor)
+                self.screen.draw(painter, event)
+                self.predictor.draw(painter)
         except:
             self.log.exception()
             self.screen.print_debug()
@@ -986,36 +1781,37 @@ class TerminalWidget(QtGui.QWidget):
 
         cols = (width - scroll_bar_width) / self.col_size
         rows = height / self.row_size
-        #self.log.debug("Resizing to (%s, %s)" % (rows, cols))
-        self.screen.resize(cols, rows)
-        self.channel.resize(cols, rows)
-
-        cursor = self.screen.get_cursor()
-        (row, col) = cursor.get_row_col()
-        bottom = self.screen.base + rows
-        if row >= bottom:
-            self.screen.base += (row - bottom + 1)
-        #self.update()
+        # the buffer and the pty are resized once the resizing settles
+        self.resizer.request(cols, rows)
 
     def wheelEvent(self, event):
         self.scroll_bar.wheelEvent(event)
 
     def scrollEvent(self, value):
-        self.screen.base = value
+        with self.screen.lock:
+            self.screen.base = value
+            self.scroll_values = (self.scroll_values[0], value)
         self.update()
 
     def set_scroll_value(self, maximum, value=None):
-        self.log.debug("Setting scroll range to (0, %s)" % maximum)
-        self.scroll_bar.setRange(0, maximum)
+        '''Thread safe, the scroll bar is updated on the gui thread.'''
         if value is None:
             value = maximum
+        self.scroll_values = (maximum, value)
+        self.scrollValueRequested.emit(maximum, value)
+
+    def scroll_value_requested(self, maximum, value):
+        self.log.debug("Setting scroll range to (0, %s)" % maximum)
         self.log.debug("Setting scroll value to (%s)" % value)
+        # the screen already moved, only the scroll bar is updated here
+        self.scroll_bar.blockSignals(True)
+        self.scroll_bar.setRange(0, maximum)
         self.scroll_bar.setValue(value)
+        self.scroll_bar.blockSignals(False)
+        self.update()
 
     def get_scroll_value(self):
-        maximum = self.scroll_bar.maximum()
-        value = self.scroll_bar.value()
-        return (maximum, value)
+        return self.scroll_values
 
     def setWindowTitle(self, title):
         self.titleChanged.emit(title)
@@ -1041,6 +1837,106 @@ class TerminalChannel(QtCore.QObject):
         '''Subclasses should implement.'''
         pass
 
+    def pause_reading(self):
+        '''Called when the terminal cannot keep up with the output.
+           Subclasses should stop emitting dataReceived until 
+           resume_reading() is called.'''
+        pass
+
+    def resume_reading(self):
+        '''Subclasses should implement.'''
+        pass
+
+    def close(self):
+        '''Called when the terminal is closed.  Subclasses should stop
+           reading and let go of their connection.'''
+        pass
+
+
+class SSHConnectionPool:
+    '''Authenticated SSH clients shared by every SSHConnection to the same
+       (host, port, user), so a new tab only opens another channel on the
+       existing transport instead of doing a full handshake.'''
+    __pool = None
+
+    class PooledClient:
+        def __init__(self, key, passwd, client):
+            self.key = key
+            self.passwd = passwd
+            self.client = client
+            self.users = 0
+
+        def is_active(self):
+            transport = self.client.get_transport()
+            return transport is not None and transport.is_active()
+
+    def __init__(self):
+        self.log = log.get_log(self)
+        self.clients = {}
+        self.locks = {}
+        self.lock = threading.Lock()
+
+    def get_pool():
+        if SSHConnectionPool.__pool is None:
+            SSHConnectionPool.__pool = SSHConnectionPool()
+            config = TerminalConfig()
+            interval = config.getint("SSH", "keepaliveinterval", 60)
+            if interval > 0:
+                ChannelReactor.get_reactor().add_timer(interval,
+                                SSHConnectionPool.__pool.send_keepalives)
+        return SSHConnectionPool.__pool
+    get_pool = staticmethod(get_pool)
+
+    def create_client(self):
+        client = paramiko.SSHClient()
+        client.load_system_host_keys()
+        client.set_missing_host_key_policy(paramiko.WarningPolicy())
+        return client
+
+    def acquire(self, addr, port, name, passwd):
+        '''Returns a PooledClient that is connected and authenticated,
+           connecting first if there is none to reuse.  Connection errors
+           are raised as they are by paramiko.'''
+        key = (addr, port, name)
+        with self.lock:
+            key_lock = self.locks.setdefault(key, threading.Lock())
+        # held while connecting, so tabs opened together share one handshake
+        with key_lock:
+            with self.lock:
+                pooled = self.clients.get(key)
+            if pooled is not None and pooled.passwd == passwd and \
+               pooled.is_active():
+                self.log.debug("Reusing connection to %s@%s:%s" % \
+                               (name, addr, port))
+            else:
+                client = self.create_client()
+                client.connect(addr, port, name, passwd)
+                pooled = SSHConnectionPool.PooledClient(key, passwd, client)
+                with self.lock:
+                    self.clients[key] = pooled
+            with self.lock:
+                pooled.users += 1
+        return pooled
+
+    def send_keepalives(self):
+        '''Called by the ChannelReactor, so idle connections are not
+           dropped by firewalls along the way.'''
+        with self.lock:
+            clients = self.clients.values()
+        for pooled in clients:
+            if pooled.is_active():
+                pooled.client.get_transport().send_ignore()
+
+    def release(self, pooled):
+        '''Closes the client once its last user is gone.'''
+        with self.lock:
+            pooled.users -= 1
+            if pooled.users > 0:
+                return
+            if self.clients.get(pooled.key) is pooled:
+                del self.clients[pooled.key]
+        pooled.client.close()
+
 
 class SSHConnection(TerminalChannel):
     def __init__(self, addr, port, name, passwd):
@@ -1051,14 +1947,25 @@ class SSHConnection(TerminalChannel):
         self.passwd = passwd
         self.connected = False
         self.authentication_error = False
-        self.client = paramiko.SSHClient()
-        self.client.load_system_host_keys()
-        self.client.set_missing_host_key_policy(paramiko.WarningPolicy())
+        self.size = (80, 24)
+        self.pooled = None
+        self.client = None
+        self.eof = False
         self.config = TerminalConfig()
+        self.share_connections = self.config.getboolean("SSH",
+                                                "shareconnections", True)
 
     def connect(self):
         try:
-            self.client.connect(self.addr, self.port, self.name, self.passwd)
+            if self.share_connections:
+                pool = SSHConnectionPool.get_pool()
+                self.pooled = pool.acquire(self.addr, self.port, self.name,
+                                           self.passwd)
+                self.client = self.pooled.client
+            else:
+                self.client = SSHConnectionPool.get_pool().create_client()
+                self.client.connect(self.addr, self.port, self.name, 
+                                    self.passwd)
             self.connected = True
         except paramiko.AuthenticationException:
             self.connected = False
@@ -1071,14 +1978,29 @@ class SSHConnection(TerminalChannel):
         return self.connected
         
     def __del__(self):
+        self.close()
+
+    def close(self):
+        '''Closes the channel and gives the client back to the pool, which
+           closes the connection once no other tab is using it.  The reactor
+           holds on to the connection while it reads the channel, so this is
+           not left to __del__.'''
         if hasattr(self, 'channel'):
+            ChannelReactor.get_reactor().remove_reader(self)
             self.channel.close()
-        if hasattr(self, 'client'):
+        if self.pooled is not None:
+            SSHConnectionPool.get_pool().release(self.pooled)
+            self.pooled = None
+        elif self.client is not None:
             self.client.close()
+        self.client = None
+        self.connected = False
 
     def resize(self, width, height):
-        if not self.connected:
-            self.log.error("Trying to resize, but not yet connected.")
+        # remembered so the shell is started with the right size
+        self.size = (width, height)
+        if not hasattr(self, 'channel'):
+            self.log.debug("Not connected yet, pty size set on connect.")
             return
         self.channel.resize_pty(width, height)
 
@@ -1086,42 +2008,48 @@ class SSHConnection(TerminalChannel):
         if not self.connected:
             self.log.error("Trying to send keypress, but not yet connected.")
             return
-        try:
-            #self.log.debug("Sending %s" % key)
-            self.channel.send(key)
-        except EOFError:
-            pass
-
-    class SSHConnectionThread(QtCore.QThread):
-        def __init__(self, parent, sock, term):
-            QtCore.QThread.__init__(self)
-            self.log = log.get_log(self)
-            self.parent = parent
-            self.sock = sock
-            self.term = term
-
-        def run(self):
-            self.log.debug("Running connection thread")
-            while True:
-                data = self.sock.recv(4096)
-                if not data:
-                    self.log.info("*** EOF ***")
-                    self.parent.endOfFile.emit()
-                    break
-                self.log.debug("Received: %s" % data.replace('\x1b', 
-                               '\\x1b'))
-                self.parent.dataReceived.emit(data)
+        if not isinstance(key, str):
+            key = unicode(key).encode('utf-8')
+        # sent from the writer thread, a slow link does not block the gui
+        ChannelWriter.get_writer().write(self.channel, key)
+
+    def fileno(self):
+        return self.channel.fileno()
+
+    def handle_read(self):
+        '''Called by the ChannelReactor when the channel is readable.'''
+        data = self.channel.recv(4096)
+        if not data:
+            self.log.info("*** EOF ***")
+            self.eof = True
+            self.endOfFile.emit()
+            return False
+        self.log.debug("Received: %s" % data.replace('\x1b', '\\x1b'))
+        self.dataReceived.emit(data)
+        return True
+
+    def open_shell(self):
+        term_name = self.config.get("Sequencer", "type", "xterm")
+        (width, height) = self.size
+        self.channel = self.client.invoke_shell(term=term_name, width=width,
+                                                height=height)
+        return self.channel
 
     def start_shell(self, term):
         if not self.connected:
             self.log.error("Trying to start shell, but not yet connected.")
             return
-        self.log.debug("Starting connection thread")
-        term_name = self.config.get("Sequencer", "type", "xterm")
-        self.channel = self.client.invoke_shell(term=term_name)
-        self.connection_thread = SSHConnection.SSHConnectionThread(self, 
-                                                        self.channel, term)
-        self.connection_thread.start()
+        self.open_shell()
+        ChannelReactor.get_reactor().add_reader(self)
+
+    def pause_reading(self):
+        # paramiko stops adjusting the window once its buffer is full, so
+        # the server stops sending
+        ChannelReactor.get_reactor().remove_reader(self)
+
+    def resume_reading(self):
+        if not self.eof:
+            ChannelReactor.get_reactor().add_reader(self)
 
 
 class SSHTerminalWidget(TerminalWidget):
@@ -0,0 +1,74 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+
+import sequencer          # loads the escape sequences in order
+from sequence.character import CharacterAttributeEscapeSequence
+
+
+class FakeCursor:
+    '''Records the attributes set by SGR.'''
+    def __init__(self):
+        self.foreground = None
+        self.background = None
+        self.bold = False
+
+    def set_cell_foreground(self, color):
+        self.foreground = color.rgb() & 0xffffff
+
+    def set_cell_background(self, color):
+        self.background = color.rgb() & 0xffffff
+
+    def set_bold(self, bold=True):
+        self.bold = bold
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class FakeScreen:
+    def __init__(self):
+        self.cursor = FakeCursor()
+
+    def get_cursor(self):
+        return self.cursor
+
+
+class ExtendedColorTest(unittest.TestCase):
+    def setUp(self):
+        self.screen = FakeScreen()
+        self.sgr = CharacterAttributeEscapeSequence(self.screen, None)
+        self.cursor = self.screen.cursor
+
+    def process(self, sequence):
+        (key, params) = self.sgr.parse(sequence)
+        self.sgr.process(params)
+
+    def test_truecolor_then_bold(self):
+        self.process('38;2;10;20;30;1m')
+        self.assertEqual(self.cursor.foreground, 0x0a141e)
+        self.assertTrue(self.cursor.bold)
+
+    def test_indexed_then_background(self):
+        self.process('38;5;196;44m')
+        self.assertEqual(self.cursor.foreground, 0xff0000)
+        self.assertEqual(self.cursor.background, 0x0000ee)
+
+    def test_sub_parameters(self):
+        self.process('48:2::10:20:30;1m')
+        self.assertEqual(self.cursor.background, 0x0a141e)
+        self.assertTrue(self.cursor.bold)
+
+    def test_mixed_truecolor_then_bold(self):
+        # the last color component has sub-parameters, the color is invalid
+        # but it still takes 4 parameters, 30 is not read as a color
+        self.process('38;2;10;20;30:0;1m')
+        self.assertEqual(self.cursor.foreground, None)
+        self.assertTrue(self.cursor.bold)
+
+
+if __name__ == '__main__':
+    unittest.main()
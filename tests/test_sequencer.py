@@ -0,0 +1,90 @@
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+
+from charsets import CharsetState
+from sequencer import TerminalEscapeSequencer
+
+
+class FakeCursor:
+    def __init__(self, screen):
+        self.screen = screen
+
+    def write_text(self, text):
+        self.screen.text.append(text)
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class FakeScreen:
+    '''Records the text written and the window titles set.'''
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.text = []
+        self.titles = []
+        self.cursor = FakeCursor(self)
+        self.charsets = CharsetState()
+
+    def get_cursor(self):
+        return self.cursor
+
+    def get_charsets(self):
+        return self.charsets
+
+    def is_alternate_buffer(self):
+        return True
+
+    def set_window_title(self, title):
+        self.titles.append(title)
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class StringTerminatorTest(unittest.TestCase):
+    def setUp(self):
+        self.screen = FakeScreen()
+        self.sequencer = TerminalEscapeSequencer(self.screen, None)
+
+    def process(self, *reads):
+        for data in reads:
+            self.sequencer.process(data)
+
+    def test_bel_ends_string(self):
+        self.process('\x1b]0;title\x07text')
+        self.assertEqual(self.screen.titles, [u'title'])
+        self.assertEqual(u''.join(self.screen.text), u'text')
+
+    def test_st_ends_string(self):
+        self.process('\x1b]0;title\x1b', '\\text')
+        self.assertEqual(self.screen.titles, [u'title'])
+        self.assertEqual(u''.join(self.screen.text), u'text')
+
+    def test_can_cancels_string(self):
+        self.process('\x1b]0;title\x18text')
+        self.assertEqual(self.screen.titles, [])
+        self.assertEqual(u''.join(self.screen.text), u'text')
+
+    def test_sub_cancels_string(self):
+        self.process('\x1b]0;title\x1atext')
+        self.assertEqual(self.screen.titles, [])
+        self.assertEqual(u''.join(self.screen.text), u'text')
+
+    def test_escape_ends_string(self):
+        self.process('\x1b]0;one\x1b]0;two\x07text')
+        self.assertEqual(self.screen.titles, [u'one', u'two'])
+        self.assertEqual(u''.join(self.screen.text), u'text')
+
+    def test_escape_ends_string_across_reads(self):
+        self.process('\x1b]0;one\x1b', ']0;two\x07text')
+        self.assertEqual(self.screen.titles, [u'one', u'two'])
+        self.assertEqual(u''.join(self.screen.text), u'text')
+
+
+if __name__ == '__main__':
+    unittest.main()
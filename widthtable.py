@@ -0,0 +1,941 @@
+# Generated by genwidthtable.py from the Unicode 14.0.0 data, do not edit.
+
+BLOCK_SHIFT = 8
+BLOCK_MASK = 0xff
+
+WIDTH_INDEX = (
+    0, 0, 0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13,
+    14, 15, 16, 17, 0, 0, 18, 19, 20, 21, 22, 23, 24, 25, 0, 26,
+    27, 28, 0, 29, 30, 31, 32, 33, 0, 0, 0, 34, 35, 36, 37, 38,
+    39, 38, 40, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 41, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 42, 0, 43, 44, 45, 46, 47, 48, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 49, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 38, 38, 50, 0, 51, 52, 53,
+    54, 55, 56, 57, 58, 59, 0, 60, 61, 62, 63, 64, 65, 66, 67, 68,
+    69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 38, 80, 81, 82, 83,
+    0, 0, 0, 84, 85, 86, 38, 38, 38, 38, 38, 38, 38, 38, 38, 87,
+    0, 0, 0, 0, 88, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 0, 0, 89, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 0, 0, 90, 91, 38, 38, 92, 93,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 94, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 95,
+    96, 97, 98, 99, 100, 101, 102, 103, 0, 0, 104, 38, 38, 38, 38, 105,
+    106, 107, 108, 38, 38, 38, 38, 109, 110, 111, 38, 38, 112, 113, 114, 38,
+    115, 116, 38, 117, 118, 119, 120, 121, 122, 123, 124, 125, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    126, 127, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38, 38,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 128,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 128,
+)
+
+WIDTH_BLOCKS = (
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    ,
+    '0000000000000000000000000000000000000000000000000000000000000000'
+    '0000000000000000000000000000000000000000000000001111111122111111'
+    '2222111111121211111111111111111111211111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1110000000111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    ,
+    '1111111111111111111111111111111111111111111111112111111111111111'
+    '1111111111111111111111122111111111111111111111111111111111111111'
+    '1111111111122111200000000000000000000000000000000000000000000010'
+    '1001001022222222111111111111111111111111111222211111122222222222'
+    ,
+    '0000001111111111000000000001011111111111111111111111111111111111'
+    '1111111111100000000000000000000011111111111111110111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111000000001000000110010000111111111111111111'
+    ,
+    '1111111111111120101111111111111111111111111111110000000000000000'
+    '0000000000022111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111100000000000122222222222222'
+    '1111111111111111111111111111111111111111111000000000111111122011'
+    ,
+    '1111111111111111111111000010000000001000100000221111111111111112'
+    '1111111111111111111111111000221211111111111222221111111111111111'
+    '1111111111111112002222220000000011111111111111111111111111111111'
+    '1111111111000000000000000000000000000000000000000000000000000000'
+    ,
+    '0001111111111111111111111111111111111111111111111111111111010111'
+    '1000000001111011100000001111111111001111111111111111111111111111'
+    '1011211111111221122111111111111111111111121111111212221111220111'
+    '1000022112211012222222212222112111002211111111111111111111111102'
+    ,
+    '2001211111122221122111111111111111111111121111111211211211220211'
+    '1002222002200022202222222111121222222211111111110011101222222222'
+    '2001211111111121112111111111111111111111121111111211211111220111'
+    '1000002001211022122222222222222211002211111111111122222221000000'
+    ,
+    '2011211111111221122111111111111111111111121111111211211111220110'
+    '1000022112211022222220012222112111002211111111111111111122222222'
+    '2201211111122211121111222112121122211222111222111111111111222211'
+    '0112221112111022122222212222222222222211111111111111111111122222'
+    ,
+    '0111011111111211121111111111111111111111121111111111111111220100'
+    '0111120002000022222220021112212211002211111111112222222111111111'
+    '1011111111111211121111111111111111111111121111111111211111220110'
+    '1111120112110022222221122222211211002211111111112112222222222222'
+    ,
+    '0011111111111211121111111111111111111111111111111111111111100111'
+    '1000021112111011222211111111111111002211111111111111111111111111'
+    '2011211111111111111111122211111111111111111111111121111111112122'
+    '1111111222022221110002021111111122222211111111112211122222222222'
+    ,
+    '2111111111111111111111111111111111111111111111111011000000022221'
+    '1111111000000001111111111111222222222222222222222222222222222222'
+    '2112121111121111111111111111111111112121111111111011000000000122'
+    '1111121200000022111111111122111122222222222222222222222222222222'
+    ,
+    '1111111111111111111111110011111111111111111111111111101010111111'
+    '1111111121111111111111111111111111111111111112222000000000000001'
+    '0000010011111000000000002000000000000000000000000000000000000211'
+    '1111110111111211111111111112222222222222222222222222222222222222'
+    ,
+    '1111111111111111111111111111111111111111111110000100000010011001'
+    '1111111111111111111111110011110001111111111111111000011111111111'
+    '1101100111111011111111111111101111111111111111111111111111111111'
+    '1111112122222122111111111111111111111111111111111111111111111111'
+    ,
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222200000000000000000000000000000000'
+    '0000000000000000000000000000000000000000000000000000000000000000'
+    '0000000000000000000000000000000000000000000000000000000000000000'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111112111122111111121211112211111111111111111111111111111111'
+    '1111111112111122111111111111111111111111111111111211112211111112'
+    '1211112211111111111111121111111111111111111111111111111111111111'
+    ,
+    '1111111111111111121111221111111111111111111111111111111111111111'
+    '1111111111111111111111111112200011111111111111111111111111111222'
+    '1111111111111111111111111122222211111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111112211111122'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111122211111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111112222222'
+    ,
+    '1111111111111111110001222222222111111111111111111100111222222222'
+    '1111111111111111110022222222222211111111111112111200222222222222'
+    '1111111111111111111111111111111111111111111111111111001000000011'
+    '1111110110000000000011111111102211111111112222221111111111222222'
+    ,
+    '1111111111100000111111111122222211111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111112222222'
+    '1111100111111111111111111111111111111111101222221111111111111111'
+    '1111111111111111111111111111111111111111111111111111112222222222'
+    ,
+    '1111111111111111111111111111111200011110011122221101111110002222'
+    '1222111111111111111111111111111111111111111111221111122222222222'
+    '1111111111111111111111111111111111111111111122221111111111111111'
+    '1111111111222222111111111112221111111111111111111111111111111111'
+    ,
+    '1111111111111111111111100110221111111111111111111111111111111111'
+    '1111111111111111111111010000000201011000000001111110000000000220'
+    '1111111111222222111111111122222211111111111111220000000000000000'
+    '0000000000000002222222222222222222222222222222222222222222222222'
+    ,
+    '0000111111111111111111111111111111111111111111111111010000010111'
+    '1101111111111222111111111111111111111111111000000000111111111112'
+    '0011111111111111111111111111111111000011001000111111111111111111'
+    '1111111111111111111111111111111111111101001110100011222222221111'
+    ,
+    '1111111111111111111111111111111111111111111100000000110022211111'
+    '1111111111222111111111111111111111111111111111111111111111111111'
+    '1111111112222222111111111111111111111111111111111111111111122111'
+    '1111111122222222000100000000000001000000011110111111011100122222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '0000000000000000000000000000000000000000000000000000000000000000'
+    ,
+    '1111111111111111111111221111112211111111111111111111111111111111'
+    '1111112211111122111111112121212111111111111111111111111111111122'
+    '1111111111111111111111111111111111111111111111111111121111111111'
+    '1111121111111111111122111111211111111111111111112211121111111112'
+    ,
+    '1111111111100000111111111111111111111111110000011111111111111111'
+    '1111111111111111111111111111111100000200000000001122111111111111'
+    '1111111111111112111111111111122211111111111111111111111111111111'
+    '1222222222222222000000000000000000000000000000000222222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111112222111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    ,
+    '1111111111111111111111111122111111111111122111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111122221112112111111111111'
+    ,
+    '1111111111111111111111111111111111111112222222222222222222222222'
+    '1111111111122222222222222222222211111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111221'
+    ,
+    '1111111111111111111122111111111111111111111111111111111111111111'
+    '1111111122222222222211111111111111111111111111111111111111111112'
+    '1111111111111111111211111111111112111111112211111111111111111221'
+    '1111221111111121111121111111111111111111112111111122121111211211'
+    ,
+    '1111121111221111111111111111111111111111211111111111111111111111'
+    '1111111111112121111222121111111111111111111111111111111111111111'
+    '1111111111111111111112221111111111111111111111112111111111111112'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    ,
+    '1111111111111111111111111112211111111111111111111111111111111111'
+    '1111111111111111211112111111111111111111111111111111221111111111'
+    '1111111111111111111111211111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111100011222221111111'
+    ,
+    '1111111111111111111111111111111111111121222221221111111111111111'
+    '1111111111111111111111111111111111111111222222211222222222222220'
+    '1111111111111111111111122222222211111112111111121111111211111112'
+    '1111111211111112111111121111111200000000000000000000000000000000'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111112222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '2222222222222222222222222222222222222222220000222222222222222221'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222002222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222211111111222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    ,
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222111111111111111111111111111111111111111111111111'
+    ,
+    '1111111111111111111111111111111111111111111122222222222222222222'
+    '1111111111111111111111111111111111111111111111100001000000000011'
+    '1111111111111111111111111111110011111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111110011111122222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111122222112121111122222222222222222222222211111111111111'
+    ,
+    '1101110111101111111111111111111111111001111102221111111111222222'
+    '1111111111111111111111111111111111111111111111111111111122222222'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111002222222211111111111122222200000000000000000011111111111110'
+    ,
+    '1111111111111111111111111111111111111100000000111111111111111111'
+    '1111111000000000001122222222222122222222222222222222222222222222'
+    '0001111111111111111111111111111111111111111111111110110000110011'
+    '1111111111111121111111111122221111111011111111111111111111111112'
+    ,
+    '1111111111111111111111111111111111111111100000011001100222222222'
+    '1110111111110122111111111122111111111111111111111111111111110111'
+    '1111111111111111111111111111111111111111111111110100011001111100'
+    '1012222222222222222222222221111111111111111100111111110222222222'
+    ,
+    '2111111221111112211111122222222211111112111111121111111111111111'
+    '1111111111111111111111111111111111111111111122221111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111011011110221111111111222222'
+    ,
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222220000000000000000'
+    '0000000000000000000000000000000000000000000000000000000000000000'
+    ,
+    '1111111222222222222111112222210111111111111111111111111211111212'
+    '1121121111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1112222222222222222111111111111111111111111111111111111111111111'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111221111111111111111111111111111111111111111111111'
+    '1111111122222221222222222222222222222222222222221111111111111111'
+    ,
+    '0000000000000000222222222222222200000000000000002222222222222222'
+    '2222222222222222222222222222222222222222222222221111121111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111220'
+    ,
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222221111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111112'
+    '2211111122111111221111112211122222222222111111122222222220001122'
+    ,
+    '1111111111112111111111111111111111111112111111111111111111121121'
+    '1111111111111122111111111111112222222222222222222222222222222222'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111122222'
+    ,
+    '1112222111111111111111111111111111111111111111111111222111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111112111111111111122212222222222222222222222222222222'
+    '2222222222222222111111111111111111111111111111111111111111111022'
+    ,
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '1111111111111111111111111111122211111111111111111111111111111111'
+    '1111111111111111122222222222222201111111111111111111111111112222'
+    ,
+    '1111111111111111111111111111111111112222222221111111111111111111'
+    '1111111111122222111111111111111111111111111111111111110000022222'
+    '1111111111111111111111111111112111111111111111111111111111111111'
+    '1111222211111111111111222222222222222222222222222222222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111112211111111112222221111111111111111'
+    '1111111111111111111122221111111111111111111111111111111111112222'
+    ,
+    '1111111111111111111111111111111111111111222222221111111111111111'
+    '1111111111111111111111111111111111112222222222211111111111121111'
+    '1111111111121111111211211111111111211111111111111121111111211222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111222222222'
+    '1111111111111111111111222222222211111111222222222222222222222222'
+    '1111112111111111111111111111111111111111111111111211111111122222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '1111112212111111111111111111111111111111111111111111112112221221'
+    '1111111111111111111111211111111111111111111111111111111111111111'
+    '1111111111111111111111111111111222222221111111112222222222222222'
+    '2222222222222222222222222222222211111111111111111112112222211111'
+    ,
+    '1111111111111111111111111111222111111111111111111111111111222221'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '1111111111111111111111111111111111111111111111111111111122221111'
+    '1111111111111111221111111111111111111111111111111111111111111111'
+    ,
+    '1000200222220000111121112111111111111111111111111111112200022220'
+    '1111111112222222111111111222222211111111111111111111111111111111'
+    '1111111111111111111111111111111122222222222222222222222222222222'
+    '1111111111111111111111111111111111111002222111111111111222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111112221111111'
+    '1111111111111111111111221111111111111111111111111112222211111111'
+    '1111111111111111112222222111122222222222211111112222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111112222222222222222222222222222222222222222222222222222222'
+    '1111111111111111111111111111111111111111111111111112222222222222'
+    '1111111111111111111111111111111111111111111111111112222222111111'
+    ,
+    '1111111111111111111111111111111111110000222222221111111111222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222211111111111111111111111111111112'
+    '1111111111111111111111111111111111111111112001221122222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '1111111111111111111111111111111111111111222222221111111111111111'
+    '1111110000000000011111111122222222222222222222221111111111111111'
+    '1100001111222222222222222222222222222222222222221111111111111111'
+    '1111111111112222222222222222222211111111111111111111111222222222'
+    ,
+    '1011111111111111111111111111111111111111111111111111111100000000'
+    '0000000111111122221111111111111111111111111111110110012222222220'
+    '0011111111111111111111111111111111111111111111111110000110011011'
+    '1102222222222022111111111111111111111111122222221111111111222222'
+    ,
+    '0001111111111111111111111111111111111110000010000000021111111111'
+    '1111111122222222111111111111111111111111111111111110111222222222'
+    '0011111111111111111111111111111111111111111111111111110000000001'
+    '1111111110000110111111111111111121111111111111111111122222222222'
+    ,
+    '1111111111111111112111111111111111111111111111100011010011111102'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '1111111212111121111111111111112111111111112222221111111111111111'
+    '1111111111111111111111111111111011100000000222221111111111222222'
+    ,
+    '0011211111111221122111111111111111111111121111111211211111200111'
+    '0111122112211122122222212222211111112200000002220000022222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111100000000'
+    '1100010111111111111111111111210111222222222222222222222222222222'
+    '1111111111111111111111111111111111111111111111111110000001011110'
+    '0100111122222222111111111122222222222222222222222222222222222222'
+    ,
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '1111111111111111111111111111111111111111111111111100002211110010'
+    '0111111111111111111111111111002222222222222222222222222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111110000000011010'
+    '0111122222222222111111111122222211111111111112222222222222222222'
+    '1111111111111111111111111111111111111111111010110000001011222222'
+    '1111111111222222222222222222222222222222222222222222222222222222'
+    ,
+    '1111111111111111111111111112200011000010000022221111111111111111'
+    '1111111222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111100000000010012222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222211111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111112222222222221'
+    ,
+    '1111111221221111111121121111111111111111111111111111112112200101'
+    '1110111222222222111111111122222222222222222222222222222222222222'
+    '2222222222222222222222222222222211111111221111111111111111111111'
+    '1111111111111111111100002200111101111222222222222222222222222222'
+    ,
+    '1000000000011111111111111111111111111111111111111110000001100001'
+    '1111111022222222100000011000111111111111111111111111111111111111'
+    '1111111111000000000000010011111111122222222222221111111111111111'
+    '1111111111111111111111111111111111111111111111111111111112222222'
+    ,
+    '1111111112111111111111111111111111111111111111110000000200000010'
+    '1111112222222222111111111111111111111111111112221111111111111111'
+    '1111111111111111220000000000000000000000210000000100100222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '1111111211211111111111111111111111111111111111111000000222020020'
+    '0000001022222222111111111122222211111121121111111111111111111111'
+    '1111111111111112002110101222222211111111112222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222211111111111111111110011112222222'
+    ,
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222221222222222222222'
+    '1111111111111111111111111111111111111111111111111122222222222221'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111122222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111121111122222222222'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111112222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111120000000002222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111112222222'
+    '1111111111111111111111111111111211111111112222111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111112'
+    '1111111111222222111111111111111111111111111111220000012222222222'
+    ,
+    '1111111111111111111111111111111111111111111111110000000111111111'
+    '1111112222222222111111111121111111211111111111111111111122222111'
+    '1111111111111111222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111112222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111122220111111111111111111111111111111111111111111111111'
+    '1111111122222220000111111111111122222222222222222222222222222222'
+    '2222222222222222222222222222222222220222222222222222222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111222221111111111111222'
+    '1111111112222222111111111122100100002222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '0000000000000000000000000000000000000000000000220000000000000000'
+    '0000000222222222111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111112222222222'
+    ,
+    '1111111111111111111111111111111111111112211111111111111111111111'
+    '1111111111111111111111111111111111111110001111111110000000000000'
+    '0001100000001111111111111111111111111111110000111111111111111111'
+    '1111111111111111111111111111111111111111111222222222222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1100012222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222211111111111111111111222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111122222222211111111111111111111111112222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111112111111111111111111111111111111111111111111'
+    '1111111111111111111111111111121122122112211112111111111111212111'
+    '1111211111111111111111111111111111111111111111111111111111111111'
+    ,
+    '1111112111122111111112111111121111111111111111111111111111211112'
+    '1111121222111111121111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111122111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111112211111111111111111111111111111111111111111111111111'
+    ,
+    '0000000000000000000000000000000000000000000000000000000111100000'
+    '0000000000000000000000000000000000000000000001111111101111111111'
+    '1111011111112222222222222220000020000000000000002222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '1111111111111111111111111111111222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '0000000200000000000000000220000000200200000222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '1111111111111111111111111111111111111111111112220000000111111122'
+    '1111111111222211222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222111111111111111111111111111111022222222222222222'
+    '1111111111111111111111111111111111111111111100001111111111222221'
+    ,
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222211111112111121121111111111111112'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111122111111111000000022222222222222222222222222222222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111000000012222111111111122221122222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222111111111111111'
+    '1111111111111111111111111111111111111111111111111111122222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '2111111111111111111111111111111111111111111111111111111111111122'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '1111211111111111111111111111111121121221211111111112111121212222'
+    '2212222121212111211212212121212121121221111211111112111121111212'
+    '1111111111211111111111111111222221112111112111111111111111112222'
+    '2222222222222222222222222222222222222222222222221122222222222222'
+    ,
+    '1111211111111111111111111111111111111111111122221111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111122222222222211111111111111122111111111111111'
+    '2111111111111112211111111111111111111111111111111111112222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111121122222222221111111111111111111222222222222222222'
+    '2222222222222222222222222222222222222211111111111111111111111111'
+    ,
+    '2222222222222222222222222222222221111111111112222222221222222222'
+    '2222222222222222222222222222222222222222222222222222222222222122'
+    '2222222222222222222211111111111122222222222222222222222222222222'
+    '2222222222211112222211111111111122222222222222222111211122222222'
+    ,
+    '2222222222222222222222222222222222222222222222222222222222222221'
+    '2122222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222112'
+    ,
+    '2222222222222222222222222222222222222222222222222222222222222211'
+    '1111111111122221222222222222222222222222111111111111111111211111'
+    '1111111111111111111112211111111111112111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111122222'
+    ,
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222111111111111111111111111111111111111111111111111'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222221111112111222112222222222211111111111222221111222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111222222222222'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111222222222222222222222222222222222222222'
+    ,
+    '1111111111112222111111111111111111111111111111111111111111111111'
+    '1111111122222222111111111122222211111111111111111111111111111111'
+    '1111111122222222111111111111111111111111111111221122222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '1111111111112222222222222222222222222222222222222222222222212222'
+    '2222221222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111122222222222211111111111111222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111211111111111111111111111111111111111111111111'
+    '1111111111122222222222222222222222222222222222221111111111222222'
+    ,
+    '2022222222222222222222222222222200000000000000000000000000000000'
+    '0000000000000000000000000000000000000000000000000000000000000000'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    '2222222222222222222222222222222222222222222222222222222222222222'
+    ,
+    '0000000000000000000000000000000000000000000000000000000000000000'
+    '0000000000000000000000000000000000000000000000000000000000000000'
+    '0000000000000000000000000000000000000000000000000000000000000000'
+    '0000000000000000000000000000000000000000000000002222222222222222'
+    ,
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111111'
+    '1111111111111111111111111111111111111111111111111111111111111122'
+    ,
+)
+
+# the digits become tuples once at import, a lookup is two indexings
+WIDTH_BLOCKS = tuple([tuple([int(x) for x in block])
+                      for block in WIDTH_BLOCKS])
+
+def get_width(ch):
+    '''Returns the number of cells ch takes, 2 for wide characters and 0
+       for combining ones.  ch is a single code point, or a surrogate pair
+       on a narrow unicode build.'''
+    if len(ch) == 1:
+        cp = ord(ch)
+    else:
+        cp = 0x10000 + ((ord(ch[0]) - 0xd800) << 10) + (ord(ch[1]) - 0xdc00)
+    return WIDTH_BLOCKS[WIDTH_INDEX[cp >> BLOCK_SHIFT]][cp & BLOCK_MASK]